@@ -1,5 +1,7 @@
 
 import streamlit as st
+from src.market.scheduler import start_prefetch_scheduler
+from src.utils.config import load_env
 from src.web_app.session import init_session
 from src.web_app.ui_chat import render_chat_tab
 from src.web_app.ui_portfolio import render_portfolio_tab
@@ -55,6 +57,12 @@ st.markdown(
 st.markdown("<hr style='margin-top:6px; margin-bottom:10px;'>", unsafe_allow_html=True)
 
 
+# Explicit startup init (.env) instead of import-time side effects
+load_env()
+
+# Keep the market watchlist warm in the background (starts once per process)
+start_prefetch_scheduler()
+
 # Initialize session memory
 init_session()
 
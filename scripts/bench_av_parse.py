@@ -0,0 +1,113 @@
+# scripts/bench_av_parse.py
+"""
+Alpha Vantage daily payload parsing: per-row loop vs vectorized parser.
+
+Uses a recorded TIME_SERIES_DAILY_ADJUSTED response (--payload file.json, e.g.
+saved from an outputsize=full request) or a synthetic ~20-year payload, checks
+both parsers agree, and reports timings.
+
+    python scripts/bench_av_parse.py
+    python scripts/bench_av_parse.py --payload data/recorded/MSFT_full.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.market.parsing import parse_alpha_vantage_daily  # noqa: E402
+
+
+def legacy_parse(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    The previous MarketAgent loop: one to_datetime + dict per row, then sort.
+    """
+    rows = []
+    for dt, vals in data["Time Series (Daily)"].items():
+        c = vals.get("5. adjusted close") or vals.get("4. close")
+        if c is None:
+            continue
+        rows.append({
+            "Date": pd.to_datetime(dt),
+            "Open": float(vals.get("1. open", "nan")),
+            "High": float(vals.get("2. high", "nan")),
+            "Low": float(vals.get("3. low", "nan")),
+            "Close": float(c),
+            "Volume": float(vals.get("6. volume") or vals.get("5. volume") or "nan"),
+        })
+    return pd.DataFrame(rows).sort_values("Date")
+
+
+def synthetic_payload(years: int = 20, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=years * 252)[::-1]
+    ts = {}
+    price = 100.0
+    for d in dates:
+        price *= 1.0 + rng.gauss(0, 0.01)
+        ts[d.strftime("%Y-%m-%d")] = {
+            "1. open": f"{price * 0.995:.4f}",
+            "2. high": f"{price * 1.01:.4f}",
+            "3. low": f"{price * 0.99:.4f}",
+            "4. close": f"{price:.4f}",
+            "5. adjusted close": f"{price * 0.97:.4f}",
+            "6. volume": str(rng.randint(100_000, 90_000_000)),
+            "7. dividend amount": "0.0000",
+            "8. split coefficient": "1.0",
+        }
+    # round-trip through JSON so value types match a real response
+    return json.loads(json.dumps({"Meta Data": {}, "Time Series (Daily)": ts}))
+
+
+def _best_ms(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--payload", type=str, default=None, help="recorded Alpha Vantage JSON response")
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.payload:
+        payload = json.loads(Path(args.payload).read_text(encoding="utf-8"))
+    else:
+        payload = synthetic_payload()
+    n = len(payload["Time Series (Daily)"])
+    print(f"Bars = {n:,}")
+
+    old = legacy_parse(payload).reset_index(drop=True)
+    new = parse_alpha_vantage_daily(payload)
+    cols = ["Open", "High", "Low", "Close", "Volume"]
+    same = (
+        len(old) == len(new)
+        and (old["Date"].to_numpy() == new["Date"].to_numpy()).all()
+        and np.allclose(old[cols].to_numpy(), new[cols].to_numpy(), equal_nan=True)
+    )
+    if not same:
+        print("❌ Parsers disagree")
+        sys.exit(1)
+    print("✅ Vectorized parser matches the loop (Date + OHLCV)")
+
+    t_old = _best_ms(lambda: legacy_parse(payload), max(1, args.runs - 1))
+    t_new = _best_ms(lambda: parse_alpha_vantage_daily(payload), args.runs)
+    print(f"loop parser       : {t_old:9.2f} ms")
+    print(f"vectorized parser : {t_new:9.2f} ms ({t_old / t_new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# scripts/bench_chart_render.py
+"""
+Price chart render time vs point count, with and without LTTB downsampling.
+
+Times what st.pyplot does with a figure: plot + PNG serialization, and
+reports the chart payload: the PNG st.pyplot ships and the SVG a vector or
+browser-side chart would. Raw series are compared with the same series
+downsampled to the chart budget (src.market.downsample, CHART_MAX_POINTS);
+the last column says whether the app downsamples at that size
+(CHART_DOWNSAMPLE_MIN_POINTS). The script also checks that the high/low
+survive downsampling.
+
+    python scripts/bench_chart_render.py
+    python scripts/bench_chart_render.py --points 1000 10000 100000 --budget 300
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.market.downsample import DEFAULT_CHART_MAX_POINTS, downsample_frame, downsample_min_points  # noqa: E402
+
+
+def synthetic_series(n: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=n, freq="min")
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.001, n))
+    return pd.DataFrame({"Date": dates, "Close": close})
+
+
+def render_ms(df: pd.DataFrame) -> float:
+    t0 = time.perf_counter()
+    fig, ax = plt.subplots()
+    ax.plot(df["Date"], df["Close"])
+    ax.set_title("Trend")
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def payload_kb(df: pd.DataFrame, fmt: str) -> float:
+    fig, ax = plt.subplots()
+    ax.plot(df["Date"], df["Close"])
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt)
+    plt.close(fig)
+    return len(buf.getvalue()) / 1024.0
+
+
+def _best(fn, runs: int) -> float:
+    return min(fn() for _ in range(runs))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--points", type=int, nargs="+", default=[1_000, 5_000, 20_000, 100_000, 300_000, 1_000_000])
+    ap.add_argument("--budget", type=int, default=DEFAULT_CHART_MAX_POINTS)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    render_ms(synthetic_series(10))  # warm up matplotlib
+    floor = downsample_min_points()
+    print(f"Budget = {args.budget} points | app downsamples above {floor:,} points")
+    print(f"{'points':>9} | {'raw render':>11} | {'lttb':>8} | {'ds render':>10} | {'speedup':>7} "
+          f"| {'png raw → ds':>14} | {'svg raw → ds':>14} | extremes | in app")
+    for n in args.points:
+        df = synthetic_series(n)
+        t_raw = _best(lambda: render_ms(df), args.runs)
+
+        t0 = time.perf_counter()
+        small = downsample_frame(df, args.budget, columns=["Close"], min_points=0)
+        t_ds = (time.perf_counter() - t0) * 1000.0
+        t_small = _best(lambda: render_ms(small), args.runs)
+
+        kept = small["Close"].max() == df["Close"].max() and small["Close"].min() == df["Close"].min()
+        total = t_ds + t_small
+        print(
+            f"{n:>9,} | {t_raw:>8.1f} ms | {t_ds:>5.2f} ms | {t_small:>7.1f} ms | "
+            f"{t_raw / total:>6.1f}x | {payload_kb(df, 'png'):>4.0f} → {payload_kb(small, 'png'):>3.0f} KB | "
+            f"{payload_kb(df, 'svg'):>4.0f} → {payload_kb(small, 'svg'):>3.0f} KB | "
+            f"{'✅' if kept else '❌'} {len(small):>5,} | {'downsampled' if n > max(args.budget, floor) else 'raw'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# scripts/bench_cold_start.py
+"""
+Cold-start benchmark for the Streamlit entry point, based on `python -X importtime`.
+
+Imports the same modules as app.py in a fresh interpreter and reports:
+- total import time, the share spent inside streamlit and in src.* modules
+- the slowest imports (cumulative)
+- heavy modules that should only load when a tab/agent needs them
+
+Exits non-zero when app-owned import time exceeds --budget-ms or a heavy module
+is imported at startup, so it can run as a regression check in CI.
+
+    python scripts/bench_cold_start.py
+    python scripts/bench_cold_start.py --runs 5 --budget-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# what app.py imports at module level
+APP_MODULES = [
+    "streamlit",
+    "src.utils.config",
+    "src.web_app.session",
+    "src.market.scheduler",
+    "src.web_app.ui_chat",
+    "src.web_app.ui_portfolio",
+    "src.web_app.ui_market",
+    "src.web_app.ui_goals",
+]
+
+# must not be imported until a tab renders a chart / an agent is built
+DEFERRED_MODULES = ["pandas", "numpy", "matplotlib", "langgraph", "openai", "faiss", "requests"]
+
+
+def _run_importtime() -> List[Tuple[int, int, str]]:
+    """
+    Returns (self_us, cumulative_us, name-with-indent) rows for one cold import.
+    """
+    code = "import " + ", ".join(APP_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cum_us), name.rstrip()))
+    return rows
+
+
+def _summarize(rows: List[Tuple[int, int, str]]) -> Dict[str, object]:
+    top_level = [(cum, name.strip()) for _, cum, name in rows if not name[1:].startswith(" ")]
+    total_us = sum(cum for cum, _ in top_level)
+    streamlit_us = sum(cum for cum, name in top_level if name == "streamlit")
+    app_us = sum(cum for cum, name in top_level if name.startswith("src"))
+    imported = {name.strip().split(".")[0] for _, _, name in rows}
+    return {
+        "total_ms": total_us / 1000.0,
+        "streamlit_ms": streamlit_us / 1000.0,
+        "app_ms": app_us / 1000.0,
+        "deferred_loaded": [m for m in DEFERRED_MODULES if m in imported],
+        "slowest": sorted(((cum, name.strip()) for _, cum, name in rows), reverse=True),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3, help="cold imports to run; the fastest is reported")
+    ap.add_argument("--budget-ms", type=float, default=100.0, help="max import time of src.* modules (excl. streamlit)")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    runs = [_summarize(_run_importtime()) for _ in range(max(1, args.runs))]
+    best = min(runs, key=lambda r: r["total_ms"])
+
+    print(f"Cold import (best of {len(runs)}): {best['total_ms']:.1f} ms total")
+    print(f"  streamlit : {best['streamlit_ms']:.1f} ms")
+    print(f"  src.*     : {best['app_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (cumulative):")
+    for cum, name in best["slowest"][: args.top]:
+        print(f"  {cum / 1000.0:8.1f} ms  {name}")
+
+    failed = False
+    if best["deferred_loaded"]:
+        print(f"❌ Heavy modules imported at startup: {best['deferred_loaded']}")
+        failed = True
+    if best["app_ms"] > args.budget_ms:
+        print(f"❌ src.* import time {best['app_ms']:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Cold start within budget")
+
+
+if __name__ == "__main__":
+    main()
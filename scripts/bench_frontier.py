@@ -0,0 +1,86 @@
+# scripts/bench_frontier.py
+"""
+Efficient frontier: one KKT system solve per target return vs the
+batched closed form in src.portfolio.frontier, cold and with the cached
+covariance (what a holding edit in the Portfolio tab costs).
+
+    python scripts/bench_frontier.py
+    python scripts/bench_frontier.py --assets 200 --points 100
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_portfolio_risk import synthetic_prices  # noqa: E402
+from src.market.analytics import TRADING_DAYS  # noqa: E402
+from src.portfolio import frontier as fr  # noqa: E402
+
+
+def loop_frontier(prices, returns):
+    """
+    The textbook version: rebuild the covariance, then solve the
+    (N + 2) x (N + 2) KKT system once per target return.
+    """
+    arr = prices.to_numpy()
+    r = arr[1:] / arr[:-1] - 1.0
+    mu, cov = r.mean(axis=0) * TRADING_DAYS, np.cov(r, rowvar=False) * TRADING_DAYS
+    n = len(mu)
+    kkt = np.zeros((n + 2, n + 2))
+    kkt[:n, :n] = 2.0 * cov
+    kkt[:n, n], kkt[n, :n] = 1.0, 1.0
+    kkt[:n, n + 1], kkt[n + 1, :n] = mu, mu
+    weights = []
+    for target in returns:
+        rhs = np.zeros(n + 2)
+        rhs[n], rhs[n + 1] = 1.0, target
+        weights.append(np.linalg.solve(kkt, rhs)[:n])
+    return np.array(weights)
+
+
+def _ms(fn, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--assets", type=int, default=50)
+    ap.add_argument("--points", type=int, default=fr.FRONTIER_POINTS)
+    args = ap.parse_args()
+
+    prices = synthetic_prices(args.assets)
+    values = dict(zip(prices.columns, np.random.default_rng(0).uniform(1_000, 20_000, args.assets)))
+    print(f"Assets = {args.assets} | frontier points = {args.points}")
+
+    def cold():
+        fr._MOMENTS.clear()
+        return fr.efficient_frontier(prices, values, points=args.points)
+
+    front = cold()
+    t_loop = _ms(lambda: loop_frontier(prices, front.returns), runs=3)
+    t_cold = _ms(cold)
+    t_warm = _ms(lambda: fr.efficient_frontier(prices, values, points=args.points))
+    print(f"per-target KKT loop  : {t_loop:8.2f} ms")
+    print(f"batched, cold        : {t_cold:8.2f} ms {'✅' if t_cold < 100 else '❌'} (< 100 ms)")
+    print(f"batched, cached cov  : {t_warm:8.2f} ms")
+
+    ref = loop_frontier(prices, front.returns)
+    print(f"matches KKT loop: {'✅' if np.allclose(front.weights, ref, atol=1e-8) else '❌'}")
+    print(f"current: return {front.current_return:.1%}, vol {front.current_vol:.1%} | "
+          f"frontier vol at that return {front.efficient_vol(front.current_return):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# scripts/bench_ledger_import.py
+"""
+Broker transaction import: row-by-row average-cost replay vs the chunked,
+vectorized ledger (src.portfolio.ledger).
+
+Writes a synthetic export (buys, partial/full sells, dividends, splits
+across several accounts) to a temp CSV, imports it, checks positions
+against the row loop and reports throughput and peak traced memory; the
+same export reversed (newest first) must give the same positions.
+
+    python scripts/bench_ledger_import.py
+    python scripts/bench_ledger_import.py --rows 5000000 --chunk 500000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.portfolio.ledger import PositionStore, import_transactions  # noqa: E402
+
+
+def synthetic_export(path: Path, rows: int, accounts: int, tickers: int, seed: int = 4):
+    """
+    ~70% buys, ~20% sells (part or all of what is held, never more),
+    dividends and 2:1 splits, spread over accounts x tickers.
+    """
+    rng = np.random.default_rng(seed)
+    acct = rng.integers(0, accounts, rows)
+    tick = rng.integers(0, tickers, rows)
+    kind = rng.choice(["Buy", "Sell", "Dividend", "Stock Split"], rows, p=[0.7, 0.2, 0.095, 0.005])
+    qty = rng.integers(1, 100, rows).astype(float)
+    sell_frac = np.where(rng.random(rows) < 0.2, 1.0, rng.uniform(0.1, 0.9, rows))
+
+    held = {}
+    ratio = np.full(rows, np.nan)
+    for i, (a, t, k) in enumerate(zip(acct.tolist(), tick.tolist(), kind.tolist())):
+        h = held.get((a, t), 0.0)
+        if k != "Buy" and h <= 0:
+            kind[i] = k = "Buy"
+        if k == "Buy":
+            held[(a, t)] = h + qty[i]
+        elif k == "Sell":
+            qty[i] = h if sell_frac[i] == 1.0 else max(1.0, np.floor(h * sell_frac[i]))
+            held[(a, t)] = h - qty[i]
+        elif k == "Stock Split":
+            qty[i], ratio[i] = 0.0, 2.0
+            held[(a, t)] = 2 * h
+        else:
+            qty[i] = h
+
+    pd.DataFrame({
+        "Trade Date": pd.Timestamp("2015-01-02") + pd.to_timedelta(np.arange(rows) // max(rows // 3000, 1), unit="D"),
+        "Account": [f"ACC{a:05d}" for a in acct],
+        "Action": kind,
+        "Symbol": [f"T{t:04d}" for t in tick],
+        "Quantity": qty,
+        "Price": rng.uniform(5, 500, rows).round(2),
+        "Fees": np.where((kind == "Buy") | (kind == "Sell"), 1.0, 0.0),
+        "Amount": np.where(kind == "Dividend", (qty * 0.2).round(2), np.nan),
+        "Split Ratio": ratio,
+    }).to_csv(path, index=False)
+
+
+def loop_positions(path: Path) -> dict:
+    """
+    The obvious implementation: read everything, walk the rows in order.
+    """
+    df = pd.read_csv(path)
+    state = {}
+    for r in df.itertuples(index=False):
+        s = state.setdefault((r.Account, r.Symbol), [0.0, 0.0, 0.0])
+        if r.Action == "Buy":
+            s[0] += r.Quantity
+            s[1] += r.Quantity * r.Price + r.Fees
+        elif r.Action == "Sell":
+            avg = s[1] / s[0] if s[0] > 0 else 0.0
+            s[2] += r.Quantity * r.Price - r.Fees - r.Quantity * avg
+            s[0] -= r.Quantity
+            s[1] = 0.0 if s[0] <= 1e-9 else s[1] - r.Quantity * avg
+        elif r.Action == "Stock Split":
+            s[0] *= r._8
+    return state
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--accounts", type=int, default=200)
+    ap.add_argument("--tickers", type=int, default=200)
+    ap.add_argument("--chunk", type=int, default=250_000)
+    ap.add_argument("--loop-rows", type=int, default=200_000, help="row loop is timed on this prefix only")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        csv = Path(d) / "transactions.csv"
+        synthetic_export(csv, args.rows, args.accounts, args.tickers)
+        print(f"Transactions = {args.rows:,} ({csv.stat().st_size / 1e6:.0f} MB CSV)")
+
+        result = import_transactions(str(csv), store=PositionStore(str(Path(d) / "positions.sqlite")),
+                                     chunk_rows=args.chunk)
+        # second pass only for memory (tracing slows the import down several times)
+        tracemalloc.start()
+        import_transactions(str(csv), store=PositionStore(str(Path(d) / "positions.sqlite")), chunk_rows=args.chunk)
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"ledger import  : {result.seconds:6.2f} s | {result.transactions / result.seconds:>10,.0f} rows/s "
+              f"| peak {peak:6.0f} MB | {len(result.positions):,} positions")
+
+        # many brokers export newest first: same positions, read back to front
+        rev = Path(d) / "newest_first.csv"
+        pd.read_csv(csv).iloc[::-1].to_csv(rev, index=False)
+        back = import_transactions(str(rev), store=PositionStore(str(Path(d) / "rev.sqlite")), chunk_rows=args.chunk)
+        same = np.allclose(back.positions[["shares", "cost_basis", "realized_gain"]].to_numpy(dtype=float),
+                           result.positions[["shares", "cost_basis", "realized_gain"]].to_numpy(dtype=float),
+                           rtol=1e-9, atol=1e-6)
+        print(f"newest-first   : {back.seconds:6.2f} s | {back.transactions / back.seconds:>10,.0f} rows/s "
+              f"| same positions {'✅' if same else '❌'}")
+
+        small = Path(d) / "prefix.csv"
+        pd.read_csv(csv, nrows=args.loop_rows).to_csv(small, index=False)
+        t0 = time.perf_counter()
+        ref = loop_positions(small)
+        dt = time.perf_counter() - t0
+        print(f"row loop       : {dt:6.2f} s | {args.loop_rows / dt:>10,.0f} rows/s (first {args.loop_rows:,} rows)")
+
+        check = import_transactions(str(small), store=PositionStore(str(Path(d) / "check.sqlite")))
+        pos = check.positions.set_index(["account", "ticker"])
+        got = np.array([pos.loc[k, ["shares", "cost_basis", "realized_gain"]].to_numpy(dtype=float) for k in ref])
+        want = np.array(list(ref.values()))
+        ok = np.allclose(got, want, rtol=1e-9, atol=1e-6)
+        print(f"matches row loop: {'✅' if ok else '❌'} (max abs diff {np.abs(got - want).max():.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# scripts/bench_market_analytics.py
+"""
+Watchlist stats: per-ticker pandas loop vs one vectorized pass over the
+aligned price matrix (src.market.analytics.summarize).
+
+Builds a synthetic date x ticker matrix, checks both agree and reports the
+cost per ticker.
+
+    python scripts/bench_market_analytics.py
+    python scripts/bench_market_analytics.py --tickers 200 --years 10
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.market.analytics import summarize  # noqa: E402
+
+
+def loop_stats(prices: pd.DataFrame, benchmark: str, period_points: int) -> pd.DataFrame:
+    """
+    The same stats one ticker at a time with pandas rolling/cov.
+    """
+    win = prices.iloc[-period_points:]
+    rets = win.pct_change(fill_method=None).iloc[1:]
+    rows = {}
+    for t in prices.columns:
+        p, r = win[t], rets[t]
+        b = rets[benchmark][r.notna()]
+        rows[t] = {
+            "vol_ann_pct": r.rolling(20).std().iloc[-1] * np.sqrt(252) * 100.0,
+            "ma50": prices[t].rolling(50).mean().iloc[-1],
+            "max_drawdown_pct": (p / p.cummax() - 1.0).min() * 100.0,
+            "beta": r.cov(b) / b.var(),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def synthetic_prices(n_tickers: int, years: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=years * 252)
+    market = rng.normal(0.0003, 0.01, len(dates))
+    betas = rng.uniform(0.5, 1.5, n_tickers)
+    rets = market[:, None] * betas + rng.normal(0, 0.01, (len(dates), n_tickers))
+    rets[:, 0] = market
+    cols = ["SPY"] + [f"T{i:03d}" for i in range(1, n_tickers)]
+    return pd.DataFrame(100.0 * np.cumprod(1.0 + rets, axis=0), index=dates, columns=cols)
+
+
+def _best_ms(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=50)
+    ap.add_argument("--years", type=int, default=5)
+    ap.add_argument("--period-points", type=int, default=252)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    prices = synthetic_prices(args.tickers, args.years)
+    print(f"Matrix = {prices.shape[0]:,} dates x {prices.shape[1]} tickers")
+
+    old = loop_stats(prices, "SPY", args.period_points)
+    new, _corr = summarize(prices, benchmark="SPY", period_points=args.period_points)
+    if not np.allclose(old.to_numpy(), new[old.columns].to_numpy(), equal_nan=True):
+        print("❌ Vectorized stats disagree with the pandas loop")
+        sys.exit(1)
+    print("✅ Vectorized stats match the per-ticker loop")
+
+    n = prices.shape[1]
+    t_old = _best_ms(lambda: loop_stats(prices, "SPY", args.period_points), max(1, args.runs - 2))
+    t_new = _best_ms(lambda: summarize(prices, benchmark="SPY", period_points=args.period_points), args.runs)
+    print(f"per-ticker loop : {t_old:9.2f} ms ({t_old * 1000 / n:8.1f} µs/ticker)")
+    print(f"vectorized      : {t_new:9.2f} ms ({t_new * 1000 / n:8.1f} µs/ticker, {t_old / t_new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# scripts/bench_portfolio_engine.py
+"""
+Portfolio summary: the previous pandas path (copy + sort + iterrows save)
+vs PortfolioEngine, for a full pass and for editing one holding.
+
+Checks both agree on totals / HHI / breakdowns after random edits.
+
+    python scripts/bench_portfolio_engine.py
+    python scripts/bench_portfolio_engine.py --rows 200000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.portfolio.engine import PortfolioEngine  # noqa: E402
+
+TYPES = ["stock", "etf", "bond", "crypto", "cash"]
+
+
+def legacy_rerun(df: pd.DataFrame) -> dict:
+    """
+    What ui_portfolio did per rerun: compute, save rows with iterrows, recompute.
+    """
+    def compute(d):
+        d = d.copy()
+        d["Value"] = d["Shares"] * d["Price"]
+        total = float(d["Value"].sum())
+        d["AllocationPct"] = (d["Value"] / total * 100.0).round(2)
+        top = d.sort_values("Value", ascending=False).iloc[0]
+        w = (d["Value"] / total).values
+        return d, {"total_value": total, "top_asset": top["Ticker"], "hhi": float((w ** 2).sum())}
+
+    calc, _ = compute(df)
+    saved = [{"Ticker": str(r["Ticker"]), "Shares": float(r["Shares"]), "Type": str(r["Type"]),
+              "Price": float(r["Price"])} for _, r in calc.iterrows()]
+    return compute(pd.DataFrame(saved))[1]
+
+
+def synthetic(rows: int, seed: int = 9) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Ticker": [f"T{i:06d}" for i in range(rows)],
+        "Shares": rng.integers(1, 500, rows).astype(float),
+        "Type": rng.choice(TYPES, rows),
+        "Price": rng.uniform(5, 500, rows).round(2),
+    })
+
+
+def _ms(fn, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--edits", type=int, default=2_000)
+    args = ap.parse_args()
+
+    df = synthetic(args.rows)
+    print(f"Holdings = {args.rows:,}")
+
+    t_legacy = _ms(lambda: legacy_rerun(df), runs=1)
+    t_engine = _ms(lambda: PortfolioEngine.from_frame(df).summary())
+    print(f"full rerun    : pandas+iterrows {t_legacy:9.1f} ms | engine {t_engine:7.2f} ms")
+
+    engine = PortfolioEngine.from_frame(df)
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, args.rows, args.edits)
+    shares = rng.integers(1, 500, args.edits).astype(float)
+    t0 = time.perf_counter()
+    for r, s in zip(rows.tolist(), shares.tolist()):
+        engine.update_row(r, shares=s)
+        engine.hhi()
+    per_edit = (time.perf_counter() - t0) / args.edits * 1e6
+    print(f"one-row edit  : engine.update_row + hhi {per_edit:7.1f} µs")
+
+    edited = df.copy()
+    for r, s in zip(rows.tolist(), shares.tolist()):
+        edited.iat[r, 1] = s
+    ref = PortfolioEngine.from_frame(edited)
+    ok = (np.isclose(engine.total, ref.total) and np.isclose(engine.hhi(), ref.hhi())
+          and np.allclose(engine.breakdown("type")["Value"], ref.breakdown("type")["Value"]))
+    print(f"incremental == full recompute: {'✅' if ok else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
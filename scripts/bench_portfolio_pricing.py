@@ -0,0 +1,151 @@
+# scripts/bench_portfolio_pricing.py
+"""
+Portfolio pricing through the provider that ships by default (Alpha
+Vantage): one market lookup per holding vs one batched lookup
+(src.portfolio.pricing.live_prices), served by a local HTTP stub that
+answers TIME_SERIES_DAILY_ADJUSTED requests after --latency-ms and counts
+them. Nothing in the provider / rate limiter / pooled session is patched;
+only its URL points at the stub.
+
+Alpha Vantage has no batch endpoint, so a cold batch is still N round
+trips: fetch_many only overlaps their latency (MARKET_MAX_WORKERS at a
+time) under the same rate limit. With the free-tier quota the limit, not
+the code, sets the cold time; the script prints that too.
+
+    python scripts/bench_portfolio_pricing.py
+    python scripts/bench_portfolio_pricing.py --positions 500 --latency-ms 50 --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_av_parse import synthetic_payload  # noqa: E402
+
+
+class StubAlphaVantage(ThreadingHTTPServer):
+    """
+    Answers every known symbol with the same payload (compact = latest 100
+    bars); unknown symbols get Alpha Vantage's error message.
+    """
+    daemon_threads = True
+
+    def __init__(self, symbols, latency_s: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        full = synthetic_payload(years=2)
+        series = full["Time Series (Daily)"]
+        compact = {"Meta Data": {}, "Time Series (Daily)": dict(list(series.items())[:100])}
+        self.bodies = {"full": json.dumps(full).encode(), "compact": json.dumps(compact).encode()}
+        self.symbols = set(symbols)
+        self.latency_s = latency_s
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/query"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        symbol = q.get("symbol", [""])[0]
+        with self.server._lock:
+            self.server.requests[symbol] += 1
+        time.sleep(self.server.latency_s)
+        if symbol in self.server.symbols:
+            body = self.server.bodies[q.get("outputsize", ["compact"])[0]]
+        else:
+            body = json.dumps({"Error Message": "Invalid API call."}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--positions", type=int, default=200)
+    ap.add_argument("--unknown", type=int, default=5, help="holdings the provider has no data for")
+    ap.add_argument("--latency-ms", type=float, default=25.0)
+    ap.add_argument("--workers", type=int, default=4, help="MARKET_MAX_WORKERS")
+    ap.add_argument("--rpm", type=float, default=60_000, help="ALPHAVANTAGE_RPM for the run (premium-like)")
+    args = ap.parse_args()
+
+    # read once by the shared limiter / session / provider
+    os.environ["ALPHAVANTAGE_RPM"] = str(args.rpm)
+    os.environ["MARKET_MAX_WORKERS"] = str(args.workers)
+
+    from src.market.cache import MarketCache
+    from src.market.data import MarketData
+    from src.market.providers import AlphaVantageProvider
+    from src.market.store import PriceStore
+    from src.portfolio.pricing import FAILED_QUOTE_TTL_MIN, PriceBook, live_prices
+
+    tickers = [f"T{i:04d}" for i in range(args.positions)]
+    unknown = [f"BAD{i}" for i in range(args.unknown)]
+    server = StubAlphaVantage(tickers + ["NEW1"], args.latency_ms / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def fresh_data(tmp: Path, name: str) -> MarketData:
+        provider = AlphaVantageProvider(api_key="bench")
+        provider.url = server.url
+        return MarketData(provider=provider, cache=MarketCache(maxsize=100_000), store=PriceStore(str(tmp / name)))
+
+    def timed(fn):
+        before = sum(server.requests.values())
+        t0 = time.perf_counter()
+        out = fn()
+        return out, sum(server.requests.values()) - before, (time.perf_counter() - t0) * 1000.0
+
+    print(f"Positions = {len(tickers):,} (+{len(unknown)} unknown) | latency {args.latency_ms:.0f} ms | "
+          f"workers {args.workers} | limit {args.rpm:,.0f}/min")
+    holdings = tickers + unknown
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+
+        # before: one load_daily per holding
+        data = fresh_data(tmp, "loop")
+        _, n, ms = timed(lambda: [data.load_daily(t, min_points=1) for t in holdings])
+        print(f"per-holding lookups : {n:>5,} round trips | {ms:8.1f} ms")
+
+        data = fresh_data(tmp, "batch")
+        quotes, n, ms = timed(lambda: live_prices(holdings, data=data))
+        print(f"batched (cold)      : {n:>5,} round trips | {ms:8.1f} ms | {len(quotes):,} priced")
+
+        _, n, ms = timed(lambda: live_prices(tickers, data=data))
+        print(f"batched (warm)      : {n:>5,} round trips | {ms:8.1f} ms")
+
+        book = PriceBook(fresh_data(tmp, "book"))
+        _, n, ms = timed(lambda: book.update(holdings))
+        print(f"PriceBook, first run: {n:>5,} round trips | {ms:8.1f} ms | {len(book.failed)} failed")
+        _, n, ms = timed(lambda: book.update(holdings))
+        print(f"PriceBook, rerun    : {n:>5,} round trips | {ms:8.1f} ms "
+              f"(failures cached {FAILED_QUOTE_TTL_MIN} min)")
+        asked, n, ms = timed(lambda: book.update(holdings + ["NEW1"]))
+        print(f"add one holding     : {n:>5,} round trips | {ms:8.1f} ms | requoted {asked}")
+
+    server.shutdown()
+    free_rpm = 5.0
+    print(f"free tier ({free_rpm:.0f}/min): a cold portfolio of {len(holdings):,} needs "
+          f"~{len(holdings) / free_rpm:,.0f} min either way; batching cannot beat the quota")
+
+
+if __name__ == "__main__":
+    main()
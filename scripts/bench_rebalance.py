@@ -0,0 +1,92 @@
+# scripts/bench_rebalance.py
+"""
+Nightly rebalancing: a per-account, per-holding loop vs one batched
+plan_trades call (src.portfolio.rebalance) over every account.
+
+Builds random accounts (holdings, cash, lot sizes) against one model
+portfolio, checks both produce identical trades and reports timings.
+
+    python scripts/bench_rebalance.py
+    python scripts/bench_rebalance.py --accounts 20000 --tickers 300
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.portfolio.rebalance import DRIFT_BAND, plan_trades  # noqa: E402
+
+
+def loop_trades(shares, prices, targets, cash, lot, band=DRIFT_BAND):
+    """
+    The obvious implementation: one account at a time, one holding at a time.
+    """
+    out = np.zeros_like(shares)
+    for a in range(shares.shape[0]):
+        total = cash[a] + sum(shares[a, i] * prices[i] for i in range(len(prices)))
+        desired, proceeds = {}, 0.0
+        for i in range(len(prices)):
+            drift = shares[a, i] * prices[i] / total - targets[i]
+            if abs(drift) > band:
+                desired[i] = -drift * total
+        for i, d in desired.items():
+            if d < 0:
+                qty = shares[a, i] if targets[i] <= 0 else \
+                    min(math.floor(-d / prices[i] / lot[i] + 1e-9) * lot[i], shares[a, i])
+                out[a, i] = -qty
+                proceeds += qty * prices[i]
+        need = sum(d for d in desired.values() if d > 0)
+        budget = max(cash[a] + proceeds, 0.0)
+        scale = budget / need if need > budget else 1.0
+        for i, d in desired.items():
+            if d > 0:
+                out[a, i] = math.floor(d * scale / prices[i] / lot[i] + 1e-9) * lot[i]
+    return out
+
+
+def synthetic(accounts: int, tickers: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    held = rng.random((accounts, tickers)) < 0.3
+    shares = np.where(held, rng.integers(1, 400, (accounts, tickers)), 0).astype(float)
+    prices = rng.uniform(5, 500, tickers).round(2)
+    cash = rng.uniform(0, 20_000, accounts).round(2)
+    lot = np.where(rng.random(tickers) < 0.1, 100.0, 1.0)
+    targets = rng.dirichlet(np.ones(tickers)) * 0.98
+    return shares, prices, targets, cash, lot
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--accounts", type=int, default=5_000)
+    ap.add_argument("--tickers", type=int, default=100)
+    ap.add_argument("--loop-accounts", type=int, default=500, help="loop is timed on this many accounts only")
+    args = ap.parse_args()
+
+    shares, prices, targets, cash, lot = synthetic(args.accounts, args.tickers)
+    print(f"Accounts = {args.accounts:,} | tickers = {args.tickers}")
+
+    t0 = time.perf_counter()
+    plan = plan_trades(shares, prices, targets, cash=cash, lot=lot)
+    dt = time.perf_counter() - t0
+    n_trades = int(np.count_nonzero(plan.trades))
+    print(f"batched : {dt * 1000:8.1f} ms | {args.accounts / dt:>10,.0f} accounts/s | {n_trades:,} trades")
+
+    k = min(args.loop_accounts, args.accounts)
+    t0 = time.perf_counter()
+    ref = loop_trades(shares[:k], prices, targets, cash[:k], lot)
+    dt = time.perf_counter() - t0
+    print(f"loop    : {dt * 1000:8.1f} ms | {k / dt:>10,.0f} accounts/s (first {k:,} accounts)")
+
+    ok = np.allclose(plan.trades[:k], ref) and (plan.cash_after >= -1e-6).all()
+    print(f"matches loop, no overdrawn cash: {'✅' if ok else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# scripts/bench_router.py
+"""
+Router microbenchmark + equivalence check.
+
+Compares the compiled router (src/workflow/router.py) with a reference
+implementation that does one `any(t in q_lower ...)` scan per keyword table,
+on a synthetic query log (or a real one: --log path, one query per line).
+
+Cold numbers route distinct queries only, so route_intents' dedup never
+hits; the cached line replays the log with its repeats (--repeat times
+each synthetic query on average) and is reported separately, with the
+share of queries the bounded dedup map answered (--dedup-size distinct
+queries are kept; the synthetic log spreads repeats uniformly, a
+worst case for an LRU).
+
+    python scripts/bench_router.py
+    python scripts/bench_router.py --n 200000 --repeat 1
+    python scripts/bench_router.py --log logs/queries.txt
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.market.symbols import DEFAULT_LISTING  # noqa: E402
+from src.workflow import router  # noqa: E402
+
+# every template has a wide slot (listed ticker, amount, ...) so the log can
+# hold many distinct queries
+TEMPLATES = [
+    "What is the {ticker} price trend for 1mo?",
+    "show me a chart of {ticker} vs {ticker2}",
+    "how is my portfolio doing and what's {ticker}'s trend?",
+    "Should I rebalance my holdings? I have {amount} in cash",
+    "{ticker} allocation in my account",
+    "explain diversification in my {amount} portfolio",
+    "explain diversification basics for a {amount} account",
+    "What is an ETF like {ticker} and how does it work?",
+    "How do bonds differ from stocks like {ticker}?",
+    "I want to save for retirement with a monthly contribution of {amount}",
+    "plan a goal of {amount} in {months} months",
+    "What does the market do when rates rise {bps} bps?",
+    "Is {ticker} a good stock to buy?",
+    "what is a {word}? asking about {ticker}",
+    "WHAT IS THE BEST WAY TO START INVESTING {amount} DOLLARS",
+]
+# ambiguous all-caps words on purpose: IT, USE, THIS
+TICKERS = ["AAPL", "MSFT", "NVDA", "SPY", "QQQ", "BND", "TSLA", "AMZN", "IT", "USE", "THIS"]
+WORDS = ["dividend", "expense ratio", "index fund", "target date fund", "bond ladder", "projection"]
+
+
+def _listed_symbols() -> List[str]:
+    with open(DEFAULT_LISTING, newline="", encoding="utf-8") as f:
+        return [row["symbol"] for row in csv.DictReader(f)]
+
+
+def reference_detect_intents(query: str) -> List[str]:
+    """
+    Straightforward implementation: one any() scan per table.
+    """
+    q = (query or "").strip()
+    q_lower = q.lower()
+    intents: List[str] = []
+
+    if any(t in q_lower for t in router.MARKET_TRIGGERS) and router._has_ticker_like_token(q):
+        intents.append("market")
+
+    if any(t in q_lower for t in router.PORTFOLIO_STRONG):
+        intents.append("portfolio")
+    elif router._has_ticker_like_token(q) and any(w in q_lower for w in router.PORTFOLIO_HINT_WORDS):
+        intents.append("portfolio")
+    elif any(t in q_lower for t in router.DIVERSIFICATION_WORDS) and any(
+        t in q_lower for t in router.USER_CONTEXT_WORDS
+    ):
+        intents.append("portfolio")
+
+    words = set(re.findall(r"[a-z]+", q_lower))
+    if words & set(router.GOAL_TRIGGERS + router.SAVING_TRIGGERS):
+        intents.append("goals")
+    elif router._GOAL_WEAK_RE.search(q_lower) and (not intents or router._GOAL_HORIZON_RE.search(q_lower)):
+        intents.append("goals")
+
+    if not intents:
+        intents.append("finance_qa")
+    return intents
+
+
+def synthetic_log(n: int, repeat: float = 1.0, seed: int = 7) -> List[str]:
+    """
+    n queries drawn from about n / repeat distinct ones (repeat=1: all distinct).
+    """
+    rng = random.Random(seed)
+    tickers = TICKERS + _listed_symbols()
+    target = max(1, int(n / max(repeat, 1.0)))
+    distinct: Dict[str, None] = {}
+    for _ in range(target * 20):
+        if len(distinct) >= target:
+            break
+        distinct[rng.choice(TEMPLATES).format(
+            ticker=rng.choice(tickers),
+            ticker2=rng.choice(tickers),
+            amount=rng.randint(100, 2_000_000),
+            months=rng.randint(1, 480),
+            bps=rng.randint(5, 400),
+            word=rng.choice(WORDS),
+        )] = None
+    pool = list(distinct)
+    if len(pool) >= n:
+        return pool[:n]
+    return pool + [rng.choice(pool) for _ in range(n - len(pool))]
+
+
+def _timeit(fn, queries: List[str]) -> float:
+    t0 = time.perf_counter()
+    fn(queries)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000, help="synthetic queries (ignored with --log)")
+    ap.add_argument("--repeat", type=float, default=4.0, help="average repeats per synthetic query")
+    ap.add_argument("--log", type=str, default=None, help="query log, one query per line")
+    ap.add_argument("--dedup-size", type=int, default=router.ROUTE_DEDUP_SIZE,
+                    help="distinct queries route_intents remembers")
+    args = ap.parse_args()
+
+    if args.log:
+        queries = Path(args.log).read_text(encoding="utf-8", errors="ignore").splitlines()
+    else:
+        queries = synthetic_log(args.n, repeat=args.repeat)
+    unique = list(dict.fromkeys(queries))
+    print(f"Queries = {len(queries):,} (unique = {len(unique):,}, "
+          f"{len(queries) / max(1, len(unique)):.1f} per distinct query)")
+
+    # ---- equivalence ----
+    mismatches = [q for q in unique if router.detect_intents(q) != reference_detect_intents(q)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} routing mismatches, e.g. {mismatches[:3]}")
+        sys.exit(1)
+    batch = router.route_intents(queries)
+    if batch != [reference_detect_intents(q)[0] for q in queries]:
+        print("❌ route_intents() disagrees with the reference")
+        sys.exit(1)
+    print("✅ Routing decisions identical to the reference implementation")
+
+    # ---- timing: cold = distinct queries only (no dedup hits) ----
+    t_ref = _timeit(lambda qs: [reference_detect_intents(q) for q in qs], unique)
+    t_new = _timeit(lambda qs: [router.detect_intents(q) for q in qs], unique)
+    t_cold = _timeit(router.route_intents, unique)
+    t_log = _timeit(lambda qs: router.route_intents(qs, dedup_size=args.dedup_size), queries)
+
+    routed = []
+    single = router.route_intent
+    router.route_intent = lambda q: routed.append(q) or single(q)
+    try:
+        router.route_intents(queries, dedup_size=args.dedup_size)
+    finally:
+        router.route_intent = single
+    hit_rate = 1.0 - len(routed) / max(1, len(queries))
+
+    n_u = max(1, len(unique))
+    print(f"cold  reference detect_intents : {t_ref / n_u * 1e6:7.2f} µs/query ({n_u / t_ref:>12,.0f} queries/s)")
+    print(f"cold  compiled  detect_intents : {t_new / n_u * 1e6:7.2f} µs/query ({n_u / t_new:>12,.0f} queries/s, "
+          f"{t_ref / t_new:.1f}x)")
+    print(f"cold  route_intents (distinct) : {t_cold / n_u * 1e6:7.2f} µs/query ({n_u / t_cold:>12,.0f} queries/s)")
+    print(f"cached route_intents (full log): {t_log / max(1, len(queries)) * 1e6:7.2f} µs/query "
+          f"({len(queries) / t_log:>12,.0f} queries/s; {hit_rate:.0%} answered from the dedup map, "
+          f"size {args.dedup_size:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# scripts/bench_symbols.py
+"""
+Ticker extraction: previous heuristics vs the validated symbol index.
+
+Runs both on a labeled synthetic query log (or --log path, one query per
+line, unlabeled: only throughput + disagreements are reported), counts
+how many extracted symbols would have been fetched without being the
+ticker asked about (incl. a real ticker missing from the listing), and
+reports throughput.
+
+    python scripts/bench_symbols.py
+    python scripts/bench_symbols.py --n 500000 --log logs/queries.txt
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.market.symbols import get_symbol_index  # noqa: E402
+from src.workflow.router import _has_ticker_like_token  # noqa: E402
+
+# the previous router stopwords / agent extraction
+LEGACY_COMMON_WORDS = frozenset({
+    "THE", "AND", "FOR", "WHY", "WHAT", "WHEN", "WHERE",
+    "HOW", "USE", "WITH", "THIS", "THAT", "FROM", "IN",
+    "ON", "TO", "OF", "IS", "ARE",
+})
+_LEGACY_ROUTER_RE = re.compile(r"\b[A-Z]{2,5}\b")
+_LEGACY_AGENT_RE = re.compile(r"\b[A-Z]{1,5}\b")
+
+TEMPLATES: List[Tuple[str, Optional[str]]] = [
+    ("show me the price trend chart for {t}", "{t}"),
+    ("What is the {t} price trend for 1mo?", "{t}"),
+    ("Is {t} a good stock to buy?", "{t}"),
+    ("how did {name} stock do this year", "{t}"),
+    ("{t} quote please", "{t}"),
+    ("price of ${tl} today", "{t}"),
+    # a real ticker missing from the shipped listing
+    ("TSM price trend", "TSM"),
+    ("WHAT IS THE BEST WAY TO START INVESTING", None),
+    ("How do bonds differ from stocks?", None),
+    ("USE THIS CHART TO EXPLAIN THE TREND", None),
+    ("Is IT a good time to buy the market?", None),
+    ("explain what an ETF is", None),
+    # company / index nicknames in education questions: not a price request
+    ("Should I invest in gold when the stock market falls?", None),
+    ("What is the S&P 500 and how does the stock market work?", None),
+    ("What is a stock split and why do companies like Apple do it?", None),
+]
+TICKERS = [("AAPL", "apple"), ("MSFT", "microsoft"), ("NVDA", "nvidia"), ("SPY", "s&p 500"),
+           ("QQQ", "nasdaq 100"), ("BND", "total bond market"), ("TSLA", "tesla"), ("JPM", "jpmorgan")]
+
+
+def legacy_extract(text: str) -> Optional[str]:
+    """
+    Previous MarketAgent._extract_ticker: first 1–5 letter word of the uppercased query.
+    """
+    m = _LEGACY_AGENT_RE.findall((text or "").upper())
+    return m[0] if m else None
+
+
+def legacy_has_ticker(text: str) -> bool:
+    return any(t not in LEGACY_COMMON_WORDS for t in _LEGACY_ROUTER_RE.findall(text or ""))
+
+
+def synthetic_log(n: int, seed: int = 11) -> List[Tuple[str, Optional[str]]]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        tpl, label = rng.choice(TEMPLATES)
+        t, name = rng.choice(TICKERS)
+        out.append((tpl.format(t=t, tl=t.lower(), name=name), label.format(t=t) if label else None))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--log", type=str, default=None, help="one query per line")
+    args = ap.parse_args()
+
+    index = get_symbol_index()
+    print(f"Symbol index = {len(index):,} symbols")
+
+    if args.log:
+        lines = Path(args.log).read_text(encoding="utf-8").splitlines()
+        log = [(q, None) for q in lines if q.strip()]
+        labeled = False
+    else:
+        log = synthetic_log(args.n)
+        labeled = True
+    queries = [q for q, _ in log]
+    print(f"Queries = {len(queries):,}")
+
+    def new_extract(q):
+        # what the router / MarketAgent run: listed symbols, then ticker-shaped unlisted words
+        found = index.find_in_text(q, limit=1, unlisted=True)
+        return found[0] if found else None
+
+    if labeled:
+        # the agent only extracts from questions that name a symbol
+        named = [(q, label) for q, label in log if label is not None]
+        old_ok = sum(legacy_extract(q) == label for q, label in named)
+        new_ok = sum(new_extract(q) == label for q, label in named)
+        # a symbol is only fetched once the router sends the query to market
+        old_bogus = sum(1 for q, label in log
+                        if legacy_has_ticker(q) and (s := legacy_extract(q)) and s != label)
+        new_bogus = sum(1 for q, label in log
+                        if _has_ticker_like_token(q) and (s := new_extract(q)) and s != label)
+        router_fp = sum(1 for q, label in log if label is None and legacy_has_ticker(q))
+        print(f"agent extraction correct : legacy {old_ok / len(named):6.1%} | index {new_ok / len(named):6.1%}")
+        print(f"wrong symbols fetched    : legacy {old_bogus:,} | index {new_bogus:,}")
+        print(f"router false 'ticker'    : legacy {router_fp:,} | index "
+              f"{sum(1 for q, label in log if label is None and _has_ticker_like_token(q)):,}")
+
+    for label, fn in [("legacy regex extraction", legacy_extract), ("symbol index extraction", new_extract)]:
+        t0 = time.perf_counter()
+        for q in queries:
+            fn(q)
+        dt = time.perf_counter() - t0
+        print(f"{label:24s}: {dt / len(queries) * 1e6:6.2f} µs/query ({len(queries) / dt:,.0f} queries/s)")
+
+
+if __name__ == "__main__":
+    main()
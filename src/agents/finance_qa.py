@@ -5,13 +5,9 @@ from dataclasses import dataclass
 from typing import List
 import os
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
 from src.rag.retriever import Retriever
 from src.rag.prompting import build_rag_context, hits_to_sources
-
-load_dotenv()
+from src.utils.config import load_env
 
 
 @dataclass
@@ -22,6 +18,9 @@ class AgentResult:
 
 class FinanceQAAgent:
     def __init__(self, index_dir: str = "data/index", top_k: int = 3):
+        from openai import OpenAI
+
+        load_env()
         self.retriever = Retriever(index_dir=index_dir)
         self.top_k = top_k
 
@@ -2,16 +2,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import os
 import re
 
 import pandas as pd
-import requests
-from dotenv import load_dotenv
 
-load_dotenv()
+from src.market.analytics import price_matrix, summarize
+from src.market.data import get_market_data
+from src.market.http import BACKGROUND, INTERACTIVE
+from src.market.symbols import get_symbol_index
+from src.utils.cache import mins_ago
+from src.utils.config import load_env
 
 
 @dataclass
@@ -22,16 +26,50 @@ class AgentResult:
     market_fetched_at: Any = None
     market_ticker: Optional[str] = None
     market_is_mock: bool = False
+    # comparisons: market_df is date-aligned closes (Date + one column per ticker)
+    market_tickers: Optional[List[str]] = None
+    market_corr: Any = None
+    # age of the data served (stale data is refreshed in the background)
+    market_age_min: Optional[int] = None
+    market_is_stale: bool = False
+
+
+# beta / relative performance reference
+BENCHMARK = "SPY"
+
+# stats served by the rolling state rather than recomputed per request
+ROLLING_COLUMNS = ["vol_ann_pct", "ma20", "ma50", "ma200"]
+# most symbols compared in one answer
+MAX_COMPARE = 8
+
+STAT_COLUMNS = ["last", "change_pct", "period_pct", "vol_ann_pct",
+                "ma20", "ma50", "ma200", "max_drawdown_pct", "beta"]
+
+
+def _fmt(x: float, spec: str) -> str:
+    return "n/a" if pd.isna(x) else spec.format(x)
 
 
 class MarketAgent:
     def __init__(self):
-        self.alpha_key = os.getenv("ALPHAVANTAGE_API_KEY", "")
+        load_env()
+        # provider / cache / price store shared with the other market callers
+        self.data = get_market_data()
 
     def _extract_ticker(self, text: str) -> str:
-        # match tickers like AAPL, MSFT, SPY, QQQ
-        m = re.findall(r"\b[A-Z]{1,5}\b", (text or "").upper())
-        return m[0] if m else "SPY"
+        # first listed symbol or company name mentioned (AAPL, $msft, "apple")
+        found = self._extract_tickers(text)
+        return found[0] if found else "SPY"
+
+    def _extract_tickers(self, text: str) -> List[str]:
+        """
+        Every symbol the question mentions, in order
+        ("compare AAPL, MSFT and NVDA" -> [AAPL, MSFT, NVDA]): listed
+        symbols and aliases, plus unlisted ticker-shaped uppercase words
+        (TSM), the same rule the router uses. Lowercase words and
+        uppercase stopwords are never fetched.
+        """
+        return get_symbol_index().find_in_text(text, limit=MAX_COMPARE, unlisted=True)
 
     def _extract_period(self, text: str) -> str:
         # match 5d, 1mo, 3mo, 6mo, 1y
@@ -50,54 +88,50 @@ class MarketAgent:
             close.append(close[-1] * 1.002)  # gentle uptrend
         return pd.DataFrame({"Date": dates, "Close": close})
 
-    def _fetch_alpha_vantage_daily(self, ticker: str) -> Optional[pd.DataFrame]:
-        if not self.alpha_key:
-            return None
-
-        url = "https://www.alphavantage.co/query"
-        params = {
-            "function": "TIME_SERIES_DAILY_ADJUSTED",
-            "symbol": ticker,
-            "apikey": self.alpha_key,
-            "outputsize": "compact",
-        }
-
-        r = requests.get(url, params=params, timeout=20)
-        data = r.json()
-
-        ts = data.get("Time Series (Daily)")
-        if not ts:
-            return None
-
-        rows = []
-        for dt, vals in ts.items():
-            # adjusted close preferred
-            c = vals.get("5. adjusted close") or vals.get("4. close")
-            if c is None:
-                continue
-            rows.append({"Date": pd.to_datetime(dt), "Close": float(c)})
-
-        df = pd.DataFrame(rows).sort_values("Date")
-        return df if len(df) else None
-
     def run(self, state: Dict[str, Any]) -> AgentResult:
         q = state.get("user_query") or state.get("query") or ""
-        ticker = self._extract_ticker(q)
-        period = self._extract_period(q)
-        points = self._period_to_points(period)
+        # structured callers (Market tab) pass ticker/period directly
+        req = state.get("market_request") or {}
+        period = req.get("period") or self._extract_period(q)
+        force_refresh = bool(req.get("force_refresh"))
 
-        fetched_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
+        tickers = req.get("tickers") or ([req["ticker"]] if req.get("ticker") else self._extract_tickers(q))
+        if len(tickers) > 1:
+            return self.compare(tickers, period, force_refresh=force_refresh)
+        ticker = tickers[0] if tickers else self._extract_ticker(q)
+        return self.snapshot(ticker, period, force_refresh=force_refresh)
 
-        df = self._fetch_alpha_vantage_daily(ticker)
+    def snapshot(self, ticker: str, period: str = "1mo", force_refresh: bool = False,
+                 priority: int = INTERACTIVE) -> AgentResult:
+        ticker = ticker.strip().upper()
+        points = self._period_to_points(period)
+        df, fetched = self.data.load_daily(ticker, min_points=points, force_refresh=force_refresh, priority=priority)
+        return self._snapshot_result(ticker, period, df, fetched)
+
+    def _snapshot_result(self, ticker: str, period: str, df: Optional[pd.DataFrame],
+                         fetched: datetime) -> AgentResult:
+        points = self._period_to_points(period)
+        fetched_at = fetched.strftime("%Y-%m-%d %I:%M %p")
         is_mock = False
 
         if df is None:
             df = self._mock_df(points)
             is_mock = True
-        else:
-            df = df.tail(points).reset_index(drop=True)
+        history = df
+        # period view: positional slice of the cached series, no copy
+        df = df.iloc[-points:]
+
+        # trend stats over the period; moving averages over the full history
+        frames = {ticker: history}
+        if not is_mock and ticker != BENCHMARK:
+            frames[BENCHMARK] = self.data.peek(BENCHMARK)
+        stats, _corr = summarize(price_matrix(frames), benchmark=BENCHMARK, period_points=points)
+        row = stats.loc[ticker].to_dict()
+        row["ma200"] = float("nan")
+        if not is_mock:
+            # moving averages / 20d volatility from the incremental rolling state
+            row.update(self.data.rolling.update(ticker, history) or {})
 
-        # compute simple trend stats
         start = float(df["Close"].iloc[0])
         end = float(df["Close"].iloc[-1])
         pct = ((end - start) / start * 100.0) if start else 0.0
@@ -109,7 +143,12 @@ class MarketAgent:
             f"Period: **{period}**\n"
             f"Period trend: **{direction} ({pct:.2f}%)**\n"
             f"Start Close: **{start:.2f}**\n"
-            f"End Close: **{end:.2f}**\n\n"
+            f"End Close: **{end:.2f}**\n"
+            f"Volatility (annualized): **{_fmt(row['vol_ann_pct'], '{:.1f}%')}**\n"
+            f"Max drawdown: **{_fmt(row['max_drawdown_pct'], '{:.2f}%')}**\n"
+            f"20d / 50d / 200d average: **{_fmt(row['ma20'], '{:.2f}')} / {_fmt(row['ma50'], '{:.2f}')}"
+            f" / {_fmt(row['ma200'], '{:.2f}')}**\n"
+            f"Beta vs {BENCHMARK}: **{_fmt(row['beta'], '{:.2f}')}**\n\n"
             f"Educational note: Trends describe past movement; they do not predict future performance."
         )
 
@@ -120,4 +159,154 @@ class MarketAgent:
             market_fetched_at=fetched_at,
             market_ticker=ticker,
             market_is_mock=is_mock,
+            market_age_min=None if is_mock else mins_ago(fetched),
+            market_is_stale=not is_mock and self.data.cache.is_stale(fetched),
+        )
+
+    def snapshot_many(
+        self,
+        tickers: Iterable[str],
+        period: str = "1mo",
+        force_refresh: bool = False,
+        max_workers: Optional[int] = None,
+        priority: int = BACKGROUND,
+        local_only: bool = False,
+    ) -> Iterator[Tuple[str, AgentResult]]:
+        """
+        Batch market fetch for structured callers (no routing / graph round trip).
+        Bulk providers download every ticker in one request; otherwise fetches
+        concurrently with bounded parallelism and yields (ticker, result) as
+        each one completes.
+        Queued behind interactive lookups for the API quota by default.
+
+        local_only: serve only what is already in memory / the price store
+        (kept warm by the prefetch scheduler); tickers with nothing local
+        are skipped.
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        if not tickers:
+            return
+
+        if local_only:
+            points = self._period_to_points(period)
+            for t in tickers:
+                hit = self.data.read_local(t, min_points=points)
+                if hit is not None:
+                    yield t, self._snapshot_result(t, period, *hit)
+            return
+
+        if self.data.provider.supports_bulk:
+            points = self._period_to_points(period)
+            loaded = self.data.load_daily_many(
+                tickers, min_points=points, force_refresh=force_refresh, priority=priority
+            )
+            for t in tickers:
+                df, fetched = loaded[t]
+                yield t, self._snapshot_result(t, period, df, fetched)
+            return
+
+        workers = max_workers or int(os.getenv("MARKET_MAX_WORKERS", "4"))
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(tickers))) as pool:
+            futures = {pool.submit(self.snapshot, t, period, force_refresh, priority): t for t in tickers}
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
+
+    def analytics(self, tickers: Iterable[str], period: str = "1mo") -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Stats table and rolling return correlations for many tickers from
+        the history already on hand (cache / price store; no downloads).
+        Moving averages, volatility and correlations come from the
+        incremental rolling state, so a rerun only feeds the new bars.
+        Returns (stats, correlations); tickers without data are left out.
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        frames = {t: self.data.peek(t) for t in tickers}
+        if BENCHMARK not in frames:
+            frames[BENCHMARK] = self.data.peek(BENCHMARK)
+        prices = price_matrix(frames)
+        stats, _corr = summarize(prices, benchmark=BENCHMARK, period_points=self._period_to_points(period))
+        keep = [t for t in tickers if t in stats.index]
+
+        rolling = pd.DataFrame.from_dict(
+            {t: self.data.rolling.update(t, frames[t]) for t in keep}, orient="index", columns=ROLLING_COLUMNS
+        )
+        stats = stats.loc[keep].drop(columns=ROLLING_COLUMNS, errors="ignore").join(rolling)
+        corr = self.data.rolling.correlation(prices[keep]) if keep else pd.DataFrame()
+        return stats[STAT_COLUMNS], corr
+
+    def compare(self, tickers: Iterable[str], period: str = "1mo", force_refresh: bool = False,
+                priority: int = INTERACTIVE) -> AgentResult:
+        """
+        Side-by-side view of several tickers from one batched fetch:
+        date-aligned closes, performance normalized to the period start and
+        return correlations.
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        points = self._period_to_points(period)
+        loaded = self.data.load_daily_many(tickers, min_points=points, force_refresh=force_refresh, priority=priority)
+
+        frames = {t: loaded[t][0] for t in tickers if loaded[t][0] is not None}
+        prices = price_matrix(frames)
+        # a series without a single close in the period is reported, not shown
+        has_data = prices.iloc[-points:].notna().any()
+        shown = [t for t in frames if has_data.get(t, False)]
+        missing = [t for t in tickers if t not in shown]
+        is_mock = not shown
+        if is_mock:
+            frames = {t: self._mock_df(points) for t in tickers}
+            prices = price_matrix(frames)
+            shown, missing = list(frames), []
+        else:
+            prices = prices[shown]
+        fetched = min((loaded[t][1] for t in tickers if loaded[t][1] is not None), default=None) or datetime.now()
+
+        stats, corr = summarize(prices, benchmark=BENCHMARK, period_points=points)
+        aligned = prices.iloc[-points:]
+
+        lines = [
+            "**Market Comparison (Education Only)**\n",
+            f"Period: **{period}** · normalized to 100 at the period start\n",
+            "| Ticker | Start → End | Normalized | Period % | Volatility | Max drawdown |",
+            "|---|---|---|---|---|---|",
+        ]
+        for t in stats.sort_values("period_pct", ascending=False).index:
+            col = aligned[t].dropna()
+            row = stats.loc[t]
+            lines.append(
+                f"| **{t}** | {col.iloc[0]:.2f} → {col.iloc[-1]:.2f} | {100.0 + row['period_pct']:.1f} "
+                f"| {row['period_pct']:+.2f}% | {_fmt(row['vol_ann_pct'], '{:.1f}%')} "
+                f"| {_fmt(row['max_drawdown_pct'], '{:.2f}%')} |"
+            )
+
+        ranked = stats["period_pct"].dropna().sort_values()
+        if len(ranked) > 1:
+            lines.append(
+                f"\nBest: **{ranked.index[-1]}** ({ranked.iloc[-1]:+.2f}%) · "
+                f"Worst: **{ranked.index[0]}** ({ranked.iloc[0]:+.2f}%)"
+            )
+
+        lines += ["\n**Return correlations**\n", "| | " + " | ".join(shown) + " |",
+                  "|---" * (len(shown) + 1) + "|"]
+        for t in shown:
+            lines.append(f"| **{t}** | " + " | ".join(_fmt(corr.loc[t, u], "{:.2f}") for u in shown) + " |")
+
+        if missing:
+            lines.append(f"\nNo data available for: {', '.join(missing)}")
+        lines.append(
+            "\nEducational note: Past relative performance does not predict future returns; "
+            "correlations change over time."
+        )
+
+        return AgentResult(
+            answer="\n".join(lines),
+            sources=[],
+            market_df=aligned.reset_index(),
+            market_fetched_at=fetched.strftime("%Y-%m-%d %I:%M %p"),
+            market_ticker=", ".join(shown),
+            market_is_mock=is_mock,
+            market_tickers=shown,
+            market_corr=corr,
+            market_age_min=None if is_mock else mins_ago(fetched),
+            market_is_stale=not is_mock and self.data.cache.is_stale(fetched),
         )
@@ -1,10 +1,73 @@
 # src/agents/portfolio.py
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+import numpy as np
 import pandas as pd
 
+from src.market.http import INTERACTIVE
+from src.portfolio.engine import PortfolioEngine
+from src.portfolio.ledger import CLOSED_EPS, PositionStore
+from src.portfolio.frontier import efficient_frontier
+from src.portfolio.pricing import apply_prices, quotes_from_history
+from src.portfolio.rebalance import DRIFT_BAND, rebalance_positions
+from src.portfolio.risk import history_prices, load_history, portfolio_risk
+
+# what people call an asset class -> one key per class; held class labels
+# go through the same map, so "stocks" finds "Equity" and "bonds" "Bond ETF"
+CLASS_ALIASES = {
+    "equity": "equity", "equities": "equity", "stock": "equity", "stocks": "equity",
+    "bond": "bond", "bonds": "bond", "bond etf": "bond", "bond etfs": "bond", "fixed income": "bond",
+    "etf": "etf", "etfs": "etf",
+    "crypto": "crypto", "cryptocurrency": "crypto",
+    "commodity": "commodity", "commodities": "commodity",
+    "real estate": "real estate", "reit": "real estate", "reits": "real estate",
+    "cash": "cash",
+}
+_NAME = r"(fixed income|real estate|bond etfs?|[A-Za-z][A-Za-z.]*)"
+PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+# name after a percentage ("60% stocks", "40% in bonds") or before it ("SPY 40%", "SPY is 40%", "bond: 30%")
+NAME_AFTER = re.compile(r"\s*(?:in\s+|of\s+)?" + _NAME, re.IGNORECASE)
+NAME_BEFORE = re.compile(_NAME + r"(?:\s+(?:is|at|to))?\s*[:=]?\s*$", re.IGNORECASE)
+
+
+def _class_key(name: str) -> str:
+    name = " ".join(str(name).lower().split())
+    return CLASS_ALIASES.get(name, name)
+
+
+def _target_pairs(query: str, known) -> List[Tuple[str, float]]:
+    """
+    (name, percent) for every percentage in the query. Each takes the name
+    after it or the one before it, whichever orientation lets more names
+    pass known(); a percentage whose name does not resolve falls back to
+    its other side if that name is unclaimed, else keeps the unknown name
+    so it can be reported.
+    """
+    sides = []
+    for m in PERCENT.finditer(query):
+        after = NAME_AFTER.match(query, m.end())
+        before = NAME_BEFORE.search(query[:m.start()])
+        sides.append((float(m.group(1)),
+                      (after.group(1), after.start(1)) if after else None,
+                      (before.group(1), before.start(1)) if before else None))
+    hits = [sum(1 for side in sides if side[i] and known(side[i][0])) for i in (1, 2)]
+    first = 1 if hits[0] >= hits[1] else 2
+
+    pairs, claimed = [], set()
+    for side in sides:
+        chosen = side[first]
+        other = side[3 - first]
+        if (chosen is None or not known(chosen[0]) or chosen[1] in claimed) and other and known(other[0]) \
+                and other[1] not in claimed:
+            chosen = other
+        chosen = chosen or other
+        if chosen is not None:
+            claimed.add(chosen[1])
+            pairs.append((chosen[0], side[0]))
+    return pairs
 
 @dataclass
 class AgentResult:
@@ -16,69 +79,249 @@ class AgentResult:
 
 class PortfolioAgent:
     """
-    Demo portfolio agent (education only).
-    Replace the holdings with your real data later (CSV/DB/user input).
+    Portfolio agent (education only).
+    Reads positions imported from broker exports (PositionStore); falls back
+    to demo holdings when nothing has been imported.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, data: Any = None, positions: PositionStore = None):
+        # market data path for live prices (shared MarketData unless injected)
+        self.data = data
+        self.positions = positions or PositionStore()
 
     def _load_demo_portfolio(self) -> pd.DataFrame:
         # ✅ You can later replace this with real portfolio data source
+        # Price is the fallback when no market history is available
         rows = [
-            {"Asset": "MSFT", "Value": 2000.0, "Class": "Equity"},
-            {"Asset": "AAPL", "Value": 1500.0, "Class": "Equity"},
-            {"Asset": "SPY",  "Value": 1800.0, "Class": "ETF"},
-            {"Asset": "BND",  "Value": 1000.0, "Class": "Bond ETF"},
+            {"Asset": "MSFT", "Shares": 5.0, "Price": 400.0, "Class": "Equity"},
+            {"Asset": "AAPL", "Shares": 8.0, "Price": 187.5, "Class": "Equity"},
+            {"Asset": "SPY",  "Shares": 3.75, "Price": 480.0, "Class": "ETF"},
+            {"Asset": "BND",  "Shares": 12.5, "Price": 80.0, "Class": "Bond ETF"},
         ]
         return pd.DataFrame(rows)
 
-    def _diversification_score(self, df: pd.DataFrame) -> float:
-        # simple heuristic: more spread = better; concentration reduces score
-        total = df["Value"].sum()
-        if total <= 0:
-            return 0.0
-        w = (df["Value"] / total).values
-        # Herfindahl-Hirschman Index
-        hhi = float((w ** 2).sum())
-        score = (1.0 - hhi) * 100.0  # higher = more diversified
-        return max(0.0, min(100.0, score))
+    def _load_portfolio(self) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """
+        Open imported positions summed across accounts (Price = average cost,
+        the fallback when no market history is available) plus realized
+        gain / dividends totals; demo holdings and {} when nothing is imported.
+        """
+        pos = self.positions.positions(open_only=False)
+        if pos.empty:
+            return self._load_demo_portfolio(), {}
+        ledger = {
+            "realized_gain": float(pos["realized_gain"].sum()),
+            "dividends": float(pos["dividends"].sum()),
+        }
+        pos = pos[pos["shares"] > CLOSED_EPS]
+        df = pos.groupby("ticker", sort=False).agg(
+            Shares=("shares", "sum"), Cost=("cost_basis", "sum"), Class=("asset_class", "first"),
+        ).reset_index().rename(columns={"ticker": "Asset"})
+        df["Price"] = df["Cost"] / df["Shares"]
+        df["Class"] = df["Class"].fillna("Unclassified")
+        ledger["cost_basis"] = float(df["Cost"].sum())
+        return df, ledger
+
+    def _price_holdings(self, df: pd.DataFrame, history: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Latest close per holding, taken from the history loaded for risk.
+        """
+        return apply_prices(df, quotes_from_history(history), ticker_col="Asset", type_col="Class")
+
+    def _risk_lines(self, prices: pd.DataFrame, values: Dict[str, float], total: float,
+                    summary: Dict[str, Any]) -> str:
+        """
+        Annualized volatility and 1-day 95% VaR / CVaR (historical, normal,
+        Monte Carlo) from the holdings' daily closes; empty without history.
+        """
+        report = portfolio_risk(prices, values, total_value=total)
+        if report is None:
+            return ""
+        summary["vol_ann_pct"] = report.vol_ann_pct
+        summary["var_95"] = dict(report.var)
+        summary["cvar_95"] = dict(report.cvar)
+        methods = " · ".join(
+            f"{label} **${report.var[m]:,.0f}** / ${report.cvar[m]:,.0f}"
+            for m, label in (("historical", "historical"), ("parametric", "normal"), ("monte_carlo", "Monte Carlo"))
+            if m in report.var
+        )
+        missing = f" ({', '.join(report.missing)} not covered)" if report.missing else ""
+        return (
+            f"- Volatility (annualized): **{report.vol_ann_pct:.1f}%**{missing}\n"
+            f"- 1-day 95% VaR / CVaR: {methods}\n"
+        )
+
+    def _frontier_lines(self, prices: pd.DataFrame, values: Dict[str, float], summary: Dict[str, Any]) -> str:
+        """
+        Where the current mix sits against the mean-variance frontier of
+        the same holdings; empty without enough history.
+        """
+        front = efficient_frontier(prices, values)
+        if front is None or front.current_return is None:
+            return ""
+        best_vol = front.efficient_vol(front.current_return)
+        summary["frontier"] = {
+            "current_return_pct": front.current_return * 100.0,
+            "current_vol_pct": front.current_vol * 100.0,
+            "efficient_vol_pct": best_vol * 100.0,
+            "min_var_vol_pct": front.min_var_vol * 100.0,
+        }
+        reach = f"; the frontier reaches that return at **{best_vol:.1%}**" if np.isfinite(best_vol) else ""
+        return (
+            f"- Efficient frontier: current mix **{front.current_return:.1%}** return at "
+            f"**{front.current_vol:.1%}** volatility{reach} (historical estimates, shorting allowed)\n"
+        )
+
+    def _rebalance_targets(self, query: str, df: pd.DataFrame) -> Tuple[Dict[str, float], str, List[str]]:
+        """
+        Target weights from "60% stocks, 40% bonds" / "SPY is 50%" in the
+        question, matched to held tickers or whole asset class names
+        (CLASS_ALIASES). Weight left unassigned stays with the unnamed
+        holdings in their current proportions; a named "cash" share stays
+        uninvested. Equal weight per asset class when no targets are given.
+
+        Returns (targets, by, problems); problems (unmatched names, mixed
+        tickers and classes, more than 100%) means no plan should be made.
+        """
+        value = df.groupby("Asset", sort=False)["Value"].sum()
+        class_value = df.groupby("Class", sort=False)["Value"].sum()
+        tickers = {str(t).upper(): t for t in value.index}
+        class_keys = {_class_key(c) for c in class_value.index} | {"cash"}
+
+        pairs = _target_pairs(query or "", lambda w: w.upper() in tickers or _class_key(w) in class_keys)
+        if not pairs:
+            names = sorted(class_value.index)
+            return {c: 1.0 / len(names) for c in names}, "class", []
+
+        by_ticker, by_class, cash, unmatched = {}, {}, 0.0, []
+        for word, pct in pairs:
+            weight = pct / 100.0
+            key = _class_key(word)
+            labels = [c for c in class_value.index if _class_key(c) == key]
+            if word.upper() in tickers:
+                t = tickers[word.upper()]
+                by_ticker[t] = by_ticker.get(t, 0.0) + weight
+            elif labels:
+                # several held labels for one class ("Stock", "Equity"): split by current value
+                held = class_value[labels]
+                split = held / held.sum() if held.sum() > 0 else pd.Series(1.0 / len(labels), index=labels)
+                for c in labels:
+                    by_class[c] = by_class.get(c, 0.0) + weight * float(split[c])
+            elif key == "cash":
+                cash += weight
+            else:
+                unmatched.append(word)
+
+        problems = []
+        if unmatched:
+            problems.append(f"could not match {', '.join(repr(w) for w in unmatched)} to a holding or asset class")
+        if by_ticker and by_class:
+            problems.append("targets mix tickers and asset classes; use one or the other")
+        named = sum(by_ticker.values()) + sum(by_class.values()) + cash
+        if named > 1.0 + 1e-9:
+            problems.append(f"targets add up to {named * 100:.0f}%, more than 100%")
+        if problems:
+            return {}, "ticker" if by_ticker else "class", problems
+
+        targets, current = (by_ticker, value) if by_ticker else (by_class, class_value)
+        rest = current.drop(list(targets))
+        if named < 1.0 - 1e-9 and rest.sum() > 0:
+            for k, v in (rest / rest.sum() * (1.0 - named)).items():
+                targets[k] = float(v)
+        return targets, "ticker" if by_ticker else "class", []
+
+    def _rebalance_lines(self, query: str, df: pd.DataFrame, summary: Dict[str, Any]) -> str:
+        """
+        Trade list (whole shares, DRIFT_BAND drift band) toward the targets
+        in the question, funded by sells.
+        """
+        targets, by, problems = self._rebalance_targets(query, df)
+        if problems:
+            summary["rebalance_problems"] = problems
+            return (
+                f"\n**Rebalancing:** {'; '.join(problems)}, so no trades were planned.\n"
+                "- Name held tickers or asset classes (stocks, bonds, ETF, cash) with percentages, "
+                "e.g. \"60% stocks, 40% bonds\" or \"SPY is 40%\".\n"
+            )
+        positions = pd.DataFrame({"account": "portfolio", "ticker": df["Asset"], "shares": df["Shares"],
+                                  "asset_class": df["Class"]})
+        plan = rebalance_positions(positions, dict(zip(df["Asset"], df["Price"])), targets, by=by)
+        trades = plan.trade_list()
+        summary["rebalance_targets"] = targets
+        summary["rebalance_trades"] = trades.to_dict("records")
+
+        goal = ", ".join(f"{k} {v * 100:.0f}%" for k, v in targets.items())
+        lines = f"\n**Rebalancing toward** {goal} (by {by}, ±{DRIFT_BAND * 100:.0f} pt drift band)\n"
+        if trades.empty:
+            drifted = [t for t, d in zip(plan.tickers, plan.weights_before[0] - plan.targets[0]) if abs(d) > DRIFT_BAND]
+            if drifted:
+                return lines + (f"- No trades fit: {', '.join(drifted)} drifted past the band, but no whole-share "
+                                "trade can be funded from cash and sells.\n")
+            return lines + "- No trades needed: every holding is within its drift band.\n"
+        for t in trades.itertuples(index=False):
+            lines += f"- {t.action} **{t.shares:g} {t.ticker}** (~${t.value:,.0f})\n"
+        return lines + f"- Cash left after trades: ${plan.cash_after[0]:,.2f}\n"
 
     def run(self, state: Dict[str, Any]) -> AgentResult:
-        df = self._load_demo_portfolio()
+        holdings, ledger = self._load_portfolio()
+        # one batched interactive load: latest closes and risk history both
+        # come from it, so a cold ticker is downloaded once (compact; the
+        # full lookback backfills in the background)
+        history = load_history(holdings["Asset"], data=self.data, priority=INTERACTIVE)
+        df = self._price_holdings(holdings, history)
 
-        total = float(df["Value"].sum())
-        df["AllocationPct"] = (df["Value"] / total * 100.0).round(2)
+        engine = PortfolioEngine.from_frame(df, ticker_col="Asset", class_col="Class", type_col=None)
+        df["Value"] = engine.values
+        df["AllocationPct"] = engine.allocation_pct()
+        summary = engine.summary()
+        total = summary["total_value"]
 
-        top_row = df.sort_values("Value", ascending=False).iloc[0]
-        top_asset = str(top_row["Asset"])
-        top_pct = float(top_row["AllocationPct"])
+        n_live = int((df["PriceSource"] == "live").sum())
+        as_of = df["PriceAsOf"].max()
 
-        unique_assets = int(df["Asset"].nunique())
-        asset_classes = int(df["Class"].nunique())
+        summary["priced_live"] = n_live
+        summary["prices_as_of"] = None if pd.isna(as_of) else f"{as_of:%Y-%m-%d}"
+        fallback = "average cost" if ledger else "demo prices"
+        if n_live == len(df):
+            pricing = f"latest closes as of {summary['prices_as_of']}"
+        elif n_live:
+            pricing = f"latest closes for {n_live} of {len(df)} holdings, {fallback} for the rest"
+        else:
+            pricing = f"{fallback}, no market data available"
 
-        score = self._diversification_score(df)
+        ledger_lines = ""
+        if ledger:
+            summary.update(ledger)
+            unrealized = total - ledger["cost_basis"]
+            summary["unrealized_gain"] = unrealized
+            ledger_lines = (
+                f"- Cost basis: **${ledger['cost_basis']:,.2f}** (unrealized {unrealized:+,.2f})\n"
+                f"- Realized gain: **${ledger['realized_gain']:,.2f}** · dividends **${ledger['dividends']:,.2f}**\n"
+            )
 
-        summary = {
-            "total_value": total,
-            "top_asset": top_asset,
-            "top_pct": top_pct,
-            "unique_assets": unique_assets,
-            "asset_classes": asset_classes,
-            "diversification_score": round(score, 1),
-        }
+        values = df.groupby("Asset", sort=False)["Value"].sum().to_dict()
+        prices = history_prices(history)
+        risk_lines = self._risk_lines(prices, values, total, summary) + self._frontier_lines(prices, values, summary)
+        query = state.get("user_query") or state.get("query") or ""
+        rebalance_lines = self._rebalance_lines(query, df, summary) if "rebalanc" in query.lower() else ""
 
         answer = (
             "**Portfolio Summary (Education Only)**\n\n"
-            f"- Total value: **${total:,.2f}**\n"
-            f"- Largest holding: **{top_asset}** ({top_pct:.1f}%)\n"
-            f"- Unique assets: **{unique_assets}**\n"
-            f"- Unique asset classes: **{asset_classes}**\n"
-            f"- Diversification score (0–100): **{summary['diversification_score']}**\n\n"
+            f"- Total value: **${total:,.2f}** ({pricing})\n"
+            f"- Largest holding: **{summary['top_asset']}** ({summary['top_pct']:.1f}%)\n"
+            f"- Unique assets: **{summary['unique_assets']}**\n"
+            f"- Unique asset classes: **{summary['asset_classes']}**\n"
+            f"- Diversification score (0–100): **{summary['diversification_score']}**\n"
+            f"{ledger_lines}"
+            f"{risk_lines}"
+            f"{rebalance_lines}\n"
             "Tip: Diversification tends to improve when allocation is spread across multiple assets/classes "
             "and no single holding dominates."
         )
 
+        if not ledger:
+            answer += "\n\n_Showing demo holdings: import a broker transaction CSV in the Portfolio tab._"
+
         return AgentResult(
             answer=answer,
             sources=[],  # portfolio agent is not KB-based by default
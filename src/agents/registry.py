@@ -1,22 +1,115 @@
 # src/agents/registry.py
+from __future__ import annotations
 
-from src.agents.finance_qa import FinanceQAAgent
-from src.agents.market import MarketAgent
-from src.agents.portfolio import PortfolioAgent
-from src.agents.goals import GoalsAgent
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
 
-def build_agents():
+def _finance_qa():
+    from src.agents.finance_qa import FinanceQAAgent
+    return FinanceQAAgent()
+
+
+def _market():
+    from src.agents.market import MarketAgent
+    return MarketAgent()
+
+
+def _portfolio():
+    from src.agents.portfolio import PortfolioAgent
+    return PortfolioAgent()
+
+
+def _goals():
+    from src.agents.goals import GoalsAgent
+    return GoalsAgent()
+
+
+AGENT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "finance_qa": _finance_qa,
+    "market": _market,
+    "portfolio": _portfolio,
+    "goals": _goals,
+}
+
+
+class AgentRegistry(Mapping):
+    """
+    Read-only mapping of agent name -> agent, built on first access.
+
+    Each agent is constructed at most once (per-name lock), so a session that
+    only uses the Goal Planner never imports the RAG stack or OpenAI client.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = dict(factories)
+        self._agents: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in self._factories}
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self._factories:
+            raise KeyError(name)
+
+        with self._locks[name]:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = self._factories[name]()
+                self._agents[name] = agent
+        return agent
+
+    def __contains__(self, name: object) -> bool:
+        # Mapping's default would build the agent just to answer `in`
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._agents
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Builds agents ahead of first use (all of them by default).
+        With background=True this returns the daemon thread doing the work.
+        """
+        names = list(names) if names is not None else list(self._factories)
+
+        def _build_all():
+            for name in names:
+                try:
+                    self[name]
+                except Exception:
+                    # not fatal here: the same error surfaces on first real use
+                    pass
+
+        if not background:
+            _build_all()
+            return None
+
+        t = threading.Thread(target=_build_all, name="agent-warm-up", daemon=True)
+        t.start()
+        return t
+
+
+def build_agents(warm_up: bool = False) -> AgentRegistry:
     """
     Central agent registry.
 
     IMPORTANT:
     - Agents must NOT import this file (no: from src.agents.registry import build_agents)
     - Only UI / graph code should call build_agents()
+
+    Agents are built lazily on first use; warm_up=True builds them all in a
+    background thread instead.
     """
-    return {
-        "finance_qa": FinanceQAAgent(),
-        "market": MarketAgent(),
-        "portfolio": PortfolioAgent(),
-        "goals": GoalsAgent(),
-    }
+    agents = AgentRegistry(AGENT_FACTORIES)
+    if warm_up:
+        agents.warm_up()
+    return agents
@@ -1,11 +1,12 @@
 # src/core/llm.py
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
 
-load_dotenv()
+from src.utils.config import load_env
 
-def get_client() -> OpenAI:
+def get_client():
+    from openai import OpenAI
+
+    load_env()
     return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def chat_completion(messages: list[dict], temperature: float = 0.2) -> str:
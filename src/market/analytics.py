@@ -0,0 +1,168 @@
+# src/market/analytics.py
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+VOL_WINDOW = 20
+MA_WINDOWS = (20, 50)
+
+STAT_COLUMNS = [
+    "last", "change_pct", "period_pct", "vol_ann_pct",
+    "ma20", "ma50", "max_drawdown_pct", "beta",
+]
+
+
+def price_matrix(frames: Dict[str, Optional[pd.DataFrame]], column: str = "Close") -> pd.DataFrame:
+    """
+    Aligns per-ticker daily frames into one date x ticker price matrix.
+    Dates are the union of all series; gaps inside a series (holidays on one
+    exchange, missing bars) are forward-filled, leading gaps stay NaN.
+    """
+    cols = {
+        t: pd.Series(df[column].to_numpy(dtype=np.float64, copy=False), index=pd.DatetimeIndex(df["Date"]))
+        for t, df in frames.items()
+        if df is not None and len(df) and column in df.columns
+    }
+    if not cols:
+        return pd.DataFrame()
+    prices = pd.concat(cols, axis=1, sort=True)
+    prices.index.name = "Date"
+    return prices.ffill()
+
+
+def simple_returns(p: np.ndarray) -> np.ndarray:
+    """
+    Daily returns, (T-1) x N; NaN where either bar is missing.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return p[1:] / p[:-1] - 1.0
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trailing-window sums and valid counts for every row, NaNs skipped.
+    One cumsum per column instead of a Python loop over windows.
+    """
+    valid = ~np.isnan(x)
+    zero = np.zeros((1, x.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(np.where(valid, x, 0.0), axis=0)])
+    cn = np.concatenate([zero, np.cumsum(valid, axis=0)])
+    lag = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+    return cs[1:] - cs[lag], cn[1:] - cn[lag]
+
+
+def moving_average(p: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average (T x N); NaN until a full window is available.
+    """
+    s, n = _rolling_sum(p, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(n == window, s / n, np.nan)
+
+
+def rolling_volatility(r: np.ndarray, window: int = VOL_WINDOW, annualize: bool = True) -> np.ndarray:
+    """
+    Rolling standard deviation of returns (sample, ddof=1), annualized by default.
+    """
+    s, n = _rolling_sum(r, window)
+    s2, _ = _rolling_sum(r * r, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (s2 - s * s / n) / (n - 1)
+        vol = np.sqrt(np.clip(var, 0.0, None))
+    vol = np.where(n == window, vol, np.nan)
+    return vol * np.sqrt(TRADING_DAYS) if annualize else vol
+
+
+def max_drawdown(p: np.ndarray) -> np.ndarray:
+    """
+    Largest peak-to-trough decline per column (negative fraction, e.g. -0.12).
+    """
+    peak = np.fmax.accumulate(p, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nanmin(p / peak - 1.0, axis=0) if len(p) else np.full(p.shape[1], np.nan)
+
+
+def pairwise_moments(r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Covariance and per-pair variance over pairwise-complete observations,
+    via a handful of matrix products (no per-pair loop).
+    cov[i, j] = cov(r_i, r_j); var[i, j] = var(r_i) on the rows where r_j is also valid.
+    """
+    m = (~np.isnan(r)).astype(np.float64)
+    x = np.where(m > 0, r, 0.0)
+    n = m.T @ m
+    s1 = x.T @ m                 # s1[i, j] = sum of r_i where both valid
+    s2 = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (sxy - s1 * s1.T / n) / (n - 1)
+        var = (s2 - s1 * s1 / n) / (n - 1)
+    return cov, var
+
+
+def correlation(r: np.ndarray) -> np.ndarray:
+    cov, var = pairwise_moments(r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cov / np.sqrt(var * var.T)
+
+
+def summarize(
+    prices: pd.DataFrame,
+    benchmark: Optional[str] = "SPY",
+    period_points: Optional[int] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Stats for every ticker in an aligned price matrix, computed column-wise.
+
+    Moving averages and the latest bar use the whole matrix; period return,
+    volatility, drawdown, beta and correlations use the trailing
+    period_points bars (all bars when None).
+    Returns (stats: ticker x STAT_COLUMNS, correlations: ticker x ticker).
+    """
+    tickers = list(prices.columns)
+    if prices.empty:
+        return pd.DataFrame(columns=STAT_COLUMNS), pd.DataFrame()
+
+    p = prices.to_numpy(dtype=np.float64)
+    win = p[-period_points:] if period_points else p
+    r = simple_returns(win)
+    cols = np.arange(p.shape[1])
+
+    last = p[-1]
+    prev = p[-2] if len(p) > 1 else np.full_like(last, np.nan)
+    first = win[np.argmax(~np.isnan(win), axis=0), cols]
+
+    cov, var = pairwise_moments(r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (last / prev - 1.0) * 100.0
+        period = (win[-1] / first - 1.0) * 100.0
+        corr = cov / np.sqrt(var * var.T)
+
+    if benchmark in tickers:
+        b = tickers.index(benchmark)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = cov[:, b] / var[b, :]
+    else:
+        beta = np.full(len(tickers), np.nan)
+
+    vol_window = min(VOL_WINDOW, max(len(r), 2))
+    vol = rolling_volatility(r[-vol_window:], vol_window)
+    stats = pd.DataFrame(
+        {
+            "last": last,
+            "change_pct": change,
+            "period_pct": period,
+            "vol_ann_pct": (vol[-1] if len(vol) else np.full(len(tickers), np.nan)) * 100.0,
+            # only the latest value is shown: average the trailing window only
+            "ma20": moving_average(p[-MA_WINDOWS[0]:], MA_WINDOWS[0])[-1],
+            "ma50": moving_average(p[-MA_WINDOWS[1]:], MA_WINDOWS[1])[-1],
+            "max_drawdown_pct": max_drawdown(win) * 100.0,
+            "beta": beta,
+        },
+        index=pd.Index(tickers, name="Ticker"),
+    )
+    return stats, pd.DataFrame(corr, index=tickers, columns=tickers)
@@ -0,0 +1,195 @@
+# src/market/cache.py
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from src.utils.cache import TTLCache, is_fresh
+
+# per-key fetch locks: a fixed pool indexed by hash(key), so the lock map
+# never grows with the number of tickers seen
+LOCK_STRIPES = 64
+# expired / surplus disk rows are deleted at most this often (on write)
+SWEEP_INTERVAL_S = 300
+MAX_DISK_ROWS = 10_000
+
+
+class SQLiteCacheBackend:
+    """
+    Optional cross-process layer: pickled values in one SQLite file, so several
+    Streamlit workers on one host share fetched market data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS market_cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, fetched_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS market_cache_fetched ON market_cache (fetched_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # one short-lived connection per call: safe across threads and processes
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, fetched_at FROM market_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"value": pickle.loads(row[0]), "fetched_at": datetime.fromisoformat(row[1])}
+
+    def set(self, key: str, value: Any, fetched_at: datetime):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO market_cache (key, value, fetched_at) VALUES (?, ?, ?)",
+                (key, blob, fetched_at.isoformat()),
+            )
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM market_cache WHERE key = ?", (key,))
+
+    def sweep(self, older_than: datetime, max_rows: int = MAX_DISK_ROWS) -> int:
+        """
+        Deletes rows fetched before older_than, then the oldest rows beyond
+        max_rows. Returns the number of rows removed.
+        """
+        with self._connect() as conn:
+            n = conn.execute("DELETE FROM market_cache WHERE fetched_at < ?", (older_than.isoformat(),)).rowcount
+            n += conn.execute(
+                "DELETE FROM market_cache WHERE key IN ("
+                " SELECT key FROM market_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (max_rows,),
+            ).rowcount
+        return n
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM market_cache").fetchone()[0]
+
+
+class MarketCache:
+    """
+    Process-wide market data cache keyed by ticker and series
+    (e.g. "AAPL:daily"), shared by every session and agent.
+
+    Two TTLs (stale-while-revalidate):
+    - ttl_minutes (soft): older entries are stale; readers that allow it are
+      still served, while a refresh runs in the background
+    - hard_ttl_minutes: older entries are evicted and never served
+
+    Memory layer: TTLCache with hard TTL + LRU eviction.
+    Optional disk layer (SQLite) shared between processes; writes sweep
+    rows past the hard TTL (and beyond max_disk_rows) every
+    SWEEP_INTERVAL_S.
+    """
+
+    def __init__(self, ttl_minutes: float = 15, maxsize: int = 512, db_path: Optional[str] = None,
+                 hard_ttl_minutes: Optional[float] = None, max_disk_rows: int = MAX_DISK_ROWS):
+        self.ttl_minutes = ttl_minutes
+        self.hard_ttl_minutes = max(hard_ttl_minutes or ttl_minutes, ttl_minutes)
+        self.max_disk_rows = max_disk_rows
+        self._mem = TTLCache(ttl_minutes=self.hard_ttl_minutes, maxsize=maxsize)
+        self._disk = SQLiteCacheBackend(db_path) if db_path else None
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._last_sweep = float("-inf")
+
+    @staticmethod
+    def key(ticker: str, series: str = "daily") -> str:
+        return f"{ticker.strip().upper()}:{series}"
+
+    def lock_for(self, ticker: str, series: str = "daily") -> threading.Lock:
+        """
+        Lock for one key, so concurrent misses for a ticker fetch it only
+        once. Keys share LOCK_STRIPES locks; never hold two at once.
+        """
+        return self._locks[hash(self.key(ticker, series)) % LOCK_STRIPES]
+
+    def is_stale(self, fetched_at: Optional[datetime]) -> bool:
+        return not is_fresh(fetched_at, self.ttl_minutes)
+
+    def is_expired(self, fetched_at: Optional[datetime]) -> bool:
+        return not is_fresh(fetched_at, self.hard_ttl_minutes)
+
+    def get(self, ticker: str, series: str = "daily", allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Returns {"value": ..., "fetched_at": datetime} or None when missing,
+        expired, or stale (unless allow_stale).
+        """
+        key = self.key(ticker, series)
+        entry = self._mem.get(key)
+        if entry is None and self._disk is not None:
+            entry = self._disk.get(key)
+            if entry is not None and self.is_expired(entry["fetched_at"]):
+                entry = None
+            if entry is not None:
+                # promote to memory, keeping the original fetch time
+                self._mem.set(key, entry["value"], fetched_at=entry["fetched_at"])
+                entry = self._mem.get(key)
+
+        if entry is None or (not allow_stale and self.is_stale(entry["fetched_at"])):
+            return None
+        return entry
+
+    def set(self, ticker: str, series: str, value: Any, fetched_at: Optional[datetime] = None):
+        key = self.key(ticker, series)
+        fetched_at = fetched_at or datetime.now()
+        self._mem.set(key, value, fetched_at=fetched_at)
+        if self._disk is not None:
+            self._disk.set(key, value, fetched_at)
+            if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL_S:
+                self.sweep()
+
+    def sweep(self) -> int:
+        """
+        Deletes disk rows past the hard TTL / beyond max_disk_rows now.
+        """
+        self._last_sweep = time.monotonic()
+        if self._disk is None:
+            return 0
+        cutoff = datetime.now() - timedelta(minutes=self.hard_ttl_minutes)
+        return self._disk.sweep(cutoff, self.max_disk_rows)
+
+    def invalidate(self, ticker: str, series: str = "daily"):
+        key = self.key(ticker, series)
+        self._mem.delete(key)
+        if self._disk is not None:
+            self._disk.delete(key)
+
+
+_CACHE: Optional[MarketCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_market_cache() -> MarketCache:
+    """
+    The shared MarketCache for this process. Configured from env:
+      MARKET_CACHE_TTL_MIN (soft TTL, default 15),
+      MARKET_CACHE_HARD_TTL_MIN (default 1440), MARKET_CACHE_SIZE (default 512),
+      MARKET_CACHE_DB (SQLite path; unset = memory only),
+      MARKET_CACHE_DB_ROWS (disk row cap, default 10000)
+    """
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = MarketCache(
+                    ttl_minutes=float(os.getenv("MARKET_CACHE_TTL_MIN", "15")),
+                    maxsize=int(os.getenv("MARKET_CACHE_SIZE", "512")),
+                    db_path=os.getenv("MARKET_CACHE_DB") or None,
+                    hard_ttl_minutes=float(os.getenv("MARKET_CACHE_HARD_TTL_MIN", "1440")),
+                    max_disk_rows=int(os.getenv("MARKET_CACHE_DB_ROWS", str(MAX_DISK_ROWS))),
+                )
+    return _CACHE
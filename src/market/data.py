@@ -0,0 +1,256 @@
+# src/market/data.py
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from src.market.cache import MarketCache, get_market_cache
+from src.market.http import BACKGROUND, INTERACTIVE
+from src.market.providers import MarketDataProvider, get_provider
+from src.market.rolling import RollingStats
+from src.market.store import PriceStore
+
+# rows returned upstream for outputsize=compact
+COMPACT_POINTS = 100
+# calendar days a compact download reliably spans (~100 trading days)
+COMPACT_SPAN_DAYS = 140
+
+Loaded = Tuple[Optional[pd.DataFrame], datetime]
+
+
+class MarketData:
+    """
+    Daily price history for any caller (MarketAgent, Market tab, portfolio
+    pricing). Lookup order:
+      1) shared in-memory market cache (one canonical series per ticker)
+      2) local price store, topped up with only the newest bars
+      3) provider download (outputsize=full only when the store can't cover it)
+
+    Stale-while-revalidate: local history younger than the cache's hard TTL
+    is served immediately; past the soft TTL a background refresh is queued
+    (one in flight per ticker). Only missing, too short or expired history
+    waits on the network.
+    """
+
+    def __init__(self, provider: Optional[MarketDataProvider] = None,
+                 cache: Optional[MarketCache] = None, store: Optional[PriceStore] = None):
+        self.provider = provider or get_provider()
+        self.cache = cache or get_market_cache()
+        self.store = store or PriceStore()
+        # incremental MA / volatility / correlation state, persisted next to the store
+        self.rolling = RollingStats(self.store.root / "rolling")
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+        self._inflight: set = set()
+        self._inflight_lock = threading.Lock()
+
+    @staticmethod
+    def _covers(entry: Optional[Dict[str, Any]], min_points: int) -> bool:
+        if entry is None:
+            return False
+        series = entry["value"]
+        # a full download is as long as the history gets
+        return series["outputsize"] == "full" or len(series["df"]) >= min_points
+
+    def _outputsize_for(self, ticker: str, stored: Optional[pd.DataFrame], min_points: int) -> str:
+        """
+        compact (latest ~100 bars) is enough unless the stored history is
+        missing/too short for the request or too old for compact to bridge the gap.
+        """
+        if stored is None:
+            return "full" if min_points > COMPACT_POINTS else "compact"
+        gap_days = (pd.Timestamp.today().normalize() - stored["Date"].iloc[-1]).days
+        if gap_days > COMPACT_SPAN_DAYS:
+            return "full"
+        if len(stored) < min_points and not self.store.has_full(ticker):
+            return "full"
+        return "compact"
+
+    def _cached(self, ticker: str, min_points: int) -> Optional[Loaded]:
+        entry = self.cache.get(ticker, "daily")
+        if self._covers(entry, min_points):
+            return entry["value"]["df"], entry["fetched_at"]
+        return None
+
+    def _merge(self, ticker: str, df: Optional[pd.DataFrame], outputsize: str,
+               stored: Optional[pd.DataFrame]) -> Loaded:
+        """
+        Stores a download and publishes the merged history to the cache.
+        """
+        if df is None:
+            # upstream unavailable: the stored history is still real data
+            if stored is not None:
+                return stored, self.store.modified_at(ticker)
+            return None, datetime.now()
+
+        if not self.store.append(ticker, df, full=(outputsize == "full")):
+            # nothing new upstream: the stored history is current as of now
+            self.store.touch(ticker)
+        history = self.store.read(ticker)
+        fetched_at = datetime.now()
+        series = {"df": history, "outputsize": "full" if self.store.has_full(ticker) else "compact"}
+        self.cache.set(ticker, "daily", series, fetched_at=fetched_at)
+        self.rolling.update(ticker, history)
+        return history, fetched_at
+
+    def _serve_local(self, ticker: str, min_points: int) -> Optional[Loaded]:
+        """
+        Last known good history without touching the network: the cache entry
+        (fresh or stale) or else the price store, if younger than the hard TTL.
+        """
+        entry = self.cache.get(ticker, "daily", allow_stale=True)
+        if self._covers(entry, min_points):
+            df, fetched_at = entry["value"]["df"], entry["fetched_at"]
+        else:
+            df, fetched_at = self.store.read(ticker), self.store.modified_at(ticker)
+            if df is None or self.cache.is_expired(fetched_at):
+                return None
+            series = {"df": df, "outputsize": "full" if self.store.has_full(ticker) else "compact"}
+            if not self._covers({"value": series}, min_points):
+                return None
+            # publish with its real age so the next read is a cache hit
+            self.cache.set(ticker, "daily", series, fetched_at=fetched_at)
+        return df, fetched_at
+
+    def read_local(self, ticker: str, min_points: int = 0) -> Optional[Loaded]:
+        """
+        Memory/disk-only read (no network, no refresh); None when nothing
+        usable is local yet.
+        """
+        return self._serve_local(ticker.strip().upper(), min_points)
+
+    def _refresh(self, tickers: list, min_points: int) -> None:
+        try:
+            if len(tickers) > 1:
+                self.load_daily_many(tickers, min_points=min_points, force_refresh=True, priority=BACKGROUND)
+            else:
+                self.load_daily(tickers[0], min_points=min_points, force_refresh=True, priority=BACKGROUND)
+        finally:
+            with self._inflight_lock:
+                self._inflight.difference_update(tickers)
+
+    def refresh_in_background(self, tickers: Iterable[str], min_points: int = 0) -> None:
+        """
+        Queues refreshes for tickers not already being refreshed. Bulk
+        providers get one batched job; others one job per ticker.
+        """
+        with self._inflight_lock:
+            todo = [t for t in dict.fromkeys(tickers) if t not in self._inflight]
+            self._inflight.update(todo)
+            if not todo:
+                return
+            if self._refresh_pool is None:
+                workers = int(os.getenv("MARKET_MAX_WORKERS", "4"))
+                self._refresh_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="market-refresh")
+        jobs = [todo] if self.provider.supports_bulk else [[t] for t in todo]
+        for job in jobs:
+            self._refresh_pool.submit(self._refresh, job, min_points)
+
+    def backfill_in_background(self, tickers: Iterable[str], min_points: int) -> None:
+        """
+        Queues a longer download for tickers whose local history covers
+        fewer than min_points bars, so interactive callers can answer from
+        the compact series now and read the long window next time.
+        """
+        short = [t for t in dict.fromkeys(t.strip().upper() for t in tickers)
+                 if not self._covers(self.cache.get(t, "daily", allow_stale=True), min_points)]
+        if short:
+            self.refresh_in_background(short, min_points)
+
+    def peek(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        Whatever daily history is already local (cache, then store); never downloads.
+        """
+        ticker = ticker.strip().upper()
+        entry = self.cache.get(ticker, "daily", allow_stale=True)
+        if entry is not None:
+            return entry["value"]["df"]
+        return self.store.read(ticker)
+
+    def rolling_stats(self, ticker: str) -> Optional[Dict[str, float]]:
+        """
+        Moving averages / 20d volatility from the incremental rolling state,
+        caught up with the local history (no downloads).
+        """
+        return self.rolling.update(ticker, self.peek(ticker))
+
+    def load_daily(self, ticker: str, min_points: int = 0, force_refresh: bool = False,
+                   priority: int = INTERACTIVE) -> Loaded:
+        """
+        Canonical daily series for one ticker. Returns (df or None, fetched_at).
+        Serves local history immediately when possible (see class docstring);
+        force_refresh always waits for a download.
+        """
+        ticker = ticker.strip().upper()
+        if not force_refresh:
+            hit = self._serve_local(ticker, min_points)
+            if hit is not None:
+                if self.cache.is_stale(hit[1]):
+                    self.refresh_in_background([ticker], min_points)
+                return hit
+
+        with self.cache.lock_for(ticker, "daily"):
+            # another thread may have fetched it while we waited
+            if not force_refresh:
+                hit = self._cached(ticker, min_points)
+                if hit is not None:
+                    return hit
+
+            stored = self.store.read(ticker)
+            outputsize = self._outputsize_for(ticker, stored, min_points)
+            df = self.provider.fetch_daily(ticker, outputsize=outputsize, priority=priority)
+            return self._merge(ticker, df, outputsize, stored)
+
+    def load_daily_many(self, tickers: Iterable[str], min_points: int = 0, force_refresh: bool = False,
+                        priority: int = BACKGROUND) -> Dict[str, Loaded]:
+        """
+        Daily series for many tickers. Local history is served as in
+        load_daily; the rest is downloaded with one provider.fetch_many call
+        per outputsize (a single round trip for bulk providers such as
+        yfinance / local files).
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        out: Dict[str, Loaded] = {}
+        missing: Dict[str, list] = {}
+        stored_by_ticker: Dict[str, Optional[pd.DataFrame]] = {}
+        stale = []
+
+        for t in tickers:
+            hit = None if force_refresh else self._serve_local(t, min_points)
+            if hit is not None:
+                out[t] = hit
+                if self.cache.is_stale(hit[1]):
+                    stale.append(t)
+                continue
+            stored = self.store.read(t)
+            stored_by_ticker[t] = stored
+            missing.setdefault(self._outputsize_for(t, stored, min_points), []).append(t)
+
+        for outputsize, group in missing.items():
+            fetched = self.provider.fetch_many(group, outputsize=outputsize, priority=priority)
+            for t in group:
+                with self.cache.lock_for(t, "daily"):
+                    out[t] = self._merge(t, fetched.get(t), outputsize, stored_by_ticker[t])
+        if stale:
+            self.refresh_in_background(stale, min_points)
+        return out
+
+
+_DATA: Optional[MarketData] = None
+_DATA_LOCK = threading.Lock()
+
+
+def get_market_data() -> MarketData:
+    """
+    Shared MarketData (provider from MARKET_PROVIDER) for this process.
+    """
+    global _DATA
+    if _DATA is None:
+        with _DATA_LOCK:
+            if _DATA is None:
+                _DATA = MarketData()
+    return _DATA
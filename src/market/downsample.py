@@ -0,0 +1,121 @@
+# src/market/downsample.py
+from __future__ import annotations
+
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHART_MAX_POINTS = 500
+# below this many rows matplotlib's own path simplification renders the PNG
+# as fast as the downsampled series would (scripts/bench_chart_render.py)
+DEFAULT_DOWNSAMPLE_MIN_POINTS = 100_000
+# average points per bucket below which the scalar loop is faster than numpy
+SMALL_BUCKET = 16
+
+
+def chart_max_points() -> int:
+    """
+    Point budget per chart (CHART_MAX_POINTS, default 500; 0 disables downsampling).
+    """
+    return int(os.getenv("CHART_MAX_POINTS", str(DEFAULT_CHART_MAX_POINTS)))
+
+
+def downsample_min_points() -> int:
+    """
+    Rows a chart needs before it is downsampled at all (CHART_DOWNSAMPLE_MIN_POINTS, default 100000).
+    """
+    return int(os.getenv("CHART_DOWNSAMPLE_MIN_POINTS", str(DEFAULT_DOWNSAMPLE_MIN_POINTS)))
+
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape (peaks, troughs) of the series. Keeps first and last.
+
+    Bucket edges and next-bucket averages are computed for all buckets at
+    once; each bucket's pick is one vectorized area + argmax over its points
+    (a scalar loop when buckets hold only a few points).
+    """
+    x, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # middle points split into threshold - 2 buckets: [edges[i], edges[i + 1])
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x[: n - 1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y[: n - 1], edges[:-1]) / sizes
+    # the triangle's third corner: next bucket's average (last point for the final bucket)
+    nxt_x = np.append(avg_x[1:], x[-1])
+    nxt_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    starts, ends = edges[:-1].tolist(), edges[1:].tolist()
+    a = 0
+    if (n - 2) / (threshold - 2) <= SMALL_BUCKET:
+        # a couple of points per bucket: plain floats beat per-bucket ufunc overhead
+        xl, yl = x.tolist(), y.tolist()
+        for i, (nx, ny) in enumerate(zip(nxt_x.tolist(), nxt_y.tolist())):
+            ax, ay = xl[a], yl[a]
+            k1, k2 = ax - nx, ny - ay
+            best = -1.0
+            for j in range(starts[i], ends[i]):
+                area = abs(k1 * (yl[j] - ay) - (ax - xl[j]) * k2)
+                if area > best:
+                    best, a = area, j
+            out[i + 1] = a
+        return out
+
+    for i, (lo, hi) in enumerate(zip(starts, ends)):
+        ax, ay = x[a], y[a]
+        k1, k2 = ax - nxt_x[i], nxt_y[i] - ay
+        area = np.abs(k1 * (y[lo:hi] - ay) - (ax - x[lo:hi]) * k2)
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_frame(
+    df: Optional[pd.DataFrame],
+    max_points: Optional[int] = None,
+    x: str = "Date",
+    columns: Optional[Iterable[str]] = None,
+    min_points: Optional[int] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Rows of df to plot within a point budget (LTTB on each y column), once
+    df has more than min_points rows; smaller frames are returned as is.
+
+    Several columns (comparison charts) share the budget; the union of
+    their picks is kept so every line keeps its own shape. Each column's
+    global high and low are always kept too (LTTB alone can drop one).
+    NaN gaps (tickers with shorter history) are skipped per column.
+    """
+    budget = chart_max_points() if max_points is None else max_points
+    floor = downsample_min_points() if min_points is None else min_points
+    if df is None or budget <= 0 or len(df) <= max(budget, floor):
+        return df
+
+    cols = list(columns) if columns is not None else [c for c in df.columns if c != x]
+    xs = df[x].to_numpy()
+    per_col = max(budget // max(len(cols), 1), 3)
+    keep = [np.array([0, len(df) - 1])]
+    for col in cols:
+        y = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(y))
+        if len(valid):
+            yv = y[valid]
+            keep.append(valid[lttb_indices(xs[valid], yv, per_col)])
+            keep.append(valid[[np.argmax(yv), np.argmin(yv)]])
+    return df.iloc[np.unique(np.concatenate(keep))]
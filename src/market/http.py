@@ -0,0 +1,162 @@
+# src/market/http.py
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# request priorities (lower = served first)
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# how long a caller may queue for a token before giving up
+MAX_WAIT_S = {INTERACTIVE: 10.0, BACKGROUND: 120.0}
+
+# retried responses; every attempt spends a token (see limited_get)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 3
+BACKOFF_S = 0.5
+
+
+class TokenBucket:
+    """
+    Process-wide token bucket rate limiter.
+
+    Waiting callers are served strictly by (priority, arrival order), so an
+    interactive lookup jumps ahead of queued background refreshes.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate_per_s = rate_per_min / 60.0
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate_per_min))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate_per_s)
+        self._last = now
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """
+        Takes one token, waiting up to timeout seconds (None = forever).
+        Returns False if no token could be obtained in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill()
+                    is_next = self._waiters[0] == ticket
+                    if is_next and self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return True
+
+                    # head of the queue sleeps until the next token; others until notified
+                    wait = (1.0 - self._tokens) / self.rate_per_s if is_next else None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def drain(self):
+        """
+        Empties the bucket, e.g. when the upstream reports its quota is used up.
+        """
+        with self._cond:
+            self._refill()
+            self._tokens = 0.0
+
+
+_SESSION: Optional[requests.Session] = None
+_LIMITER: Optional[TokenBucket] = None
+_LOCK = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Shared pooled HTTP session (keep-alive). It does not retry by itself:
+    retries go through limited_get so each one is rate limited.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                pool = max(4, int(os.getenv("MARKET_MAX_WORKERS", "4")) * 2)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Process-wide Alpha Vantage limiter; ALPHAVANTAGE_RPM requests per minute (default 5).
+    """
+    global _LIMITER
+    if _LIMITER is None:
+        with _LOCK:
+            if _LIMITER is None:
+                _LIMITER = TokenBucket(rate_per_min=float(os.getenv("ALPHAVANTAGE_RPM", "5")))
+    return _LIMITER
+
+
+def _retry_after(r: requests.Response) -> Optional[float]:
+    try:
+        return max(0.0, float(r.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+def limited_get(url: str, params: dict, priority: int = INTERACTIVE, timeout: float = 20.0,
+                limiter: Optional[TokenBucket] = None,
+                session: Optional[requests.Session] = None) -> Optional[requests.Response]:
+    """
+    GET on the shared session with up to MAX_ATTEMPTS tries on connection
+    errors and 429/5xx, backing off exponentially (or per Retry-After).
+
+    Every attempt, retries included, first takes a limiter token, so a burst
+    of failures cannot exceed the quota. Returns None when no token comes
+    within MAX_WAIT_S for the priority; the last response or error is
+    returned / raised once attempts run out.
+    """
+    limiter = limiter or get_rate_limiter()
+    session = session or get_session()
+    delay = 0.0
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        if delay:
+            time.sleep(delay)
+        if not limiter.acquire(priority, timeout=MAX_WAIT_S.get(priority)):
+            return None
+        backoff = BACKOFF_S * 2 ** (attempt - 1)
+        try:
+            r = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_ATTEMPTS:
+                raise
+            delay = backoff
+            continue
+        if r.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+            return r
+        retry_after = _retry_after(r) if r.status_code == 429 else None
+        delay = backoff if retry_after is None else retry_after
+    return None
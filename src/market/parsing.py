@@ -0,0 +1,85 @@
+# src/market/parsing.py
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Alpha Vantage field -> column (TIME_SERIES_DAILY_ADJUSTED)
+ADJUSTED_FIELDS = {
+    "1. open": "Open",
+    "2. high": "High",
+    "3. low": "Low",
+    "4. close": "RawClose",
+    "5. adjusted close": "Close",
+    "6. volume": "Volume",
+    "7. dividend amount": "Dividend",
+    "8. split coefficient": "SplitCoef",
+}
+
+# TIME_SERIES_DAILY (no adjusted fields): close is the raw close
+DAILY_FIELDS = {
+    "1. open": "Open",
+    "2. high": "High",
+    "3. low": "Low",
+    "4. close": "Close",
+    "5. volume": "Volume",
+}
+
+
+def _values_matrix(rows: List[Dict[str, str]], fields: List[str]) -> np.ndarray:
+    """
+    All numeric fields of all bars in one float64 array (bars x fields).
+    numpy parses the strings in C; only irregular payloads take the slow path.
+    """
+    get = itemgetter(*fields)
+    try:
+        return np.array([get(v) for v in rows], dtype=np.float64).reshape(len(rows), len(fields))
+    except (KeyError, ValueError, TypeError):
+        return np.array(
+            [[_to_float(v.get(f)) for f in fields] for v in rows], dtype=np.float64
+        ).reshape(len(rows), len(fields))
+
+
+def _to_float(x: Any) -> float:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_alpha_vantage_daily(payload: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Vectorized parse of an Alpha Vantage daily payload into a DataFrame
+    sorted by Date with OHLCV columns (Close = adjusted close when available)
+    plus RawClose / Dividend / SplitCoef for adjusted series.
+
+    One to_datetime call for all dates and one numeric conversion for all
+    fields, instead of per-row parsing.
+    """
+    ts = (payload or {}).get("Time Series (Daily)")
+    if not ts:
+        return None
+
+    rows = list(ts.values())
+    mapping = ADJUSTED_FIELDS if "5. adjusted close" in rows[0] else DAILY_FIELDS
+    fields = list(mapping)
+
+    values = _values_matrix(rows, fields)
+    dates = pd.to_datetime(list(ts.keys()), format="%Y-%m-%d")
+
+    df = pd.DataFrame(values, columns=[mapping[f] for f in fields], copy=False)
+    df.insert(0, "Date", dates)
+
+    if "RawClose" in df.columns:
+        # adjusted close preferred, raw close where it is missing
+        df["Close"] = df["Close"].fillna(df["RawClose"])
+    df = df[df["Close"].notna()]
+
+    # Alpha Vantage returns newest first
+    if not dates.is_monotonic_increasing:
+        df = df.iloc[::-1] if dates.is_monotonic_decreasing else df.sort_values("Date", kind="stable")
+    df = df.reset_index(drop=True)
+    return df if len(df) else None
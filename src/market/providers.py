@@ -0,0 +1,249 @@
+# src/market/providers.py
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+import requests
+
+from src.market.http import BACKGROUND, INTERACTIVE, get_rate_limiter, limited_get
+from src.market.parsing import parse_alpha_vantage_daily
+from src.utils.config import load_env
+
+
+class MarketDataProvider:
+    """
+    Source of daily OHLCV history.
+
+    fetch_daily / fetch_many return DataFrames sorted by Date with at least
+    Date + Close (adjusted when the source has it) and, when available,
+    Open / High / Low / Volume.
+
+    supports_bulk: fetch_many costs one upstream round trip for N tickers.
+    """
+    name: str = "base"
+    supports_bulk: bool = False
+
+    def fetch_daily(self, ticker: str, outputsize: str = "compact",
+                    priority: int = INTERACTIVE) -> Optional[pd.DataFrame]:
+        raise NotImplementedError
+
+    def fetch_many(self, tickers: Iterable[str], outputsize: str = "compact",
+                   priority: int = BACKGROUND) -> Dict[str, pd.DataFrame]:
+        out = {}
+        for t in tickers:
+            df = self.fetch_daily(t, outputsize=outputsize, priority=priority)
+            if df is not None:
+                out[t] = df
+        return out
+
+
+class AlphaVantageProvider(MarketDataProvider):
+    """
+    TIME_SERIES_DAILY_ADJUSTED, one ticker per request, through the shared
+    pooled session and process-wide rate limiter.
+    """
+    name = "alphavantage"
+    url = "https://www.alphavantage.co/query"
+
+    def __init__(self, api_key: Optional[str] = None):
+        load_env()
+        self.api_key = api_key if api_key is not None else os.getenv("ALPHAVANTAGE_API_KEY", "")
+
+    def fetch_daily(self, ticker: str, outputsize: str = "compact",
+                    priority: int = INTERACTIVE) -> Optional[pd.DataFrame]:
+        if not self.api_key:
+            return None
+
+        params = {
+            "function": "TIME_SERIES_DAILY_ADJUSTED",
+            "symbol": ticker,
+            "apikey": self.api_key,
+            "outputsize": outputsize,
+        }
+        limiter = get_rate_limiter()
+        try:
+            r = limited_get(self.url, params, priority=priority, limiter=limiter)
+            if r is None:
+                # quota queue too long → caller falls back (stored / mock data)
+                return None
+            data = r.json()
+        except (requests.RequestException, ValueError):
+            # network / non-JSON response → caller falls back
+            return None
+
+        if not data.get("Time Series (Daily)"):
+            if "Note" in data or "Information" in data:
+                # Alpha Vantage signals an exhausted quota with HTTP 200 + a note
+                limiter.drain()
+            return None
+
+        return parse_alpha_vantage_daily(data)
+
+    def fetch_many(self, tickers: Iterable[str], outputsize: str = "compact",
+                   priority: int = BACKGROUND) -> Dict[str, pd.DataFrame]:
+        """
+        No batch endpoint: still one request per ticker, but up to
+        MARKET_MAX_WORKERS run at once on the pooled session. Every request
+        takes its own rate-limiter token, so the quota is respected; only
+        the network latency overlaps.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not self.api_key or not tickers:
+            return {}
+        workers = min(int(os.getenv("MARKET_MAX_WORKERS", "4")), len(tickers))
+        if workers <= 1:
+            return super().fetch_many(tickers, outputsize=outputsize, priority=priority)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alphavantage") as pool:
+            frames = pool.map(lambda t: self.fetch_daily(t, outputsize=outputsize, priority=priority), tickers)
+            return {t: df for t, df in zip(tickers, frames) if df is not None}
+
+
+# column names taken as the bar date (after lower-casing)
+DATE_COLUMNS = ("date", "datetime", "timestamp", "index")
+
+
+def _normalize_ohlcv(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Maps yfinance / CSV style columns onto Date + OHLCV (+ RawClose).
+    """
+    if df is None or len(df) == 0:
+        return None
+    df = df.copy()
+    cols = {c: str(c).strip().lower().replace("_", " ") for c in df.columns}
+    if not any(low in DATE_COLUMNS for low in cols.values()):
+        # yfinance keeps the dates in the index
+        df = df.reset_index()
+        cols = {c: str(c).strip().lower().replace("_", " ") for c in df.columns}
+    rename = {}
+    for c, low in cols.items():
+        if low in DATE_COLUMNS:
+            rename[c] = "Date"
+        elif low in ("open", "high", "low", "volume"):
+            rename[c] = low.capitalize()
+        elif low == "close":
+            rename[c] = "RawClose"
+        elif low in ("adj close", "adjclose", "adjusted close"):
+            rename[c] = "Close"
+    df = df.rename(columns=rename)
+    if "Close" not in df.columns:
+        if "RawClose" not in df.columns:
+            return None
+        df["Close"] = df["RawClose"]
+    elif "RawClose" in df.columns:
+        df["Close"] = df["Close"].fillna(df["RawClose"])
+
+    df["Date"] = pd.to_datetime(df["Date"]).dt.tz_localize(None).dt.normalize()
+    keep = [c for c in ["Date", "Open", "High", "Low", "Close", "Volume", "RawClose"] if c in df.columns]
+    df = df[keep].dropna(subset=["Close"]).sort_values("Date", kind="stable").reset_index(drop=True)
+    return df if len(df) else None
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    yfinance bulk download: many tickers in one call.
+    """
+    name = "yfinance"
+    supports_bulk = True
+
+    # compact ≈ Alpha Vantage's latest 100 bars
+    PERIODS = {"compact": "6mo", "full": "max"}
+
+    def fetch_daily(self, ticker: str, outputsize: str = "compact",
+                    priority: int = INTERACTIVE) -> Optional[pd.DataFrame]:
+        return self.fetch_many([ticker], outputsize=outputsize, priority=priority).get(ticker)
+
+    def fetch_many(self, tickers: Iterable[str], outputsize: str = "compact",
+                   priority: int = BACKGROUND) -> Dict[str, pd.DataFrame]:
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        if not tickers:
+            return {}
+        import yfinance as yf
+
+        try:
+            raw = yf.download(
+                tickers,
+                period=self.PERIODS.get(outputsize, "6mo"),
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=False,
+                threads=True,
+                progress=False,
+            )
+        except Exception:
+            return {}
+        if raw is None or len(raw) == 0:
+            return {}
+
+        out: Dict[str, pd.DataFrame] = {}
+        for t in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if t in raw.columns.get_level_values(0):
+                    sub = raw[t]
+                elif t in raw.columns.get_level_values(-1):
+                    sub = raw.xs(t, axis=1, level=-1)
+                else:
+                    continue
+            elif len(tickers) == 1:
+                sub = raw
+            else:
+                continue
+            df = _normalize_ohlcv(sub.dropna(how="all"))
+            if df is not None:
+                out[t] = df
+        return out
+
+
+class LocalDirectoryProvider(MarketDataProvider):
+    """
+    Offline provider: <root>/<TICKER>.parquet or <TICKER>.csv with Date + OHLCV
+    (optionally "Adj Close"). Useful for benchmarks and demos without API keys.
+    """
+    name = "local"
+    supports_bulk = True
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or os.getenv("MARKET_LOCAL_DIR", os.path.join("data", "market_local")))
+
+    def fetch_daily(self, ticker: str, outputsize: str = "compact",
+                    priority: int = INTERACTIVE) -> Optional[pd.DataFrame]:
+        t = ticker.strip().upper()
+        parquet = self.root / f"{t}.parquet"
+        csv = self.root / f"{t}.csv"
+        try:
+            if parquet.exists():
+                df = pd.read_parquet(parquet)
+            elif csv.exists():
+                df = pd.read_csv(csv)
+            else:
+                return None
+        except (OSError, ValueError, ImportError):
+            return None
+        df = _normalize_ohlcv(df)
+        if df is None:
+            return None
+        # match the upstream contract: compact = latest ~100 bars
+        return df.iloc[-100:].reset_index(drop=True) if outputsize == "compact" else df
+
+
+PROVIDERS = {
+    "alphavantage": AlphaVantageProvider,
+    "yfinance": YFinanceProvider,
+    "local": LocalDirectoryProvider,
+}
+
+
+def get_provider(name: Optional[str] = None) -> MarketDataProvider:
+    """
+    Provider from name or MARKET_PROVIDER (alphavantage | yfinance | local).
+    """
+    load_env()
+    name = (name or os.getenv("MARKET_PROVIDER", "alphavantage")).strip().lower()
+    cls = PROVIDERS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown market data provider: {name} (choose from {', '.join(PROVIDERS)})")
+    return cls()
@@ -0,0 +1,334 @@
+# src/market/rolling.py
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cache import TTLCache
+
+MA_WINDOWS = (20, 50, 200)
+VOL_WINDOW = 20
+CORR_WINDOW = 60
+TRADING_DAYS = 252
+# recompute running sums from the buffers every N bars (bounds float drift)
+RESYNC_EVERY = 512
+# correlation states (one per distinct ticker set) kept in memory / on disk;
+# least recently used sets are dropped beyond this
+MAX_CORR_SETS = 8
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _days(dates: pd.Series) -> np.ndarray:
+    return (dates.to_numpy(dtype="datetime64[D]") - _EPOCH).astype("int64")
+
+
+def _save_npz(path: Path, **arrays) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+class RollingState:
+    """
+    Running moving averages and return volatility for one ticker.
+
+    Keeps the last max(windows) closes and VOL_WINDOW returns in ring buffers
+    with running sums / sums of squares, so each new bar costs O(1) no matter
+    how long the history is.
+    """
+
+    def __init__(self, windows=MA_WINDOWS, vol_window: int = VOL_WINDOW):
+        self.windows = tuple(int(w) for w in windows)
+        self.vol_window = int(vol_window)
+        self.size = max(self.windows)
+        self.closes = np.full(self.size, np.nan)
+        self.rets = np.zeros(self.vol_window)
+        self.sums = np.zeros(len(self.windows))
+        self.rsum = 0.0
+        self.rsum2 = 0.0
+        self.n = 0          # closes pushed
+        self.last_day = -1  # days since epoch of the latest bar
+        self.since_sync = 0
+
+    @property
+    def last_close(self) -> float:
+        return float(self.closes[(self.n - 1) % self.size]) if self.n else float("nan")
+
+    def push(self, day: int, close: float) -> None:
+        size = self.size
+        if self.n:
+            prev = self.closes[(self.n - 1) % size]
+            r = close / prev - 1.0 if prev else 0.0
+            i = (self.n - 1) % self.vol_window
+            if self.n - 1 >= self.vol_window:
+                old = self.rets[i]
+                self.rsum -= old
+                self.rsum2 -= old * old
+            self.rets[i] = r
+            self.rsum += r
+            self.rsum2 += r * r
+        for k, w in enumerate(self.windows):
+            if self.n >= w:
+                # the close leaving this window (still in the ring: w <= size)
+                self.sums[k] -= self.closes[(self.n - w) % size]
+            self.sums[k] += close
+        self.closes[self.n % size] = close
+        self.n += 1
+        self.last_day = int(day)
+        self.since_sync += 1
+        if self.since_sync >= RESYNC_EVERY:
+            self.resync()
+
+    def _tail(self, k: int) -> np.ndarray:
+        idx = np.arange(self.n - k, self.n) % self.size
+        return self.closes[idx]
+
+    def resync(self) -> None:
+        for k, w in enumerate(self.windows):
+            self.sums[k] = self._tail(min(self.n, w)).sum()
+        live = self.rets[: min(max(self.n - 1, 0), self.vol_window)]
+        self.rsum = float(live.sum())
+        self.rsum2 = float((live * live).sum())
+        self.since_sync = 0
+
+    def stats(self) -> Dict[str, float]:
+        out = {f"ma{w}": (self.sums[k] / w if self.n >= w else np.nan) for k, w in enumerate(self.windows)}
+        w = self.vol_window
+        if self.n - 1 >= w:
+            var = max((self.rsum2 - self.rsum * self.rsum / w) / (w - 1), 0.0)
+            out["vol_ann_pct"] = float(np.sqrt(var * TRADING_DAYS) * 100.0)
+        else:
+            out["vol_ann_pct"] = np.nan
+        out["last"] = self.last_close
+        return out
+
+    # --- persistence ---
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "windows": np.array(self.windows + (self.vol_window,)),
+            "closes": self.closes,
+            "rets": self.rets,
+            "sums": self.sums,
+            "meta": np.array([self.n, self.last_day, self.rsum, self.rsum2, self.since_sync], dtype=np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, a) -> "RollingState":
+        w = [int(x) for x in a["windows"]]
+        st = cls(windows=w[:-1], vol_window=w[-1])
+        st.closes = np.array(a["closes"])
+        st.rets = np.array(a["rets"])
+        st.sums = np.array(a["sums"])
+        n, last_day, st.rsum, st.rsum2, since = a["meta"].tolist()
+        st.n, st.last_day, st.since_sync = int(n), int(last_day), int(since)
+        return st
+
+
+class RollingCorrelation:
+    """
+    Rolling return correlation for a fixed ticker set on a shared date axis.
+
+    Keeps a ring of the last `window` return vectors with a running sum and
+    cross-product matrix; each new bar is one outer-product add/remove
+    (O(1) per ticker pair), not a recomputation over the window.
+    """
+
+    def __init__(self, tickers: Iterable[str], window: int = CORR_WINDOW):
+        self.tickers = list(tickers)
+        self.window = int(window)
+        n = len(self.tickers)
+        self.rets = np.zeros((self.window, n))
+        self.sum = np.zeros(n)
+        self.cross = np.zeros((n, n))
+        self.last_prices = np.full(n, np.nan)
+        self.n = 0          # return rows pushed
+        self.last_day = -1
+        self.since_sync = 0
+
+    def push(self, day: int, prices: np.ndarray) -> None:
+        if self.last_day >= 0:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = prices / self.last_prices - 1.0
+            # a ticker without a bar yet (or that day) contributes a flat return
+            r = np.where(np.isfinite(r), r, 0.0)
+            i = self.n % self.window
+            if self.n >= self.window:
+                old = self.rets[i]
+                self.sum -= old
+                self.cross -= np.outer(old, old)
+            self.rets[i] = r
+            self.sum += r
+            self.cross += np.outer(r, r)
+            self.n += 1
+            self.since_sync += 1
+            if self.since_sync >= RESYNC_EVERY:
+                live = self.rets[: min(self.n, self.window)]
+                self.sum = live.sum(axis=0)
+                self.cross = live.T @ live
+                self.since_sync = 0
+        self.last_prices = np.where(np.isfinite(prices), prices, self.last_prices)
+        self.last_day = int(day)
+
+    def matrix(self) -> pd.DataFrame:
+        k = min(self.n, self.window)
+        if k < 3:
+            corr = np.full((len(self.tickers),) * 2, np.nan)
+        else:
+            cov = (self.cross - np.outer(self.sum, self.sum) / k) / (k - 1)
+            sd = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corr = cov / np.outer(sd, sd)
+        return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "tickers": np.array(self.tickers),
+            "rets": self.rets,
+            "sum": self.sum,
+            "cross": self.cross,
+            "last_prices": self.last_prices,
+            "meta": np.array([self.window, self.n, self.last_day, self.since_sync], dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, a) -> "RollingCorrelation":
+        window, n, last_day, since = (int(x) for x in a["meta"])
+        st = cls([str(t) for t in a["tickers"]], window=window)
+        st.rets = np.array(a["rets"])
+        st.sum = np.array(a["sum"])
+        st.cross = np.array(a["cross"])
+        st.last_prices = np.array(a["last_prices"])
+        st.n, st.last_day, st.since_sync = n, last_day, since
+        return st
+
+
+class RollingStats:
+    """
+    Rolling state for every ticker (and the MAX_CORR_SETS most recently
+    used correlation sets), kept in memory and persisted as .npz files next
+    to the price store.
+
+    update() feeds only the bars newer than the saved state. If the history no
+    longer matches the state (e.g. a dividend re-adjusted older closes) the
+    state is rebuilt from the trailing window only.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._states: Dict[str, RollingState] = {}
+        self._corr = TTLCache(maxsize=MAX_CORR_SETS)
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name}.npz"
+
+    def _evict_corr_files(self) -> None:
+        """
+        Deletes all but the MAX_CORR_SETS most recently written correlation files.
+        """
+        files = sorted(self.root.glob("corr-*.npz"), key=lambda f: f.stat().st_mtime, reverse=True)
+        for f in files[MAX_CORR_SETS:]:
+            try:
+                f.unlink()
+            except OSError:
+                pass
+
+    def _load_state(self, ticker: str) -> Optional[RollingState]:
+        st = self._states.get(ticker)
+        if st is None and self._path(ticker).exists():
+            try:
+                with np.load(self._path(ticker)) as a:
+                    st = RollingState.from_arrays(a)
+            except (OSError, ValueError, KeyError):
+                st = None
+        return st
+
+    @staticmethod
+    def _resume_at(last_day: int, last_value, days: np.ndarray, values: np.ndarray) -> Optional[int]:
+        """
+        Index of the first bar after the saved state, or None when the saved
+        last bar is not in this history any more (rebuild needed).
+        """
+        if last_day < 0:
+            return None
+        j = int(np.searchsorted(days, last_day))
+        if j >= len(days) or days[j] != last_day:
+            return None
+        if not np.allclose(values[j], last_value, rtol=1e-9, atol=0.0, equal_nan=True):
+            return None
+        return j + 1
+
+    def update(self, ticker: str, history: Optional[pd.DataFrame]) -> Optional[Dict[str, float]]:
+        """
+        Brings the ticker's rolling state up to the end of `history` and
+        returns its stats (ma20/ma50/ma200, vol_ann_pct, last).
+        """
+        if history is None or len(history) == 0:
+            return None
+        ticker = ticker.strip().upper()
+        close = history["Close"].to_numpy(dtype=np.float64)
+        ok = np.isfinite(close)
+        days, close = _days(history["Date"])[ok], close[ok]
+        if len(days) == 0:
+            return None
+
+        with self._lock:
+            st = self._load_state(ticker)
+            start = None if st is None else self._resume_at(st.last_day, st.last_close, days, close)
+            if start is None:
+                st = RollingState()
+                start = max(len(days) - st.size, 0)
+            changed = start < len(days)
+            for i in range(start, len(days)):
+                st.push(days[i], close[i])
+            self._states[ticker] = st
+            if changed:
+                _save_npz(self._path(ticker), **st.to_arrays())
+            return st.stats()
+
+    def correlation(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rolling return correlation (last CORR_WINDOW bars) for the columns of
+        an aligned date x ticker price matrix.
+        """
+        tickers: List[str] = [str(t) for t in prices.columns]
+        if prices.empty:
+            return pd.DataFrame(index=tickers, columns=tickers, dtype=float)
+        key = "corr-" + hashlib.sha1(",".join(tickers).encode()).hexdigest()[:12]
+        days = (prices.index.to_numpy(dtype="datetime64[D]") - _EPOCH).astype("int64")
+        p = prices.to_numpy(dtype=np.float64)
+
+        with self._lock:
+            hit = self._corr.get(key)
+            st = hit["value"] if hit else None
+            is_new = st is None and not self._path(key).exists()
+            if st is None and not is_new:
+                try:
+                    with np.load(self._path(key)) as a:
+                        st = RollingCorrelation.from_arrays(a)
+                except (OSError, ValueError, KeyError):
+                    st = None
+            start = None
+            if st is not None and st.tickers == tickers:
+                start = self._resume_at(st.last_day, st.last_prices, days, p)
+            if start is None:
+                st = RollingCorrelation(tickers)
+                start = max(len(days) - st.window - 1, 0)
+            changed = start < len(days)
+            for i in range(start, len(days)):
+                st.push(days[i], p[i])
+            self._corr.set(key, st)
+            if changed:
+                _save_npz(self._path(key), **st.to_arrays())
+                if is_new:
+                    self._evict_corr_files()
+            return st.matrix()
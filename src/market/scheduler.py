@@ -0,0 +1,174 @@
+# src/market/scheduler.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, time, timedelta
+from typing import Any, List, Optional
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+# the closing bar settles a few minutes after the bell
+CLOSE_GRACE = timedelta(minutes=15)
+# longest Market tab period (1y), so every period is served from memory
+PREFETCH_POINTS = 365
+
+
+def prefetch_enabled() -> bool:
+    """
+    Background prefetch is opt-in (MARKET_PREFETCH=1): during the session it
+    re-downloads every due watchlist ticker each interval, which a free
+    Alpha Vantage quota cannot absorb.
+    """
+    return os.getenv("MARKET_PREFETCH", "0") == "1"
+
+
+def _now() -> datetime:
+    return datetime.now(MARKET_TZ)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """
+    Regular US session, Mon–Fri 9:30–16:00 New York time (exchange holidays not modelled).
+    """
+    now = (now or _now()).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def last_close(now: Optional[datetime] = None) -> datetime:
+    """
+    Most recent session close (plus grace) at or before now.
+    """
+    now = (now or _now()).astimezone(MARKET_TZ)
+    day = now.date()
+    while True:
+        close = datetime.combine(day, MARKET_CLOSE, MARKET_TZ) + CLOSE_GRACE
+        if day.weekday() < 5 and close <= now:
+            return close
+        day -= timedelta(days=1)
+
+
+def next_open(now: Optional[datetime] = None) -> datetime:
+    now = (now or _now()).astimezone(MARKET_TZ)
+    day = now.date()
+    while True:
+        opening = datetime.combine(day, MARKET_OPEN, MARKET_TZ)
+        if day.weekday() < 5 and opening > now:
+            return opening
+        day += timedelta(days=1)
+
+
+class PrefetchScheduler:
+    """
+    Keeps a watchlist warm in the shared market cache from a daemon thread.
+
+    While the market is open, series older than open_interval_min are
+    refreshed; while it is closed, only series fetched before the last close
+    are (once, for the closing bar). Everything else is left alone, so page
+    renders read memory only.
+    """
+
+    def __init__(self, tickers: List[str], data: Any = None,
+                 open_interval_min: float = 15, closed_check_min: float = 60):
+        self.tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        self._data = data
+        self.open_interval = timedelta(minutes=open_interval_min)
+        self.closed_check = timedelta(minutes=closed_check_min)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[datetime] = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            # heavy imports (pandas/numpy) stay off the app's startup path
+            from src.market.data import get_market_data
+
+            self._data = get_market_data()
+        return self._data
+
+    def _is_due(self, fetched_at: Optional[datetime], now: datetime) -> bool:
+        if fetched_at is None:
+            return True
+        fetched = fetched_at.astimezone(MARKET_TZ)  # naive timestamps are local time
+        if is_market_open(now):
+            return now - fetched >= self.open_interval
+        return fetched < last_close(now)
+
+    def due_tickers(self, now: Optional[datetime] = None) -> List[str]:
+        now = now or _now()
+        due = []
+        for t in self.tickers:
+            # loads stored history into the cache on the first pass
+            hit = self.data.read_local(t, min_points=PREFETCH_POINTS)
+            if hit is None or self._is_due(hit[1], now):
+                due.append(t)
+        return due
+
+    def run_once(self) -> List[str]:
+        """
+        One prefetch pass; returns the tickers that were refreshed.
+        """
+        from src.market.http import BACKGROUND
+
+        due = self.due_tickers()
+        if due:
+            self.data.load_daily_many(due, min_points=PREFETCH_POINTS, force_refresh=True, priority=BACKGROUND)
+        self.last_run = datetime.now()
+        return due
+
+    def next_delay(self, now: Optional[datetime] = None) -> float:
+        now = now or _now()
+        if is_market_open(now):
+            return self.open_interval.total_seconds()
+        until_open = (next_open(now) - now).total_seconds()
+        return max(1.0, min(until_open, self.closed_check.total_seconds()))
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # keep the thread alive; the next pass retries
+                logger.exception("market prefetch pass failed")
+            self._stop.wait(self.next_delay())
+
+    def start(self) -> "PrefetchScheduler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="market-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_SCHEDULER: Optional[PrefetchScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def start_prefetch_scheduler() -> Optional[PrefetchScheduler]:
+    """
+    Starts the process-wide prefetch thread once (Streamlit reruns are no-ops)
+    when MARKET_PREFETCH=1; the open-market interval follows
+    MARKET_CACHE_TTL_MIN so the tab never sees stale data during the session.
+    """
+    global _SCHEDULER
+    if not prefetch_enabled():
+        return None
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                from src.market.watchlist import prefetch_watchlist
+
+                _SCHEDULER = PrefetchScheduler(
+                    [t for t, _name in prefetch_watchlist()],
+                    open_interval_min=float(os.getenv("MARKET_CACHE_TTL_MIN", "15")),
+                ).start()
+    return _SCHEDULER
@@ -0,0 +1,127 @@
+# src/market/store.py
+from __future__ import annotations
+
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# row 0 of each file holds the date (days since 1970-01-01)
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+class PriceStore:
+    """
+    Local daily price history, one file per ticker.
+
+    Each file is a (1 + len(COLUMNS)) x N float64 .npy array in C order, i.e.
+    columnar: every row (Date, Open, ..., Volume) is contiguous on disk and is
+    read zero-copy through a memory map. Appends rewrite the file atomically.
+
+    A "<TICKER>.full" marker records that the full upstream history was merged in.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or os.getenv("PRICE_STORE_DIR", os.path.join("data", "prices")))
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str, suffix: str = ".npy") -> Path:
+        safe = re.sub(r"[^A-Z0-9.\-^]", "_", ticker.strip().upper())
+        return self.root / f"{safe}{suffix}"
+
+    def _load(self, ticker: str) -> Optional[np.ndarray]:
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def has_full(self, ticker: str) -> bool:
+        return self._path(ticker, ".full").exists()
+
+    def modified_at(self, ticker: str) -> Optional[datetime]:
+        path = self._path(ticker)
+        return datetime.fromtimestamp(path.stat().st_mtime) if path.exists() else None
+
+    def touch(self, ticker: str) -> None:
+        """
+        Marks the stored history as verified now (a refresh found no new bars).
+        """
+        path = self._path(ticker)
+        if path.exists():
+            os.utime(path)
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        arr = self._load(ticker)
+        if arr is None or arr.shape[1] == 0:
+            return None
+        return pd.Timestamp(_EPOCH + np.timedelta64(int(arr[0, -1]), "D"))
+
+    def read(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        History as a DataFrame; price/volume columns are views on the memory map.
+        """
+        arr = self._load(ticker)
+        if arr is None or arr.shape[1] == 0:
+            return None
+        # the file's (columns x rows) layout is pandas' own block layout,
+        # so the transposed view becomes one float block without copying
+        df = pd.DataFrame(arr[1:].T, columns=list(COLUMNS), copy=False)
+        df.insert(0, "Date", pd.to_datetime(_EPOCH + arr[0].astype("int64").astype("timedelta64[D]")))
+        return df
+
+    def append(self, ticker: str, df: pd.DataFrame, full: bool = False) -> int:
+        """
+        Merges a fresh download into the stored history and returns the number
+        of rows added.
+
+        The download is authoritative for the dates it covers. Stored bars
+        before it are kept; their adjusted Close is rescaled to the download's
+        first bar, so a dividend/split adjustment does not leave a seam.
+        """
+        if df is None or len(df) == 0:
+            return 0
+
+        days = (df["Date"].to_numpy(dtype="datetime64[D]") - _EPOCH).astype("int64")
+        new = np.empty((1 + len(COLUMNS), len(df)), dtype="float64")
+        new[0] = days
+        for i, col in enumerate(COLUMNS, start=1):
+            new[i] = df[col].to_numpy(dtype="float64", na_value=np.nan) if col in df.columns else np.nan
+        new = new[:, np.argsort(new[0], kind="stable")]
+
+        close = 1 + COLUMNS.index("Close")
+        with self._lock:
+            old = self._load(ticker)
+            if old is not None and old.shape[1]:
+                j = int(np.searchsorted(old[0], new[0, 0]))
+                head = np.array(old[:, :j])
+                if j < old.shape[1] and old[0, j] == new[0, 0] and old[close, j] > 0:
+                    ratio = new[close, 0] / old[close, j]
+                    if np.isfinite(ratio) and abs(ratio - 1.0) > 1e-9:
+                        head[close] *= ratio
+                tail = old[:, old[0] > new[0, -1]]
+                merged = np.concatenate([head, new, tail], axis=1)
+                if merged.shape == old.shape and np.array_equal(merged, old, equal_nan=True) and (
+                    not full or self.has_full(ticker)
+                ):
+                    return 0
+                added = merged.shape[1] - old.shape[1]
+            else:
+                merged = new
+                added = merged.shape[1]
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._path(ticker)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(merged))
+            os.replace(tmp, path)
+            if full:
+                self._path(ticker, ".full").touch()
+        return int(added)
@@ -0,0 +1,205 @@
+# src/market/symbols.py
+from __future__ import annotations
+
+import bisect
+import csv
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# resolved against the repo, not the working directory
+DEFAULT_LISTING = str(Path(__file__).resolve().parents[2] / "data" / "symbols" / "us_listing.csv")
+
+# uppercase words that are English (or finance jargon) far more often than a symbol
+UPPERCASE_STOPWORDS = frozenset({
+    "A", "I", "THE", "AND", "OR", "FOR", "WHY", "WHAT", "WHEN", "WHERE",
+    "HOW", "USE", "WITH", "THIS", "THAT", "FROM", "IN", "ON", "TO", "OF",
+    "IS", "ARE", "IT", "SO", "BE", "GO", "ALL", "NOW", "CAN", "HAS", "DE",
+    "LOW", "TIP", "MA", "US", "USA", "AM", "PM", "AI", "VS", "ETF", "ETFS",
+    "IPO", "CEO", "YTD", "EPS", "PE", "OK",
+})
+
+# corporate suffixes dropped when deriving a name alias ("Home Depot Inc." -> "home depot")
+_NAME_SUFFIXES = frozenset({
+    "inc", "inc.", "corporation", "corp", "corp.", "co", "co.", "company", "companies",
+    "holdings", "group", "plc", "ltd", "ltd.", "class", "a", "b", "c", "&",
+})
+
+# words incl. tickers like BRK.B, cashtags and names like at&t / coca-cola / s&p
+_WORD_RE = re.compile(r"\$?[A-Za-z0-9][A-Za-z0-9&.'\-]*")
+# fallback for unlisted words / no listing: the old 2–5 uppercase letters heuristic
+_TICKER_SHAPE_RE = re.compile(r"[A-Z]{2,5}")
+
+
+def _words(text: str) -> List[str]:
+    return [w.rstrip(".'-") for w in _WORD_RE.findall(text or "")]
+
+
+def _norm(word: str) -> str:
+    """
+    Alias matching key for one word: lowercase, possessive dropped.
+    """
+    word = word.lower()
+    return word[:-2] if word.endswith("'s") else word
+
+
+def _name_alias(name: str) -> Optional[str]:
+    words = name.lower().replace(",", " ").split()
+    while words and words[-1] in _NAME_SUFFIXES:
+        words.pop()
+    # single words ("target", "block", "southern") collide with plain English
+    return " ".join(words) if len(words) >= 2 else None
+
+
+class SymbolIndex:
+    """
+    Validated ticker lookups built from a local listing file.
+
+    - symbols: hash set for O(len) membership + sorted array for prefix search
+    - aliases: lowercased company names / nicknames ("apple", "s&p 500") -> symbol
+
+    find_in_text() accepts a token as a ticker only if it was typed in
+    uppercase (or as a $cashtag) and is listed, so "show me the price trend
+    chart for NVDA" yields NVDA, not SHOW.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, Iterable[str]]] = ()):
+        self.names: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        for symbol, name, aliases in rows:
+            symbol = symbol.strip().upper()
+            if not symbol:
+                continue
+            self.names[symbol] = (name or "").strip()
+            for alias in list(aliases) + [_name_alias(name or "")]:
+                # same tokenization as the text ("johnson & johnson" -> "johnson johnson")
+                alias = " ".join(_norm(w) for w in _words(alias or ""))
+                if alias:
+                    self._aliases.setdefault(alias, symbol)
+        self._symbols = frozenset(self.names)
+        self._sorted = sorted(self.names)
+        # first word of each alias -> longest alias starting with it
+        self._alias_heads: Dict[str, int] = {}
+        for alias in self._aliases:
+            words = alias.split()
+            self._alias_heads[words[0]] = max(self._alias_heads.get(words[0], 0), len(words))
+
+    @classmethod
+    def from_csv(cls, path: str) -> "SymbolIndex":
+        """
+        CSV with a symbol column (symbol/ticker) and optional name and
+        aliases (pipe-separated) columns; header names are case-insensitive.
+        """
+        rows = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for rec in csv.DictReader(f):
+                rec = {(k or "").strip().lower(): (v or "") for k, v in rec.items()}
+                symbol = rec.get("symbol") or rec.get("ticker") or ""
+                aliases = [a for a in (rec.get("aliases") or "").split("|") if a]
+                rows.append((symbol, rec.get("name") or rec.get("security name") or "", aliases))
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: object) -> bool:
+        return isinstance(symbol, str) and symbol.upper() in self._symbols
+
+    def name(self, symbol: str) -> Optional[str]:
+        return self.names.get(symbol.upper())
+
+    def resolve(self, token: str) -> Optional[str]:
+        """
+        Symbol for a ticker or alias in any case, e.g. "aapl" / "Apple" -> "AAPL".
+        """
+        token = (token or "").strip()
+        if token.upper() in self._symbols:
+            return token.upper()
+        return self._aliases.get(" ".join(_norm(w) for w in _words(token)))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Listed symbols starting with prefix (sorted array + bisect).
+        """
+        prefix = (prefix or "").strip().upper()
+        i = bisect.bisect_left(self._sorted, prefix)
+        out = []
+        while i < len(self._sorted) and self._sorted[i].startswith(prefix) and len(out) < limit:
+            out.append(self._sorted[i])
+            i += 1
+        return out
+
+    def _ticker(self, word: str, unlisted: bool = False) -> Optional[str]:
+        if word.startswith("$"):
+            sym = word[1:].upper()
+            listed = sym in self._symbols or ((unlisted or not self._symbols) and _TICKER_SHAPE_RE.fullmatch(sym))
+            return sym if listed else None
+        # possessive: "AAPL's" / "AAPL'S"
+        word = word[:-2] if word[-2:] in ("'s", "'S") else word
+        if not word.isupper() or word in UPPERCASE_STOPWORDS:
+            return None
+        if word in self._symbols:
+            return word
+        if unlisted or not self._symbols:
+            return word if _TICKER_SHAPE_RE.fullmatch(word) else None
+        return None
+
+    def find_in_text(self, text: str, limit: Optional[int] = None, unlisted: bool = False,
+                     aliases: bool = True) -> List[str]:
+        """
+        Listed symbols mentioned in text, in order of appearance, deduplicated.
+        One pass over the words; each word costs a hash lookup or two, and
+        multi-word aliases are only tried after a matching first word.
+
+        unlisted=True also accepts ticker-shaped uppercase words missing from
+        the listing (2-5 letters, not a stopword), for listings that are not
+        exhaustive. All-caps text carries no case signal, so there only
+        listed symbols count.
+
+        aliases=False skips company names / nicknames ("apple", "gold",
+        "s&p 500"): only uppercase symbols and $cashtags count.
+        """
+        words = _words(text)
+        unlisted = unlisted and text != text.upper()
+        heads = self._alias_heads
+        found: Dict[str, None] = {}
+        i = 0
+        while i < len(words) and (limit is None or len(found) < limit):
+            step, sym = 1, None
+            word = words[i]
+            low = _norm(word)
+            longest = heads.get(low) if aliases else None
+            if longest:
+                # longest alias first: "bank of america" before "bank"
+                for n in range(min(longest, len(words) - i), 0, -1):
+                    key = " ".join([low] + [_norm(w) for w in words[i + 1:i + n]])
+                    sym = self._aliases.get(key)
+                    if sym is not None:
+                        step = n
+                        break
+            if sym is None:
+                sym = self._ticker(word, unlisted)
+            if sym is not None:
+                found.setdefault(sym, None)
+            i += step
+        return list(found)
+
+
+_INDEX: Optional[SymbolIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    """
+    Process-wide index from MARKET_SYMBOLS_FILE (default data/symbols/us_listing.csv).
+    Without a listing file, falls back to shape-only ticker detection.
+    """
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                path = Path(os.getenv("MARKET_SYMBOLS_FILE", DEFAULT_LISTING))
+                _INDEX = SymbolIndex.from_csv(str(path)) if path.exists() else SymbolIndex()
+    return _INDEX
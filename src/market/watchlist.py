@@ -0,0 +1,47 @@
+# src/market/watchlist.py
+from __future__ import annotations
+
+import os
+from typing import List, Tuple
+
+# ETFs as index proxies (simple + works with most market APIs)
+MAJOR_INDICES = [
+    ("SPY", "S&P 500 (ETF proxy)"),
+    ("QQQ", "Nasdaq 100 (ETF proxy)"),
+    ("DIA", "Dow 30 (ETF proxy)"),
+]
+
+POPULAR_TICKERS = [
+    ("AAPL", "Apple"),
+    ("MSFT", "Microsoft"),
+    ("NVDA", "NVIDIA"),
+    ("AMZN", "Amazon"),
+    ("GOOGL", "Alphabet"),
+    ("TSLA", "Tesla"),
+    ("META", "Meta"),
+]
+
+
+def configured_watchlist() -> List[Tuple[str, str]]:
+    """
+    Extra tickers from MARKET_WATCHLIST (comma separated, e.g. "VTI,BND,JPM").
+    """
+    from src.market.symbols import get_symbol_index
+
+    index = get_symbol_index()
+    out = []
+    for raw in os.getenv("MARKET_WATCHLIST", "").split(","):
+        ticker = raw.strip().upper()
+        if ticker:
+            out.append((ticker, index.name(ticker) or ticker))
+    return out
+
+
+def prefetch_watchlist() -> List[Tuple[str, str]]:
+    """
+    Every ticker kept warm by the background prefetch, deduplicated.
+    """
+    seen = {}
+    for ticker, name in MAJOR_INDICES + POPULAR_TICKERS + configured_watchlist():
+        seen.setdefault(ticker, name)
+    return list(seen.items())
@@ -0,0 +1,179 @@
+# src/portfolio/engine.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# full re-sum after this many incremental edits (float drift)
+RESYNC_EVERY = 512
+
+
+def _codes(labels: Optional[Iterable], n: int):
+    """
+    Dense integer codes + the distinct labels (np.unique), for bincount.
+    Missing labels (None / NaN) share one "Unclassified" group.
+    """
+    if labels is None:
+        return np.zeros(n, dtype=np.int64), np.array([""], dtype=object)
+    arr = np.asarray([str(x) if pd.notna(x) else "Unclassified" for x in labels], dtype=object)
+    names, codes = np.unique(arr, return_inverse=True)
+    return codes.astype(np.int64), names
+
+
+def _numeric(values) -> np.ndarray:
+    try:
+        arr = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # typed-in cells ("", "12a", None): coerce like the old pandas path
+        arr = pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce").to_numpy(dtype=np.float64)
+    return np.nan_to_num(arr, nan=0.0)
+
+
+class PortfolioEngine:
+    """
+    Holdings as parallel NumPy arrays (shares, price, value, group codes).
+
+    Totals, weights, HHI, per-class / per-type breakdowns and top-N are
+    single vectorized passes. The sums behind them (total, sum of squared
+    values, per-group totals) are kept up to date by update_rows(), so
+    editing a holding costs O(edited rows), not O(portfolio).
+    """
+
+    def __init__(self, tickers: Sequence[str], shares, prices,
+                 classes: Optional[Iterable] = None, types: Optional[Iterable] = None):
+        self.tickers = np.asarray([str(t).strip().upper() for t in tickers], dtype=object)
+        n = len(self.tickers)
+        self.shares = _numeric(shares)
+        self.prices = _numeric(prices)
+        self.class_codes, self.class_names = _codes(classes, n)
+        self.type_codes, self.type_names = _codes(types, n)
+        self._resync()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ticker_col: str = "Ticker", shares_col: str = "Shares",
+                   price_col: str = "Price", class_col: Optional[str] = None,
+                   type_col: Optional[str] = "Type") -> "PortfolioEngine":
+        if df is None or df.empty:
+            return cls([], [], [])
+        return cls(
+            df[ticker_col].to_numpy(),
+            df[shares_col].to_numpy(),
+            df[price_col].to_numpy(),
+            classes=df[class_col].to_numpy() if class_col and class_col in df.columns else None,
+            types=df[type_col].to_numpy() if type_col and type_col in df.columns else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def _resync(self):
+        self.values = self.shares * self.prices
+        self._total = float(self.values.sum())
+        self._sum_sq = float(np.dot(self.values, self.values))
+        self._class_totals = np.bincount(self.class_codes, weights=self.values, minlength=len(self.class_names))
+        self._type_totals = np.bincount(self.type_codes, weights=self.values, minlength=len(self.type_names))
+        self._edits = 0
+
+    # -----------------------------
+    # incremental edits
+    # -----------------------------
+    def update_rows(self, rows, shares=None, prices=None) -> None:
+        """
+        New shares and/or prices for the given row positions; the running
+        sums are adjusted by the value deltas only.
+        """
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return
+        if shares is not None:
+            self.shares[rows] = _numeric(np.atleast_1d(shares))
+        if prices is not None:
+            self.prices[rows] = _numeric(np.atleast_1d(prices))
+
+        old = self.values[rows]
+        new = self.shares[rows] * self.prices[rows]
+        delta = new - old
+        self.values[rows] = new
+        self._total += float(delta.sum())
+        self._sum_sq += float(np.dot(new, new) - np.dot(old, old))
+        np.add.at(self._class_totals, self.class_codes[rows], delta)
+        np.add.at(self._type_totals, self.type_codes[rows], delta)
+
+        self._edits += len(rows)
+        if self._edits >= RESYNC_EVERY:
+            self._resync()
+
+    def update_row(self, row: int, shares: Optional[float] = None, price: Optional[float] = None) -> None:
+        self.update_rows([row], shares=None if shares is None else [shares],
+                         prices=None if price is None else [price])
+
+    # -----------------------------
+    # analytics
+    # -----------------------------
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def weights(self) -> np.ndarray:
+        if self._total <= 0:
+            return np.zeros(len(self))
+        return self.values / self._total
+
+    def hhi(self) -> float:
+        """
+        Herfindahl-Hirschman index of the position weights (1 = one holding).
+        """
+        if self._total <= 0:
+            return 0.0
+        return self._sum_sq / (self._total * self._total)
+
+    def diversification_score(self) -> float:
+        # simple heuristic: more spread = better; concentration reduces score
+        if self._total <= 0:
+            return 0.0
+        return max(0.0, min(100.0, (1.0 - self.hhi()) * 100.0))
+
+    def breakdown(self, by: str = "class") -> pd.DataFrame:
+        """
+        Value and AllocationPct per asset class (by="class") or holding type (by="type").
+        """
+        names, totals = (self.class_names, self._class_totals) if by == "class" else (self.type_names, self._type_totals)
+        pct = totals / self._total * 100.0 if self._total > 0 else np.zeros(len(totals))
+        out = pd.DataFrame({by.title(): names, "Value": totals, "AllocationPct": pct.round(2)})
+        return out[out["Value"] != 0].sort_values("Value", ascending=False, ignore_index=True)
+
+    def top(self, n: int = 5) -> List[int]:
+        """
+        Row positions of the n largest holdings by value, largest first.
+        """
+        n = min(n, len(self))
+        if n <= 0:
+            return []
+        idx = np.argpartition(-self.values, n - 1)[:n]
+        return idx[np.argsort(-self.values[idx], kind="stable")].tolist()
+
+    def top_pct(self, n: int = 5) -> float:
+        """
+        Share of the portfolio held in the n largest positions (percent).
+        """
+        if self._total <= 0:
+            return 0.0
+        return float(self.values[self.top(n)].sum() / self._total * 100.0)
+
+    def summary(self, top_n: int = 5) -> Dict[str, object]:
+        top = self.top(1)
+        weights = self.weights()
+        return {
+            "total_value": self._total,
+            "top_asset": str(self.tickers[top[0]]) if top else "N/A",
+            "top_pct": round(float(weights[top[0]] * 100.0), 2) if top else 0.0,
+            f"top{top_n}_pct": round(self.top_pct(top_n), 2),
+            "unique_assets": int(len(np.unique(self.tickers))) if len(self) else 0,
+            "asset_classes": len(self.class_names) if len(self) else 0,
+            "diversification_score": round(self.diversification_score(), 1),
+        }
+
+    def allocation_pct(self) -> np.ndarray:
+        return (self.weights() * 100.0).round(2)
@@ -0,0 +1,142 @@
+# src/portfolio/frontier.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.market.analytics import TRADING_DAYS
+from src.portfolio.risk import MIN_OBSERVATIONS
+from src.utils.cache import TTLCache
+
+FRONTIER_POINTS = 60
+# covariance shrinkage toward its average variance when it is singular
+RIDGE = 1e-6
+
+# (tickers, history) -> Moments; reused while only shares/prices are edited
+_MOMENTS = TTLCache(maxsize=32)
+
+
+@dataclass
+class Moments:
+    """
+    Annualized mean returns / covariance plus the two solves every
+    frontier point is built from (cov^-1 @ 1, cov^-1 @ mu) and their
+    scalars a = 1'x1, b = 1'xm, c = mu'xm, d = ac - b^2.
+    """
+    tickers: List[str]
+    mu: np.ndarray
+    cov: np.ndarray
+    x1: np.ndarray
+    xm: np.ndarray
+    a: float
+    b: float
+    c: float
+    d: float
+    observations: int
+
+
+@dataclass
+class Frontier:
+    """
+    Returns / volatilities are annualized fractions. weights[k] is the
+    minimum-variance portfolio (shorting allowed) for target returns[k].
+    """
+    tickers: List[str]
+    returns: np.ndarray
+    vols: np.ndarray
+    weights: np.ndarray
+    min_var_return: float
+    min_var_vol: float
+    current_return: Optional[float] = None
+    current_vol: Optional[float] = None
+    observations: int = 0
+    missing: List[str] = field(default_factory=list)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "ReturnPct": self.returns * 100.0,
+            "VolPct": self.vols * 100.0,
+            "Efficient": self.returns >= self.min_var_return,
+        })
+
+    def efficient_vol(self, target_return: float) -> float:
+        """
+        Lowest volatility reaching target_return (same-return point on the frontier).
+        """
+        i = np.searchsorted(self.returns, target_return)
+        return float(np.interp(target_return, self.returns, self.vols)) if 0 < i < len(self.returns) \
+            else float("nan")
+
+
+def moments(prices: pd.DataFrame) -> Optional[Moments]:
+    """
+    Moments of daily returns for the columns of `prices`, cached per
+    tickers + history so repeated calls (holding edits) skip the
+    covariance and the solves.
+    """
+    p = prices.dropna()
+    if len(p) <= MIN_OBSERVATIONS or p.shape[1] < 2:
+        return None
+    key = f"{','.join(map(str, p.columns))}|{p.index[0]}|{p.index[-1]}|{len(p)}"
+    hit = _MOMENTS.get(key)
+    if hit is not None:
+        return hit["value"]
+
+    arr = p.to_numpy(dtype=np.float64)
+    r = arr[1:] / arr[:-1] - 1.0
+    mu = r.mean(axis=0) * TRADING_DAYS
+    cov = np.cov(r, rowvar=False) * TRADING_DAYS
+    rhs = np.column_stack([np.ones(len(mu)), mu])
+    try:
+        x = np.linalg.solve(cov, rhs)
+    except np.linalg.LinAlgError:
+        x = np.linalg.solve(cov + RIDGE * np.trace(cov) / len(mu) * np.eye(len(mu)), rhs)
+    a, b, c = float(x[:, 0].sum()), float(x[:, 1].sum()), float(mu @ x[:, 1])
+    out = Moments(tickers=list(map(str, p.columns)), mu=mu, cov=cov, x1=x[:, 0], xm=x[:, 1],
+                  a=a, b=b, c=c, d=a * c - b * b, observations=len(r))
+    _MOMENTS.set(key, out)
+    return out
+
+
+def efficient_frontier(prices: pd.DataFrame, values: Optional[Dict[str, float]] = None,
+                       points: int = FRONTIER_POINTS) -> Optional[Frontier]:
+    """
+    Mean-variance frontier for the tickers in `prices` (fully invested,
+    shorting allowed) over a grid of target returns, plus where `values`
+    (ticker -> $) sits. Every grid point comes from the same closed-form
+    KKT solution w(r) = (x1 (c - b r) + xm (a r - b)) / d, so the grid is
+    one outer product. Returns None with fewer than two usable tickers.
+    """
+    values = values or {}
+    counts = prices.notna().sum()
+    usable = [t for t in counts.index[counts.to_numpy() > MIN_OBSERVATIONS] if not values or t in values]
+    m = moments(prices[usable]) if len(usable) >= 2 else None
+    if m is None or m.d <= 0:
+        return None
+
+    r_mv = m.b / m.a
+    hi = max(float(m.mu.max()), r_mv + 1e-4)
+    lo = min(float(m.mu.min()), r_mv)
+    returns = np.linspace(lo - 0.25 * (hi - lo), hi + 0.25 * (hi - lo), points)
+    weights = (np.outer(m.c - m.b * returns, m.x1) + np.outer(m.a * returns - m.b, m.xm)) / m.d
+    variances = (m.a * returns ** 2 - 2.0 * m.b * returns + m.c) / m.d
+
+    out = Frontier(
+        tickers=m.tickers,
+        returns=returns,
+        vols=np.sqrt(np.maximum(variances, 0.0)),
+        weights=weights,
+        min_var_return=r_mv,
+        min_var_vol=float(np.sqrt(1.0 / m.a)),
+        observations=m.observations,
+        missing=[t for t in values if t not in m.tickers],
+    )
+    v = np.array([values.get(t, 0.0) for t in m.tickers], dtype=np.float64)
+    if v.sum() > 0:
+        w = v / v.sum()
+        out.current_return = float(w @ m.mu)
+        out.current_vol = float(np.sqrt(max(w @ m.cov @ w, 0.0)))
+    return out
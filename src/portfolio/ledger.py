@@ -0,0 +1,483 @@
+# src/portfolio/ledger.py
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DB = os.path.join("data", "portfolio", "positions.sqlite")
+DEFAULT_ACCOUNT = "default"
+DEFAULT_CHUNK_ROWS = 250_000
+# positions at or below this many shares count as closed
+CLOSED_EPS = 1e-9
+
+BUY, SELL, DIVIDEND, SPLIT, OTHER = 0, 1, 2, 3, -1
+
+# canonical column -> header names seen in broker exports (case-insensitive)
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "date": ("date", "trade date", "run date", "transaction date", "activity date", "settlement date"),
+    "action": ("action", "transaction type", "activity", "type", "transaction"),
+    "ticker": ("symbol", "ticker"),
+    "quantity": ("quantity", "shares", "qty", "units"),
+    "price": ("price", "price ($)", "unit price"),
+    "amount": ("amount", "amount ($)", "net amount", "total", "value"),
+    "fees": ("fees", "fee", "commission", "commissions", "fees & comm"),
+    "ratio": ("split ratio", "ratio"),
+    "account": ("account", "account number", "account id", "account name"),
+    "asset_class": ("asset class", "asset_class", "security type", "class"),
+}
+NUMERIC_COLUMNS = ("quantity", "price", "amount", "fees", "ratio")
+POSITION_COLUMNS = [
+    "account", "ticker", "shares", "cost_basis", "avg_cost", "realized_gain",
+    "dividends", "trades", "first_date", "last_date", "asset_class",
+]
+# per-position import warnings (build_positions output only, not stored):
+# sells of more shares than held (clamped at zero) and buys / sells with
+# neither price nor amount (skipped: they have no cost to replay)
+FLAG_COLUMNS = ["oversold", "skipped"]
+
+
+def _action_code(action: str) -> int:
+    a = action.strip().lower()
+    if "split" in a:
+        return SPLIT
+    if "div" in a:
+        # "dividend reinvestment" is a dividend row followed by a buy row
+        return DIVIDEND
+    if "buy" in a or "bought" in a or "reinvest" in a:
+        return BUY
+    if "sell" in a or "sold" in a:
+        return SELL
+    return OTHER
+
+
+def _column_map(header: List[str]) -> Dict[str, str]:
+    """
+    Canonical name -> header in the file; date, action and ticker are required.
+    """
+    lower = {h.strip().lower(): h for h in header}
+    out = {}
+    for canon, names in COLUMN_ALIASES.items():
+        for name in names:
+            if name in lower and lower[name] not in out.values():
+                out[canon] = lower[name]
+                break
+    missing = [c for c in ("date", "action", "ticker") if c not in out]
+    if missing:
+        raise ValueError(f"transaction file is missing columns: {', '.join(missing)}")
+    return out
+
+
+def _money(col: pd.Series) -> np.ndarray:
+    """
+    Float column; read_csv already parsed clean columns as numbers, so only
+    text cells ("$1,234.50", "(12.00)") go through the slower cleanup.
+    """
+    if pd.api.types.is_numeric_dtype(col):
+        return col.to_numpy(dtype=np.float64, na_value=np.nan)
+    out = pd.to_numeric(col, errors="coerce")
+    dirty = out.isna() & col.notna()
+    if dirty.any():
+        text = col[dirty].astype(str).str.strip()
+        negative = text.str.startswith("(") & text.str.endswith(")")
+        cleaned = pd.to_numeric(text.str.replace(r"[$,()\s]", "", regex=True), errors="coerce")
+        out[dirty] = cleaned.where(~negative, -cleaned)
+    return out.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _normalized_symbols(col: pd.Series) -> pd.Categorical:
+    """
+    Stripped, uppercased symbols; the string work runs on the distinct
+    categories only, rows keep integer codes.
+    """
+    cats = col.cat.categories.astype(str).str.strip().str.upper()
+    names, inverse = np.unique(np.asarray(cats, dtype=object), return_inverse=True)
+    codes = col.cat.codes.to_numpy()
+    return pd.Categorical.from_codes(np.where(codes >= 0, inverse[codes], -1), categories=names)
+
+
+def _parse_dates(date: pd.Series) -> np.ndarray:
+    """
+    datetime64 per row of a categorical date column (each distinct value parsed once).
+    """
+    days = pd.to_datetime(date.cat.categories.astype(str), errors="coerce").to_numpy()
+    codes = date.cat.codes.to_numpy()
+    return np.where(codes >= 0, days[codes], np.datetime64("NaT"))
+
+
+def _rewind(source: Any) -> None:
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _date_order(source: Any, date_col: str, chunk_rows: int) -> Tuple[str, int]:
+    """
+    ("oldest_first" | "newest_first" | "unordered", data rows) from one
+    pass over the date column only. All-equal dates count as oldest first.
+    """
+    ascending = descending = True
+    prev, rows = None, 0
+    for raw in pd.read_csv(source, usecols=[date_col], dtype={date_col: "category"}, chunksize=chunk_rows):
+        rows += len(raw)
+        d = _parse_dates(raw[date_col])
+        d = d[~np.isnat(d)]
+        if prev is not None:
+            d = np.concatenate([[prev], d])
+        if len(d) > 1:
+            step = d[1:] - d[:-1]
+            ascending &= bool((step >= np.timedelta64(0)).all())
+            descending &= bool((step <= np.timedelta64(0)).all())
+            prev = d[-1]
+        elif len(d):
+            prev = d[-1]
+    _rewind(source)
+    if ascending:
+        return "oldest_first", rows
+    return ("newest_first" if descending else "unordered"), rows
+
+
+def _normalize(raw: pd.DataFrame, cols: Dict[str, str]) -> pd.DataFrame:
+    n = len(raw)
+    action = raw[cols["action"]]
+    # classify each distinct label once, then index by category code
+    lookup = np.array([_action_code(str(c)) for c in action.cat.categories] + [OTHER], dtype=np.int8)
+    codes = lookup[action.cat.codes.to_numpy()]
+
+    if "account" in cols:
+        account = _normalized_symbols(raw[cols["account"]])
+    else:
+        account = pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[DEFAULT_ACCOUNT])
+    chunk = pd.DataFrame({
+        "date": _parse_dates(raw[cols["date"]]),
+        "action": codes,
+        "account": account,
+        "ticker": _normalized_symbols(raw[cols["ticker"]]),
+    })
+    for canon in NUMERIC_COLUMNS:
+        chunk[canon] = _money(raw[cols[canon]]) if canon in cols else np.full(n, np.nan)
+    chunk["quantity"] = np.abs(chunk["quantity"].to_numpy())
+    chunk["asset_class"] = raw[cols["asset_class"]].to_numpy() if "asset_class" in cols else None
+
+    keep = ((codes != OTHER) & chunk["date"].notna().to_numpy()
+            & (chunk["ticker"].cat.codes.to_numpy() >= 0) & (chunk["account"].cat.codes.to_numpy() >= 0))
+    return chunk[keep].reset_index(drop=True)
+
+
+def read_transactions(source: Any, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      order: str = "auto") -> Iterator[pd.DataFrame]:
+    """
+    Normalized transaction chunks from a broker CSV export (path or file
+    object), oldest first. Only the mapped columns are read, labels as
+    categories and amounts as float64 (text amounts are cleaned per chunk).
+
+    Each chunk has date, action (BUY/SELL/DIVIDEND/SPLIT code), account and
+    ticker (categorical), quantity (unsigned), price, amount, fees, ratio,
+    asset_class. Rows without a date, ticker or known action are dropped.
+
+    order="auto" reads the date column once to find the file's direction:
+    oldest-first files stream as they are; newest-first files (common for
+    broker exports) are read chunk by chunk from the end and each chunk
+    reversed; files in no date order are loaded whole and stably sorted by
+    date (memory grows with the file). Pass "oldest_first" /
+    "newest_first" to skip the detection pass.
+    """
+    header = list(pd.read_csv(source, nrows=0).columns)
+    _rewind(source)
+    cols = _column_map(header)
+    # exports repeat few distinct labels / dates: parse each distinct value once
+    dtypes = {src: "category" for canon, src in cols.items()
+              if canon in ("date", "action", "account", "ticker", "asset_class")}
+    usecols = list(cols.values())
+
+    rows = None
+    if order == "auto":
+        order, rows = _date_order(source, cols["date"], chunk_rows)
+    if order == "oldest_first":
+        for raw in pd.read_csv(source, usecols=usecols, dtype=dtypes, chunksize=chunk_rows):
+            yield _normalize(raw, cols)
+    elif order == "newest_first":
+        if rows is None:
+            rows = sum(len(c) for c in pd.read_csv(source, usecols=[cols["date"]], chunksize=chunk_rows))
+            _rewind(source)
+        for stop in range(rows, 0, -chunk_rows):
+            first = max(stop - chunk_rows, 0)
+            # int skiprows (header + earlier rows) is skipped by the C parser without building a row set
+            raw = pd.read_csv(source, header=None, names=header, usecols=usecols, dtype=dtypes,
+                              skiprows=first + 1, nrows=stop - first)
+            _rewind(source)
+            yield _normalize(raw.iloc[::-1], cols)
+    elif order == "unordered":
+        tx = _normalize(pd.read_csv(source, usecols=usecols, dtype=dtypes), cols)
+        tx = tx.sort_values("date", kind="stable", ignore_index=True)
+        for lo in range(0, len(tx), chunk_rows):
+            yield tx.iloc[lo:lo + chunk_rows]
+    else:
+        raise ValueError(f"order must be 'auto', 'oldest_first', 'newest_first' or 'unordered', not {order!r}")
+
+
+def _seg_cumsum(x: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """
+    Cumulative sum restarting at each segment; start[i] = first row of i's segment.
+    (grouped cumsum, not one global cumsum minus offsets: that loses precision
+    once earlier segments are large)
+    """
+    return pd.Series(x).groupby(start, sort=False).cumsum().to_numpy()
+
+
+def _row_starts(is_start: np.ndarray) -> np.ndarray:
+    idx = np.where(is_start, np.arange(len(is_start)), 0)
+    return np.maximum.accumulate(idx)
+
+
+def _replay(tx: pd.DataFrame, carry: pd.DataFrame) -> pd.DataFrame:
+    """
+    Average-cost replay of one chunk, all positions at once.
+
+    Shares follow S_t = a_t * S_{t-1} + b_t (buys/sells add, ratio splits
+    multiply) and cost basis C_t = a'_t * C_{t-1} + b'_t (buys add cost,
+    sells scale it by S_t / S_{t-1}). Both are solved per position with
+    segmented cumulative sums in log space instead of a row loop; a
+    position that closes starts a fresh segment. carry holds shares /
+    cost_basis per (account, ticker) from earlier chunks.
+
+    Shares never go below zero: a sell of more than is held closes the
+    position (S_t = max(0, ...), solved as a running minimum) and only the
+    shares held are realized. Buys / sells without price or amount are
+    skipped. Both are counted per position (FLAG_COLUMNS).
+
+    Returns the chunk's per-position result (final shares / cost basis and
+    the chunk's realized gain, dividends, trades, dates, asset class, flags).
+    """
+    acode = tx["account"].cat.codes.to_numpy()
+    tcode = tx["ticker"].cat.codes.to_numpy()
+    # stable: same-day rows keep file order
+    order = np.lexsort((tx["date"].to_numpy(), tcode, acode))
+    acode, tcode = acode[order], tcode[order]
+    n = len(order)
+    grp_start = np.ones(n, dtype=bool)
+    grp_start[1:] = (acode[1:] != acode[:-1]) | (tcode[1:] != tcode[:-1])
+    first = np.flatnonzero(grp_start)
+    g_start = _row_starts(grp_start)
+
+    keys = pd.MultiIndex.from_arrays(
+        [tx["account"].cat.categories[acode[first]], tx["ticker"].cat.categories[tcode[first]]],
+        names=["account", "ticker"],
+    )
+    prior = carry.reindex(keys)
+    s0 = np.nan_to_num(prior["shares"].to_numpy(dtype=np.float64))
+    c0 = np.nan_to_num(prior["cost_basis"].to_numpy(dtype=np.float64))
+    # group index of every row
+    gid = np.cumsum(grp_start) - 1
+
+    def col(name):
+        return tx[name].to_numpy()[order]
+
+    action = col("action")
+    qty = np.nan_to_num(col("quantity"))
+    price = col("price")
+    amount = np.abs(col("amount"))
+    fees = np.nan_to_num(col("fees"))
+    ratio = col("ratio")
+    # a trade with no price and no amount has no cost: replaying it would make the basis NaN
+    unpriced = np.isin(action, (BUY, SELL)) & np.isnan(price) & np.isnan(amount)
+    is_buy, is_sell = (action == BUY) & ~unpriced, (action == SELL) & ~unpriced
+    is_split, is_div = action == SPLIT, action == DIVIDEND
+
+    # shares: multiplicative part from ratio splits, additive part from trades
+    has_ratio = is_split & (ratio > 0)
+    a = np.where(has_ratio, ratio, 1.0)
+    b = np.where(is_buy | (is_split & ~has_ratio), qty, 0.0) - np.where(is_sell, qty, 0.0)
+    log_p = _seg_cumsum(np.log(a), g_start)
+    p = np.exp(log_p)
+    level = s0[gid] + _seg_cumsum(b / p, g_start)
+    # floored at zero: subtract the running minimum below zero (splits scale by p > 0, so
+    # the floor holds in the split-adjusted units too)
+    floor = pd.Series(np.minimum(level, 0.0)).groupby(g_start, sort=False).cummin().to_numpy()
+    shares = p * (level - floor)
+    shares[np.abs(shares) <= CLOSED_EPS] = 0.0
+    prev_shares = np.where(grp_start, s0[gid], np.roll(shares, 1))
+    oversold = is_sell & (prev_shares - qty < -CLOSED_EPS)
+
+    # cost basis: a position that goes to zero ends its segment
+    closes = is_sell & (shares <= CLOSED_EPS)
+    seg_first = grp_start.copy()
+    seg_first[1:] |= closes[:-1] & ~grp_start[1:]
+    seg = _row_starts(seg_first)
+    cost_in = np.where(is_buy, np.where(np.isnan(amount), qty * price + fees, amount), 0.0)
+    scale = np.ones(n)
+    partial = is_sell & ~closes & (prev_shares > CLOSED_EPS)
+    scale[partial] = shares[partial] / prev_shares[partial]
+    pc = np.exp(_seg_cumsum(np.log(scale), seg))
+    c_start = np.where(seg == g_start, c0[gid], 0.0)
+    cost = pc * (c_start + _seg_cumsum(cost_in / pc, seg))
+    cost[closes] = 0.0
+    prev_cost = np.where(grp_start, c0[gid], np.roll(cost, 1))
+
+    proceeds = np.where(np.isnan(amount), qty * price - fees, amount)
+    # an oversell realizes the shares that were held only
+    held = np.divide(prev_shares, qty, out=np.zeros(n), where=oversold)
+    proceeds = np.where(oversold, proceeds * held, proceeds)
+    realized = np.where(is_sell, proceeds - (prev_cost - cost), 0.0)
+    dividends = np.where(is_div, np.where(np.isnan(amount), qty * price, amount), 0.0)
+
+    last = np.append(first[1:], n) - 1
+    dates = col("date")
+    out = pd.DataFrame({
+        "shares": shares[last],
+        "cost_basis": cost[last],
+        "realized_gain": np.add.reduceat(np.nan_to_num(realized), first),
+        "dividends": np.add.reduceat(np.nan_to_num(dividends), first),
+        "trades": np.add.reduceat((is_buy | is_sell).astype(np.int64), first),
+        "oversold": np.add.reduceat(oversold.astype(np.int64), first),
+        "skipped": np.add.reduceat(unpriced.astype(np.int64), first),
+        "first_date": dates[first],
+        "last_date": dates[last],
+    }, index=keys)
+    if tx["asset_class"].notna().any():
+        out["asset_class"] = pd.Series(col("asset_class")).groupby(gid).last().to_numpy()
+    else:
+        out["asset_class"] = None
+    return out
+
+
+def _fold(state: pd.DataFrame, part: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merges one chunk's per-position result into the running state (one
+    grouped pass; part is later in time than state).
+    """
+    if state.empty:
+        return part
+    both = pd.concat([state, part])
+    return both.groupby(level=[0, 1], sort=False).agg({
+        "shares": "last", "cost_basis": "last", "realized_gain": "sum", "dividends": "sum",
+        "trades": "sum", "oversold": "sum", "skipped": "sum",
+        "first_date": "min", "last_date": "max", "asset_class": "last",
+    })
+
+
+def build_positions(chunks: Iterator[pd.DataFrame]) -> Tuple[pd.DataFrame, int]:
+    """
+    Positions (POSITION_COLUMNS + FLAG_COLUMNS) from transaction chunks in
+    chronological order (oldest first across chunks, as read_transactions
+    yields them); returns (positions, transactions read). Memory is bounded by one chunk
+    plus one row per position. Raises ValueError when a chunk starts
+    before the previous one ended: replaying it would silently give a
+    wrong cost basis.
+    """
+    state = pd.DataFrame(columns=["shares", "cost_basis", "realized_gain", "dividends", "trades",
+                                  "oversold", "skipped", "first_date", "last_date", "asset_class"])
+    rows = 0
+    latest = None
+    for chunk in chunks:
+        rows += len(chunk)
+        if len(chunk):
+            dates = chunk["date"].to_numpy()
+            if latest is not None and dates.min() < latest:
+                raise ValueError(
+                    f"Transactions go back in time across chunks ({pd.Timestamp(dates.min()):%Y-%m-%d} "
+                    f"after {pd.Timestamp(latest):%Y-%m-%d}); read them with read_transactions(order='auto')."
+                )
+            latest = dates.max()
+            state = _fold(state, _replay(chunk, state))
+
+    out = state.reset_index().rename(columns={"level_0": "account", "level_1": "ticker"})
+    if out.empty:
+        return pd.DataFrame(columns=POSITION_COLUMNS + FLAG_COLUMNS), rows
+    shares = out["shares"].to_numpy(dtype=np.float64)
+    out["avg_cost"] = np.where(shares > CLOSED_EPS, out["cost_basis"] / np.where(shares > 0, shares, 1.0), 0.0)
+    for c in ["trades"] + FLAG_COLUMNS:
+        out[c] = out[c].astype(np.int64)
+    return out[POSITION_COLUMNS + FLAG_COLUMNS], rows
+
+
+class PositionStore:
+    """
+    Imported positions in one SQLite file (PORTFOLIO_DB), keyed by
+    (account, ticker) with a ticker index; PortfolioAgent and the Portfolio
+    tab read from it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("PORTFOLIO_DB", DEFAULT_DB)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # one short-lived connection per call: safe across threads and processes
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            " account TEXT NOT NULL, ticker TEXT NOT NULL, shares REAL NOT NULL,"
+            " cost_basis REAL NOT NULL, avg_cost REAL NOT NULL, realized_gain REAL NOT NULL,"
+            " dividends REAL NOT NULL, trades INTEGER NOT NULL, first_date TEXT, last_date TEXT,"
+            " asset_class TEXT, imported_at TEXT NOT NULL, PRIMARY KEY (account, ticker)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_positions_ticker ON positions (ticker)")
+        return conn
+
+    def replace_accounts(self, positions: pd.DataFrame) -> None:
+        """
+        Replaces every account present in positions (an export is the full history).
+        """
+        df = positions.copy()
+        for col in ("first_date", "last_date"):
+            df[col] = pd.to_datetime(df[col]).dt.strftime("%Y-%m-%d")
+        df["asset_class"] = df["asset_class"].astype(object).where(df["asset_class"].notna(), None)
+        df["imported_at"] = datetime.now().isoformat(timespec="seconds")
+        rows = df[POSITION_COLUMNS + ["imported_at"]].itertuples(index=False, name=None)
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM positions WHERE account = ?",
+                             [(a,) for a in df["account"].unique()])
+            conn.executemany(f"INSERT INTO positions VALUES ({', '.join('?' * (len(POSITION_COLUMNS) + 1))})", rows)
+
+    def positions(self, account: Optional[str] = None, open_only: bool = True) -> pd.DataFrame:
+        if not self.exists():
+            return pd.DataFrame(columns=POSITION_COLUMNS)
+        sql, args = "SELECT * FROM positions WHERE 1 = 1", []
+        if account is not None:
+            sql += " AND account = ?"
+            args.append(account)
+        if open_only:
+            sql += f" AND shares > {CLOSED_EPS}"
+        with self._connect() as conn:
+            return pd.read_sql_query(sql + " ORDER BY account, ticker", conn, params=args)
+
+    def accounts(self) -> List[str]:
+        if not self.exists():
+            return []
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT account FROM positions ORDER BY account")]
+
+
+@dataclass
+class ImportResult:
+    transactions: int
+    positions: pd.DataFrame
+    seconds: float
+
+    def flagged(self) -> pd.DataFrame:
+        """
+        Positions with oversold or skipped rows (FLAG_COLUMNS > 0).
+        """
+        pos = self.positions
+        return pos[(pos[FLAG_COLUMNS] > 0).any(axis=1)] if len(pos) else pos
+
+
+def import_transactions(source: Any, store: Optional[PositionStore] = None,
+                        chunk_rows: int = DEFAULT_CHUNK_ROWS) -> ImportResult:
+    """
+    Streams a broker transaction CSV into the position store.
+    """
+    t0 = time.perf_counter()
+    positions, rows = build_positions(read_transactions(source, chunk_rows=chunk_rows))
+    (store or PositionStore()).replace_accounts(positions)
+    return ImportResult(transactions=rows, positions=positions, seconds=time.perf_counter() - t0)
@@ -0,0 +1,166 @@
+# src/portfolio/pricing.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.market.http import INTERACTIVE
+from src.utils.cache import is_fresh
+
+# holding types that are never looked up (priced at their manual value)
+UNPRICED_TYPES = frozenset({"cash"})
+# a ticker the provider had nothing for is not asked again for this long
+FAILED_QUOTE_TTL_MIN = 10
+
+
+class Quote(NamedTuple):
+    price: float
+    as_of: pd.Timestamp  # date of the closing bar
+    fetched_at: datetime  # when that history was downloaded
+
+
+def _last_close(df: Optional[pd.DataFrame]) -> Optional[tuple]:
+    if df is None or df.empty or "Close" not in df.columns:
+        return None
+    close = df["Close"].to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = np.flatnonzero(np.isfinite(close))
+    if not len(ok):
+        return None
+    return float(close[ok[-1]]), df["Date"].iloc[ok[-1]]
+
+
+def quotes_from_history(loaded: Dict[str, Any]) -> Dict[str, Quote]:
+    """
+    Latest close per ticker from load_daily_many-style results
+    ({ticker: (df, fetched_at) or None}); tickers without a close are left out.
+    """
+    quotes: Dict[str, Quote] = {}
+    for t, hit in loaded.items():
+        if hit is None:
+            continue
+        last = _last_close(hit[0])
+        if last is not None:
+            quotes[t] = Quote(last[0], last[1], hit[1])
+    return quotes
+
+
+def live_prices(tickers: Iterable[str], data: Any = None, local_only: bool = False,
+                priority: int = INTERACTIVE, min_points: int = 1) -> Dict[str, Quote]:
+    """
+    Latest close for many tickers through the shared market data path.
+
+    One MarketData.load_daily_many call: history already in memory / the
+    price store is served as is (stale series refresh in the background) and
+    only the rest is downloaded, in a single provider.fetch_many round trip
+    for bulk providers. local_only never touches the network.
+    Tickers without usable history are left out.
+
+    min_points asks for that much history up front: callers that also need
+    the series (risk, frontier) pass their lookback so a cold ticker is
+    downloaded once in full instead of compact now and full later.
+    """
+    if data is None:
+        from src.market.data import get_market_data
+
+        data = get_market_data()
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    if not tickers:
+        return {}
+
+    if local_only:
+        loaded = {t: data.read_local(t, min_points=1) for t in tickers}
+    else:
+        loaded = data.load_daily_many(tickers, min_points=min_points, priority=priority)
+    return quotes_from_history(loaded)
+
+
+class PriceBook:
+    """
+    Quotes for the holdings of one session (kept in st.session_state).
+
+    update() only asks for tickers that have no quote yet or whose quote is
+    past the market cache TTL, so editing or adding one holding does not
+    requote the whole portfolio. Tickers that came back empty (typos,
+    delisted, quota) are remembered for FAILED_QUOTE_TTL_MIN and not
+    requested again on every rerun.
+    """
+
+    def __init__(self, data: Any = None, min_points: int = 1):
+        self._data = data
+        # history length to load with each quote (see live_prices)
+        self.min_points = min_points
+        self.quotes: Dict[str, Quote] = {}
+        self.failed: Dict[str, datetime] = {}
+
+    @property
+    def data(self):
+        if self._data is None:
+            from src.market.data import get_market_data
+
+            self._data = get_market_data()
+        return self._data
+
+    def needs_quote(self, tickers: Iterable[str]) -> List[str]:
+        is_stale = self.data.cache.is_stale
+        out = []
+        for t in dict.fromkeys(tickers):
+            q = self.quotes.get(t)
+            if q is not None and not is_stale(q.fetched_at):
+                continue
+            if is_fresh(self.failed.get(t), FAILED_QUOTE_TTL_MIN):
+                continue
+            out.append(t)
+        return out
+
+    def update(self, tickers: Iterable[str], local_only: bool = False) -> List[str]:
+        """
+        Requotes missing/stale tickers in one batch; returns the tickers asked for.
+        """
+        todo = self.needs_quote(t.strip().upper() for t in tickers if t and t.strip())
+        if not todo:
+            return todo
+        got = live_prices(todo, data=self.data, local_only=local_only, min_points=self.min_points)
+        self.quotes.update(got)
+        if not local_only:
+            now = datetime.now()
+            for t in todo:
+                if t in got:
+                    self.failed.pop(t, None)
+                else:
+                    self.failed[t] = now
+        return todo
+
+    def clear(self):
+        """
+        Forgets all quotes and failures (explicit refresh).
+        """
+        self.quotes.clear()
+        self.failed.clear()
+
+    def as_series(self) -> pd.Series:
+        return pd.Series({t: q.price for t, q in self.quotes.items()}, dtype="float64")
+
+
+def apply_prices(df: pd.DataFrame, quotes: Dict[str, Quote], ticker_col: str = "Ticker",
+                 type_col: str = "Type") -> pd.DataFrame:
+    """
+    Holdings with Price replaced by the live quote where one exists (one
+    vectorized map over the frame); PriceSource says "live" or "manual" and
+    PriceAsOf carries the bar date. Manual prices stay for unquoted rows and
+    unpriced types (cash).
+    """
+    df = df.copy()
+    tickers = df[ticker_col].astype(str).str.upper().str.strip()
+    live = tickers.map({t: q.price for t, q in quotes.items()})
+    if type_col in df.columns:
+        live = live.where(~df[type_col].astype(str).str.lower().isin(UNPRICED_TYPES))
+    has_live = live.notna()
+
+    manual = pd.to_numeric(df["Price"], errors="coerce") if "Price" in df.columns else np.nan
+    df["Price"] = live.where(has_live, manual)
+    df["PriceSource"] = np.where(has_live, "live", "manual")
+    df["PriceAsOf"] = tickers.map({t: q.as_of for t, q in quotes.items()}).where(has_live)
+    return df
@@ -0,0 +1,195 @@
+# src/portfolio/rebalance.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# no trade while a holding is within this many weight points of target
+DRIFT_BAND = 0.05
+DEFAULT_LOT = 1.0
+
+Targets = Union[Mapping[str, float], pd.DataFrame]
+
+
+@dataclass
+class RebalancePlan:
+    """
+    Trades for A accounts x N tickers. trades[a, i] is a share count
+    (+ buy / - sell); weights_* are fractions of each account's total
+    value including cash.
+    """
+    accounts: List[str]
+    tickers: List[str]
+    prices: np.ndarray
+    trades: np.ndarray
+    cash_before: np.ndarray
+    cash_after: np.ndarray
+    weights_before: np.ndarray
+    weights_after: np.ndarray
+    targets: np.ndarray
+
+    @property
+    def turnover(self) -> np.ndarray:
+        """
+        Traded value (buys + sells) per account.
+        """
+        return np.abs(self.trades * self.prices).sum(axis=1)
+
+    def trade_list(self) -> pd.DataFrame:
+        """
+        One row per non-zero trade: account, ticker, action, shares, price, value.
+        """
+        a, i = np.nonzero(self.trades)
+        qty = self.trades[a, i]
+        price = np.broadcast_to(self.prices, self.trades.shape)[a, i]
+        return pd.DataFrame({
+            "account": np.asarray(self.accounts, dtype=object)[a],
+            "ticker": np.asarray(self.tickers, dtype=object)[i],
+            "action": np.where(qty > 0, "BUY", "SELL"),
+            "shares": np.abs(qty),
+            "price": price,
+            "value": np.abs(qty) * price,
+        })
+
+
+def _lots(shares: np.ndarray, lot: np.ndarray) -> np.ndarray:
+    """
+    Whole lots, rounded toward zero so a trade never overshoots its target.
+    """
+    return np.floor(shares / lot + 1e-9) * lot
+
+
+def plan_trades(shares: np.ndarray, prices: np.ndarray, targets: np.ndarray,
+                cash: Union[float, np.ndarray] = 0.0, lot: Union[float, np.ndarray] = DEFAULT_LOT,
+                band: Union[float, np.ndarray] = DRIFT_BAND, cash_reserve: Union[float, np.ndarray] = 0.0,
+                accounts: Optional[List[str]] = None, tickers: Optional[List[str]] = None) -> RebalancePlan:
+    """
+    Minimal trades bringing every account back to its target weights.
+
+    shares (A x N), prices (N or A x N) and targets (N or A x N, summing
+    to <= 1; the remainder is the cash target) are dense arrays, so one
+    call plans every account. Only holdings drifted more than `band` from
+    target trade, back to target. Sells are in whole lots (a zero target
+    sells everything), buys are funded by cash plus sell proceeds above
+    cash_reserve, scaled down pro rata when short, then rounded down to
+    whole lots.
+    """
+    shares = np.atleast_2d(np.asarray(shares, dtype=np.float64))
+    n_acc, n = shares.shape
+    prices = np.broadcast_to(np.asarray(prices, dtype=np.float64), shares.shape)
+    targets = np.broadcast_to(np.asarray(targets, dtype=np.float64), shares.shape)
+    cash = np.broadcast_to(np.asarray(cash, dtype=np.float64), (n_acc,)).copy()
+    lot = np.broadcast_to(np.asarray(lot, dtype=np.float64), (n,))
+    if (targets < 0).any() or (targets.sum(axis=1) > 1.0 + 1e-9).any():
+        raise ValueError("Target weights must be >= 0 and sum to at most 1 per account.")
+
+    tradable = np.isfinite(prices) & (prices > 0)
+    values = np.where(tradable, shares * prices, 0.0)
+    total = values.sum(axis=1) + cash
+    safe_total = np.where(total > 0, total, 1.0)[:, None]
+    weights = values / safe_total
+
+    drift = weights - targets
+    desired = np.where(tradable & (np.abs(drift) > band), -drift * safe_total, 0.0)
+    safe_prices = np.where(tradable, prices, 1.0)
+
+    sell = np.minimum(_lots(np.maximum(-desired, 0.0) / safe_prices, lot), shares)
+    sell = np.where((desired < 0) & (targets <= 0), shares, sell)
+    proceeds = (sell * safe_prices).sum(axis=1)
+
+    buy_value = np.maximum(desired, 0.0)
+    need = buy_value.sum(axis=1)
+    budget = np.maximum(cash + proceeds - cash_reserve, 0.0)
+    scale = np.where(need > budget, budget / np.where(need > 0, need, 1.0), 1.0)
+    buy = _lots(buy_value * scale[:, None] / safe_prices, lot)
+
+    trades = buy - sell
+    cash_after = cash + proceeds - (buy * safe_prices).sum(axis=1)
+    return RebalancePlan(
+        accounts=list(accounts) if accounts is not None else [str(a) for a in range(n_acc)],
+        tickers=list(tickers) if tickers is not None else [str(i) for i in range(n)],
+        prices=prices,
+        trades=trades,
+        cash_before=cash,
+        cash_after=cash_after,
+        weights_before=weights,
+        weights_after=(values + trades * safe_prices) / safe_total,
+        targets=targets,
+    )
+
+
+def class_weights(values: np.ndarray, classes: List[str], class_targets: np.ndarray,
+                  class_names: List[str]) -> np.ndarray:
+    """
+    Per-class targets (A x C) spread over tickers (A x N) in proportion to
+    what each account already holds in that class; a class the account
+    does not hold yet is split equally across its tickers.
+    """
+    values = np.atleast_2d(values)
+    codes = pd.Index(class_names).get_indexer(classes)
+    known = codes >= 0
+    onehot = np.zeros((len(classes), len(class_names)))
+    onehot[np.flatnonzero(known), codes[known]] = 1.0
+
+    held = values @ onehot  # A x C
+    members = onehot.sum(axis=0)  # tickers per class
+    share = np.where(held[:, codes.clip(0)] > 0, values / np.where(held > 0, held, 1.0)[:, codes.clip(0)],
+                     1.0 / np.maximum(members, 1.0)[codes.clip(0)])
+    return np.where(known, np.atleast_2d(class_targets)[:, codes.clip(0)] * share, 0.0)
+
+
+def _target_matrix(targets: Targets, accounts: List[str], keys: List[str]) -> np.ndarray:
+    if isinstance(targets, pd.DataFrame):
+        frame = targets.rename(columns=lambda c: str(c).strip()).reindex(index=accounts, columns=keys)
+        return frame.fillna(0.0).to_numpy(dtype=np.float64)
+    row = np.array([float(targets.get(k, 0.0)) for k in keys])
+    return np.broadcast_to(row, (len(accounts), len(keys)))
+
+
+def rebalance_positions(positions: pd.DataFrame, prices: Mapping[str, float], targets: Targets,
+                        by: str = "ticker", cash: Union[float, Mapping[str, float]] = 0.0,
+                        lot: Union[float, Mapping[str, float]] = DEFAULT_LOT, band: float = DRIFT_BAND,
+                        cash_reserve: float = 0.0) -> RebalancePlan:
+    """
+    Rebalancing plan for ledger positions (account, ticker, shares,
+    asset_class rows, e.g. PositionStore.positions()) across all accounts
+    in one batch.
+
+    targets maps ticker (by="ticker") or asset class (by="class") to a
+    weight, shared by every account, or is a DataFrame of weights indexed
+    by account. Target tickers an account does not hold are bought.
+    """
+    if by not in ("ticker", "class"):
+        raise ValueError(f"by must be 'ticker' or 'class', not {by!r}")
+    pos = positions[["account", "ticker", "shares"] + (["asset_class"] if "asset_class" in positions else [])]
+    acc = pd.Categorical(pos["account"].astype(str))
+    accounts = list(acc.categories)
+
+    target_keys = list(targets.columns if isinstance(targets, pd.DataFrame) else targets.keys())
+    tickers = list(dict.fromkeys(list(pos["ticker"].astype(str)) + (target_keys if by == "ticker" else [])))
+    tick = pd.Categorical(pos["ticker"].astype(str), categories=tickers)
+
+    shares = np.zeros((len(accounts), len(tickers)))
+    np.add.at(shares, (acc.codes, tick.codes), pos["shares"].to_numpy(dtype=np.float64))
+    price = np.array([float(prices.get(t, np.nan)) for t in tickers])
+
+    if isinstance(cash, Mapping):
+        cash = np.array([float(cash.get(a, 0.0)) for a in accounts])
+    if isinstance(lot, Mapping):
+        lot = np.array([float(lot.get(t, DEFAULT_LOT)) for t in tickers])
+
+    if by == "ticker":
+        weights = _target_matrix(targets, accounts, tickers)
+    else:
+        labels = pos.drop_duplicates("ticker").set_index("ticker").get("asset_class")
+        labels = labels.reindex(tickers) if labels is not None else pd.Series(index=tickers, dtype=object)
+        classes = [str(c) if pd.notna(c) else "Unclassified" for c in labels]
+        values = np.where(np.isfinite(price), shares * price, 0.0)
+        weights = class_weights(values, classes, _target_matrix(targets, accounts, target_keys), target_keys)
+
+    return plan_trades(shares, price, weights, cash=cash, lot=lot, band=band, cash_reserve=cash_reserve,
+                       accounts=accounts, tickers=tickers)
+
@@ -0,0 +1,201 @@
+# src/portfolio/risk.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.market.analytics import TRADING_DAYS, price_matrix
+from src.market.data import COMPACT_POINTS
+from src.market.http import INTERACTIVE
+
+RISK_LOOKBACK = 252
+# bars an interactive caller waits for: one compact download; the rest of
+# the lookback is backfilled in the background (see load_history)
+INTERACTIVE_POINTS = min(RISK_LOOKBACK + 1, COMPACT_POINTS)
+CONFIDENCE = 0.95
+MC_PATHS = 100_000
+# working set per Monte Carlo chunk (shocks + compounded growth), in bytes
+MC_CHUNK_BYTES = 64 * 1024 * 1024
+# fewer daily returns than this and the covariance is not worth reporting
+MIN_OBSERVATIONS = 20
+
+
+@dataclass
+class RiskReport:
+    """
+    Loss figures are positive numbers: VaR / CVaR in dollars and as a
+    percent of the portfolio's total value, over horizon_days.
+    """
+    total_value: float
+    covered_value: float
+    vol_ann_pct: float
+    horizon_days: int
+    confidence: float
+    observations: int
+    var: Dict[str, float] = field(default_factory=dict)
+    cvar: Dict[str, float] = field(default_factory=dict)
+    tickers: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    def table(self) -> pd.DataFrame:
+        rows = []
+        for method, label in (("historical", "Historical"), ("parametric", "Parametric (normal)"),
+                              ("monte_carlo", "Monte Carlo")):
+            if method in self.var:
+                rows.append({
+                    "Method": label,
+                    "VaR $": self.var[method],
+                    "VaR %": self.var[method] / self.total_value * 100.0 if self.total_value else 0.0,
+                    "CVaR $": self.cvar[method],
+                    "CVaR %": self.cvar[method] / self.total_value * 100.0 if self.total_value else 0.0,
+                })
+        return pd.DataFrame(rows)
+
+
+def load_history(tickers: Iterable[str], data: Any = None, lookback: int = RISK_LOOKBACK,
+                 local_only: bool = False, priority: int = INTERACTIVE) -> Dict[str, Any]:
+    """
+    {ticker: (daily frame, fetched_at) or None} from one batched
+    load_daily_many call, or memory/disk only with local_only. Latest
+    prices can come from the same frames (pricing.quotes_from_history), so
+    nothing is downloaded twice.
+
+    Cold tickers wait for a compact download only (INTERACTIVE_POINTS
+    bars); the full lookback is fetched in the background and used from
+    the next call on, so risk is computed on what is available meanwhile.
+    """
+    if data is None:
+        from src.market.data import get_market_data
+
+        data = get_market_data()
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    if local_only:
+        return {t: data.read_local(t) for t in tickers}
+    loaded = data.load_daily_many(tickers, min_points=min(lookback + 1, INTERACTIVE_POINTS), priority=priority)
+    data.backfill_in_background([t for t, hit in loaded.items() if hit[0] is not None], lookback + 1)
+    return loaded
+
+
+def history_prices(loaded: Dict[str, Any], lookback: int = RISK_LOOKBACK) -> pd.DataFrame:
+    """
+    Aligned daily closes (last lookback + 1 bars) from load_history results.
+    """
+    prices = price_matrix({t: hit[0] if hit else None for t, hit in loaded.items()})
+    return prices.iloc[-(lookback + 1):] if len(prices) else prices
+
+
+def load_prices(tickers: Iterable[str], data: Any = None, lookback: int = RISK_LOOKBACK,
+                local_only: bool = False, priority: int = INTERACTIVE) -> pd.DataFrame:
+    """
+    Aligned daily closes (up to the last lookback + 1 bars) from the market data path.
+    """
+    loaded = load_history(tickers, data=data, lookback=lookback, local_only=local_only, priority=priority)
+    return history_prices(loaded, lookback)
+
+
+def _factor(cov: np.ndarray) -> np.ndarray:
+    """
+    N x k matrix L with L @ L.T == cov. Cholesky when cov is full rank;
+    otherwise (fewer observations than assets, duplicate holdings) the
+    eigen square root over the k non-zero directions, so the simulation
+    draws k shocks per day instead of N.
+    """
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh(cov)
+        keep = vals > vals.max() * 1e-12
+        return vecs[:, keep] * np.sqrt(vals[keep])
+
+
+def _tail(pnl: np.ndarray, confidence: float) -> tuple:
+    """
+    (VaR, CVaR) as positive losses from a P&L sample.
+    """
+    cut = np.quantile(pnl, 1.0 - confidence)
+    return float(-cut), float(-pnl[pnl <= cut].mean())
+
+
+def monte_carlo_pnl(values: np.ndarray, mu: np.ndarray, cov: np.ndarray, horizon_days: int = 1,
+                    paths: int = MC_PATHS, seed: Optional[int] = None,
+                    chunk_paths: Optional[int] = None) -> np.ndarray:
+    """
+    P&L of holding `values` (dollars per asset) over horizon_days, from
+    correlated normal daily returns (mu + L z) compounded day by day.
+
+    Paths are simulated in chunks sized to MC_CHUNK_BYTES, so memory stays
+    flat whatever paths x assets is; each chunk is a few matrix products.
+    """
+    n = len(values)
+    factor_t = _factor(cov).T
+    k = factor_t.shape[0]
+    chunk = chunk_paths or max(1, MC_CHUNK_BYTES // (8 * (2 * n + k)))
+    rng = np.random.default_rng(seed)
+    out = np.empty(paths)
+    for lo in range(0, paths, chunk):
+        m = min(chunk, paths - lo)
+        growth = np.ones((m, n))
+        for _ in range(horizon_days):
+            growth *= 1.0 + mu + rng.standard_normal((m, k)) @ factor_t
+        out[lo:lo + m] = (growth - 1.0) @ values
+    return out
+
+
+def portfolio_risk(prices: pd.DataFrame, values: Dict[str, float], total_value: Optional[float] = None,
+                   confidence: float = CONFIDENCE, horizon_days: int = 1, mc_paths: int = MC_PATHS,
+                   seed: Optional[int] = 7) -> Optional[RiskReport]:
+    """
+    Volatility, VaR and CVaR for dollar positions `values` (ticker -> $).
+
+    Tickers missing from `prices` (no history, cash) are carried at zero
+    risk and listed in report.missing. Returns None when no holding has
+    at least MIN_OBSERVATIONS daily returns.
+    """
+    total = float(total_value if total_value is not None else sum(values.values()))
+    tickers = [t for t in values if t in prices.columns and prices[t].notna().sum() > MIN_OBSERVATIONS]
+    missing = [t for t in values if t not in tickers]
+    if not tickers:
+        return None
+
+    p = prices[tickers].dropna().to_numpy(dtype=np.float64)
+    r = p[1:] / p[:-1] - 1.0
+    if len(r) < MIN_OBSERVATIONS:
+        return None
+    v = np.array([values[t] for t in tickers], dtype=np.float64)
+    mu = r.mean(axis=0)
+    cov = np.atleast_2d(np.cov(r, rowvar=False))
+
+    # dollar P&L moments for one day; weights are dollars, not fractions
+    mean_1d = float(v @ mu)
+    sd_1d = float(np.sqrt(max(v @ cov @ v, 0.0)))
+    h = max(int(horizon_days), 1)
+    report = RiskReport(
+        total_value=total,
+        covered_value=float(v.sum()),
+        vol_ann_pct=sd_1d / total * np.sqrt(TRADING_DAYS) * 100.0 if total else 0.0,
+        horizon_days=h,
+        confidence=confidence,
+        observations=len(r),
+        tickers=tickers,
+        missing=missing,
+    )
+
+    # historical: overlapping h-day windows of the actual price path
+    growth = p[h:] / p[:-h] - 1.0
+    if len(growth) >= MIN_OBSERVATIONS:
+        report.var["historical"], report.cvar["historical"] = _tail(growth @ v, confidence)
+
+    # parametric (normal): mean and volatility scaled to the horizon
+    z = NormalDist().inv_cdf(confidence)
+    mean_h, sd_h = mean_1d * h, sd_1d * np.sqrt(h)
+    report.var["parametric"] = float(z * sd_h - mean_h)
+    report.cvar["parametric"] = float(sd_h * NormalDist().pdf(z) / (1.0 - confidence) - mean_h)
+
+    if mc_paths:
+        pnl = monte_carlo_pnl(v, mu, cov, horizon_days=h, paths=mc_paths, seed=seed)
+        report.var["monte_carlo"], report.cvar["monte_carlo"] = _tail(pnl, confidence)
+    return report
@@ -1,16 +1,15 @@
 # src/rag/embeddings.py
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
 
-load_dotenv()
-
-EMBED_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+from src.utils.config import load_env
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
+    from openai import OpenAI
+
+    load_env()
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     resp = client.embeddings.create(
-        model=EMBED_MODEL,
+        model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
         input=texts
     )
     return [d.embedding for d in resp.data]
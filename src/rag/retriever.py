@@ -1,20 +1,27 @@
 # src/rag/retriever.py
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 import os
+import threading
 
-import numpy as np
-from dotenv import load_dotenv
-from openai import OpenAI
-
-from src.rag.faiss_store import load_index
 from src.rag.types import Chunk
+from src.utils.config import load_env
+
+# FAISS index + chunks, loaded once per index dir on first retrieval
+_INDEXES: Dict[str, Tuple[Any, List[Chunk]]] = {}
+_INDEX_LOCK = threading.Lock()
 
-load_dotenv()
 
-# Load FAISS index + chunks once
-_INDEX, _CHUNKS = load_index("data/index")
+def get_index(index_dir: str = "data/index") -> Tuple[Any, List[Chunk]]:
+    loaded = _INDEXES.get(index_dir)
+    if loaded is None:
+        with _INDEX_LOCK:
+            loaded = _INDEXES.get(index_dir)
+            if loaded is None:
+                from src.rag.faiss_store import load_index
+                loaded = _INDEXES[index_dir] = load_index(index_dir)
+    return loaded
 
 
 def _chunk_text(ch: Chunk) -> str:
@@ -33,10 +40,13 @@ class Retriever:
 
     def __init__(
         self,
-        index_dir: str = "data/index",  # kept for compatibility
+        index_dir: str = "data/index",
         model: str = "text-embedding-3-small",
         **kwargs,
     ):
+        from openai import OpenAI
+
+        load_env()
         self.index_dir = index_dir
         self.model = model
 
@@ -45,15 +55,21 @@ class Retriever:
             raise RuntimeError("OPENAI_API_KEY not set")
         self.client = OpenAI(api_key=api_key)
 
+        # explicit load (instead of at import) so a missing index fails here
+        get_index(index_dir)
+
     def retrieve(self, query: str, top_k: int = 3, **kwargs) -> List[Dict[str, Any]]:
+        import numpy as np
+
+        index, chunks = get_index(self.index_dir)
         emb = self.client.embeddings.create(model=self.model, input=[query]).data[0].embedding
         qvec = np.array([emb], dtype="float32")
 
-        D, I = _INDEX.search(qvec, top_k)
+        D, I = index.search(qvec, top_k)
 
         hits: List[Dict[str, Any]] = []
         for rank, idx in enumerate(I[0], start=1):
-            ch = _CHUNKS[int(idx)]
+            ch = chunks[int(idx)]
             hits.append(
                 {
                     "id": rank,
@@ -0,0 +1,6 @@
+# src/tests/conftest.py
+import sys
+from pathlib import Path
+
+# run from anywhere: `pytest src/tests` or `python -m pytest`
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
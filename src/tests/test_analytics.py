@@ -0,0 +1,109 @@
+# src/tests/test_analytics.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.market.analytics import (
+    STAT_COLUMNS, TRADING_DAYS, correlation, max_drawdown, moving_average, price_matrix, simple_returns, summarize,
+)
+
+DATES = pd.bdate_range("2024-01-01", periods=5)
+
+
+@pytest.fixture
+def prices():
+    # B moves half as much as A every day; C only starts trading on day 3
+    return pd.DataFrame({
+        "A": [100.0, 110.0, 88.0, 99.0, 121.0],
+        "B": [100.0, 105.0, 94.5, 100.40625, 111.5625],
+        "C": [np.nan, np.nan, 50.0, 40.0, 60.0],
+    }, index=DATES)
+
+
+def test_price_matrix_aligns_and_fills_gaps():
+    frames = {
+        "A": pd.DataFrame({"Date": DATES, "Close": [1.0, 2.0, 3.0, 4.0, 5.0]}),
+        # missing the middle bar and the first two
+        "B": pd.DataFrame({"Date": DATES[[2, 4]], "Close": [30.0, 50.0]}),
+        "NONE": None,
+        "EMPTY": pd.DataFrame({"Date": [], "Close": []}),
+        "NOCLOSE": pd.DataFrame({"Date": DATES, "Open": 1.0}),
+    }
+    m = price_matrix(frames)
+    assert list(m.columns) == ["A", "B"]
+    assert list(m.index) == list(DATES)
+    assert m["B"].iloc[:2].isna().all()
+    assert m["B"].tolist()[2:] == [30.0, 30.0, 50.0]
+    assert price_matrix({"X": None}).empty
+
+
+def test_returns_and_drawdown_by_hand(prices):
+    r = simple_returns(prices[["A"]].to_numpy())[:, 0]
+    assert r == pytest.approx([0.10, -0.20, 0.125, 2.0 / 9.0])
+    # peak 110 -> trough 88
+    assert max_drawdown(prices.to_numpy()) == pytest.approx([-0.20, -0.10, -0.20])
+
+
+def test_moving_average_needs_a_full_window():
+    ma = moving_average(np.array([[1.0], [2.0], [3.0], [np.nan], [5.0]]), 2)[:, 0]
+    assert ma[1:3] == pytest.approx([1.5, 2.5])
+    assert np.isnan(ma[[0, 3, 4]]).all()
+
+
+def test_summarize_known_answers(prices):
+    stats, corr = summarize(prices, benchmark="B")
+    a, b, c = stats.loc["A"], stats.loc["B"], stats.loc["C"]
+
+    assert list(stats.columns) == STAT_COLUMNS
+    assert a["last"] == 121.0
+    assert a["change_pct"] == pytest.approx((121.0 / 99.0 - 1.0) * 100.0)
+    assert a["period_pct"] == pytest.approx(21.0)
+    # C's period starts at its first bar, not at the matrix start
+    assert c["period_pct"] == pytest.approx(20.0)
+
+    r_a = np.array([0.10, -0.20, 0.125, 2.0 / 9.0])
+    vol_a = np.sqrt(((r_a - r_a.mean()) ** 2).sum() / 3) * np.sqrt(TRADING_DAYS) * 100.0
+    assert a["vol_ann_pct"] == pytest.approx(vol_a)
+    assert b["vol_ann_pct"] == pytest.approx(vol_a / 2.0)
+    # two returns do not fill the volatility window
+    assert np.isnan(c["vol_ann_pct"])
+
+    assert a["max_drawdown_pct"] == pytest.approx(-20.0)
+    assert c["max_drawdown_pct"] == pytest.approx(-20.0)
+    assert a["beta"] == pytest.approx(2.0)
+    assert b["beta"] == pytest.approx(1.0)
+    assert corr.loc["A", "B"] == pytest.approx(1.0)
+    # pairwise-complete: C is compared on the two days it traded
+    assert corr.loc["A", "C"] == pytest.approx(1.0)
+    assert np.isnan(stats["ma20"]).all()
+
+
+def test_summarize_period_window(prices):
+    stats, _ = summarize(prices, benchmark=None, period_points=3)
+    assert stats.loc["A", "period_pct"] == pytest.approx((121.0 / 88.0 - 1.0) * 100.0)
+    assert stats.loc["A", "max_drawdown_pct"] == pytest.approx(0.0)
+    assert np.isnan(stats["beta"]).all()
+
+
+def test_summarize_short_and_empty_series():
+    one = pd.DataFrame({"A": [10.0]}, index=DATES[:1])
+    stats, corr = summarize(one)
+    assert stats.loc["A", "last"] == 10.0
+    assert stats.loc["A", "max_drawdown_pct"] == 0.0
+    for col in ("change_pct", "vol_ann_pct", "ma20", "beta"):
+        assert np.isnan(stats.loc["A", col])
+    assert np.isnan(corr.loc["A", "A"])
+
+    stats, corr = summarize(pd.DataFrame())
+    assert stats.empty and list(stats.columns) == STAT_COLUMNS
+    assert corr.empty
+
+
+def test_correlation_matches_corrcoef_and_skips_nans():
+    rng = np.random.default_rng(4)
+    r = rng.normal(0.0, 0.01, (60, 3))
+    assert correlation(r) == pytest.approx(np.corrcoef(r, rowvar=False))
+
+    r[:10, 2] = np.nan
+    expect = np.corrcoef(r[10:, 0], r[10:, 2])[0, 1]
+    assert correlation(r)[0, 2] == pytest.approx(expect)
@@ -0,0 +1,49 @@
+# src/tests/test_downsample.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.market.downsample import downsample_frame, lttb_indices
+
+
+def _series(n, seed=4):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=n, freq="min"),
+                         "Close": 100.0 * np.cumprod(1.0 + rng.normal(0, 0.001, n))})
+
+
+@pytest.mark.parametrize("n,threshold", [(1_000, 50), (10_000, 500), (5_003, 7)])
+def test_lttb_keeps_endpoints_and_count(n, threshold):
+    df = _series(n)
+    idx = lttb_indices(df["Date"], df["Close"], threshold)
+    assert len(idx) == threshold
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_known_answer():
+    # a single spike in each bucket is the point with the largest triangle
+    y = np.zeros(11)
+    y[[3, 7]] = [5.0, -4.0]
+    assert lttb_indices(np.arange(11), y, 4).tolist() == [0, 3, 7, 10]
+
+
+def test_lttb_returns_everything_below_threshold():
+    assert lttb_indices(np.arange(5), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_frames_below_min_points_are_untouched():
+    df = _series(5_000)
+    assert downsample_frame(df, max_points=500) is df
+    assert downsample_frame(df, max_points=500, min_points=10_000) is df
+
+
+def test_downsampled_frame_keeps_extremes_and_nan_columns():
+    df = _series(20_000)
+    df["Other"] = np.nan
+    df.loc[10_000:, "Other"] = np.linspace(1.0, 2.0, 10_000)
+    small = downsample_frame(df, max_points=400, columns=["Close", "Other"], min_points=0)
+
+    assert len(small) <= 400 + 6
+    assert small["Close"].max() == df["Close"].max() and small["Close"].min() == df["Close"].min()
+    assert small["Other"].dropna().iloc[-1] == 2.0
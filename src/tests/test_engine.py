@@ -0,0 +1,83 @@
+# src/tests/test_engine.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.engine import PortfolioEngine
+
+
+@pytest.fixture
+def holdings():
+    return pd.DataFrame({
+        "Ticker": ["aaa", "BBB", "CCC", "DDD", "EEE", "FFF", "GGG"],
+        "Shares": [10.0, 5.0, 0.0, 2.0, 4.0, 1.0, 3.0],
+        "Price": [50.0, 20.0, 99.0, 125.0, 10.0, 0.0, 30.0],
+        # CCC / FFF are worth nothing; EEE / GGG have no class
+        "Class": ["Equity", "Bond", "Crypto", "Equity", None, "Cash", np.nan],
+        "Type": ["stock", "etf", "crypto", "stock", "etf", "cash", "stock"],
+    })
+
+
+def _groupby(df, col):
+    d = df.assign(Value=df["Shares"] * df["Price"], Key=df[col].fillna("Unclassified"))
+    g = d.groupby("Key")["Value"].sum()
+    return g[g != 0].sort_values(ascending=False)
+
+
+@pytest.mark.parametrize("by, col", [("class", "Class"), ("type", "Type")])
+def test_breakdown_matches_groupby(holdings, by, col):
+    engine = PortfolioEngine.from_frame(holdings, class_col="Class", type_col="Type")
+    out = engine.breakdown(by)
+    expect = _groupby(holdings, col)
+    total = (holdings["Shares"] * holdings["Price"]).sum()
+
+    assert out[by.title()].tolist() == expect.index.tolist()
+    assert out["Value"].to_numpy() == pytest.approx(expect.to_numpy())
+    assert out["AllocationPct"].to_numpy() == pytest.approx((expect / total * 100.0).round(2).to_numpy())
+
+
+def test_unknown_classes_share_one_group(holdings):
+    out = PortfolioEngine.from_frame(holdings, class_col="Class").breakdown("class")
+    assert out.set_index("Class").loc["Unclassified", "Value"] == pytest.approx(40.0 + 90.0)
+    # zero-value classes are dropped, not listed at 0%
+    assert not {"Crypto", "Cash", "None", "nan"} & set(out["Class"])
+
+
+def test_totals_weights_and_hhi_match_pandas(holdings):
+    engine = PortfolioEngine.from_frame(holdings, class_col="Class")
+    values = holdings["Shares"] * holdings["Price"]
+    w = values / values.sum()
+
+    assert engine.total == pytest.approx(values.sum())
+    assert engine.weights() == pytest.approx(w.to_numpy())
+    assert engine.hhi() == pytest.approx(float((w ** 2).sum()))
+    assert engine.summary()["top_asset"] == "AAA"
+    assert engine.summary()["unique_assets"] == 7
+
+
+def test_incremental_edits_match_rebuild(holdings):
+    engine = PortfolioEngine.from_frame(holdings, class_col="Class")
+    engine.update_rows([1, 2], shares=[0.0, 3.0])
+    engine.update_row(4, price=0.0)
+
+    edited = holdings.copy()
+    edited.loc[[1, 2], "Shares"] = [0.0, 3.0]
+    edited.loc[4, "Price"] = 0.0
+    fresh = PortfolioEngine.from_frame(edited, class_col="Class")
+
+    assert engine.total == pytest.approx(fresh.total)
+    assert engine.hhi() == pytest.approx(fresh.hhi())
+    pd.testing.assert_frame_equal(engine.breakdown("class"), fresh.breakdown("class"))
+    expect = _groupby(edited, "Class")
+    assert engine.breakdown("class")["Class"].tolist() == expect.index.tolist()
+    assert engine.breakdown("class")["Value"].to_numpy() == pytest.approx(expect.to_numpy())
+
+
+def test_empty_and_all_zero_portfolio():
+    empty = PortfolioEngine.from_frame(pd.DataFrame())
+    assert empty.total == 0.0 and empty.hhi() == 0.0 and empty.breakdown("type").empty
+
+    zero = PortfolioEngine(["A", "B"], [0.0, 1.0], [10.0, 0.0], classes=["X", "Y"])
+    assert zero.hhi() == 0.0
+    assert zero.weights().tolist() == [0.0, 0.0]
+    assert zero.breakdown("class").empty
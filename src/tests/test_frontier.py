@@ -0,0 +1,57 @@
+# src/tests/test_frontier.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.bench_frontier import loop_frontier
+from src.portfolio import frontier as fr
+from src.portfolio.frontier import efficient_frontier, moments
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(3)
+    cov = np.array([[4e-4, 1e-4, 5e-5], [1e-4, 2e-4, 2e-5], [5e-5, 2e-5, 1e-4]])
+    r = rng.multivariate_normal([8e-4, 5e-4, 2e-4], cov, size=500)
+    return pd.DataFrame(100.0 * np.cumprod(1.0 + r, axis=0), columns=["AAA", "BBB", "CCC"],
+                        index=pd.bdate_range("2023-01-02", periods=500))
+
+
+def test_weights_are_fully_invested_and_hit_target_returns(prices):
+    front = efficient_frontier(prices, points=25)
+    m = moments(prices)
+
+    assert front.weights.sum(axis=1) == pytest.approx(np.ones(25))
+    assert front.weights @ m.mu == pytest.approx(front.returns)
+    vols = np.sqrt(np.einsum("ki,ij,kj->k", front.weights, m.cov, front.weights))
+    assert vols == pytest.approx(front.vols)
+
+
+def test_matches_per_target_kkt_solve(prices):
+    front = efficient_frontier(prices, points=25)
+    assert front.weights == pytest.approx(loop_frontier(prices, front.returns), abs=1e-8)
+
+
+def test_min_variance_point(prices):
+    front = efficient_frontier(prices)
+    cov = moments(prices).cov
+    w = np.linalg.solve(cov, np.ones(3))
+    w /= w.sum()
+    assert front.min_var_vol == pytest.approx(np.sqrt(w @ cov @ w))
+    assert front.vols.min() >= front.min_var_vol - 1e-12
+    assert front.efficient_vol(front.min_var_return) == pytest.approx(front.min_var_vol, rel=1e-3)
+
+
+def test_current_allocation_is_on_or_inside_the_frontier(prices):
+    values = {"AAA": 5_000.0, "BBB": 3_000.0, "CCC": 2_000.0, "CASH": 1_000.0}
+    front = efficient_frontier(prices, values)
+
+    assert front.missing == ["CASH"]
+    assert front.current_vol >= front.efficient_vol(front.current_return) - 1e-9
+
+
+def test_moments_are_cached_per_history(prices):
+    fr._MOMENTS.clear()
+    assert moments(prices) is moments(prices)
+    assert moments(prices.iloc[:-1]) is not moments(prices)
+    assert efficient_frontier(prices[["AAA"]]) is None
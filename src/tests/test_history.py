@@ -0,0 +1,72 @@
+# src/tests/test_history.py
+from src.workflow.history import compact_history, estimate_tokens, roll_summary, window_start
+
+
+def _chat(n, size=20):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i:03d} " + "x" * size}
+            for i in range(n)]
+
+
+def test_window_start_caps_messages():
+    history = _chat(30)
+    assert window_start(history, max_messages=12, max_tokens=10_000) == 18
+    assert window_start(history[:5], max_messages=12, max_tokens=10_000) == 0
+    assert window_start([], max_messages=12, max_tokens=10_000) == 0
+
+
+def test_window_start_caps_tokens_but_keeps_newest():
+    history = _chat(10, size=36)
+    per = estimate_tokens(history[0]["content"])
+    assert window_start(history, max_messages=12, max_tokens=3 * per) == 7
+    # one message over budget on its own is still kept
+    assert window_start(history, max_messages=12, max_tokens=1) == 9
+
+
+def test_roll_summary_appends_and_trims_whole_lines():
+    text = roll_summary("", [{"role": "user", "content": "what is an ETF?"},
+                             {"role": "assistant", "content": "A fund that trades. It holds many assets."}])
+    assert text == "User: what is an ETF?\nFinnie: A fund that trades"
+
+    long = roll_summary(text, _chat(20), max_chars=120)
+    assert long.startswith("…\n")
+    assert len(long) <= 122
+    assert long.endswith(roll_summary("", _chat(20)[-1:]))
+    assert all(line.startswith(("User:", "Finnie:")) for line in long.split("\n")[1:])
+
+
+def test_compact_history_window_only():
+    history = _chat(30)
+    out = compact_history(history, max_messages=12, max_tokens=10_000)
+    assert out == [{"role": m["role"], "content": m["content"]} for m in history[18:]]
+
+
+def test_compact_history_rolls_summary_once_per_message():
+    state = {"upto": 0, "text": ""}
+    history = _chat(14)
+    out = compact_history(history, max_messages=12, max_tokens=10_000, summary_state=state)
+    assert state["upto"] == 2
+    assert out[0]["role"] == "system" and "m000" in out[0]["content"] and "m001" in out[0]["content"]
+    assert len(out) == 13
+
+    history += _chat(16)[14:]
+    out = compact_history(history, max_messages=12, max_tokens=10_000, summary_state=state)
+    assert state["upto"] == 4
+    assert state["text"].count("m000") == 1
+    assert "m003" in out[0]["content"] and "m004" not in out[0]["content"]
+
+
+def test_compact_history_resets_summary_when_history_shrinks():
+    state = {"upto": 0, "text": ""}
+    compact_history(_chat(30), max_messages=12, max_tokens=10_000, summary_state=state)
+    assert state["upto"] == 18
+
+    # chat cleared and restarted: the old summary must not leak in
+    fresh = [{"role": "user", "content": "new topic"}]
+    out = compact_history(fresh, max_messages=12, max_tokens=10_000, summary_state=state)
+    assert out == [{"role": "user", "content": "new topic"}]
+    assert state == {"upto": 0, "text": ""}
+
+    history = _chat(14)
+    out = compact_history(history, max_messages=12, max_tokens=10_000, summary_state=state)
+    assert state["upto"] == 2
+    assert "m000" in out[0]["content"] and "m017" not in out[0]["content"]
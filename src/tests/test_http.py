@@ -0,0 +1,73 @@
+# src/tests/test_http.py
+import pytest
+import requests
+
+from src.market import http
+from src.market.http import MAX_ATTEMPTS, TokenBucket, limited_get
+
+
+class _Response:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+class _Session:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        out = self.outcomes.pop(0)
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+
+class _CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(rate_per_min=6000)
+        self.acquired = 0
+
+    def acquire(self, priority=0, timeout=None):
+        self.acquired += 1
+        return super().acquire(priority, timeout)
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(http.time, "sleep", slept.append)
+    return slept
+
+
+def test_every_retry_takes_a_token(_no_sleep):
+    bucket = _CountingBucket()
+    session = _Session(_Response(429, {"Retry-After": "2"}), _Response(503), _Response(200))
+
+    r = limited_get("u", {}, limiter=bucket, session=session)
+    assert r.status_code == 200
+    assert session.calls == bucket.acquired == 3
+    assert _no_sleep == [2.0, 1.0]
+
+
+def test_gives_up_after_max_attempts():
+    bucket = _CountingBucket()
+    session = _Session(*[_Response(500)] * MAX_ATTEMPTS)
+    assert limited_get("u", {}, limiter=bucket, session=session).status_code == 500
+    assert bucket.acquired == MAX_ATTEMPTS
+
+    session = _Session(*[requests.ConnectionError()] * MAX_ATTEMPTS)
+    with pytest.raises(requests.ConnectionError):
+        limited_get("u", {}, limiter=bucket, session=session)
+    assert session.calls == MAX_ATTEMPTS
+
+
+def test_no_request_without_a_token(monkeypatch):
+    monkeypatch.setitem(http.MAX_WAIT_S, http.INTERACTIVE, 0.01)
+    bucket = TokenBucket(rate_per_min=1, capacity=1)
+    bucket.drain()
+    session = _Session(_Response(200))
+    assert limited_get("u", {}, limiter=bucket, session=session) is None
+    assert session.calls == 0
@@ -0,0 +1,125 @@
+# src/tests/test_ledger.py
+import io
+
+import pytest
+
+from src.portfolio.ledger import PositionStore, build_positions, import_transactions, read_transactions
+
+HEADER = "Date,Account,Action,Symbol,Quantity,Price,Fees,Amount,Split Ratio"
+# average cost by hand:
+#   buy 10 @ 100, buy 10 @ 150        -> 20 sh, cost 2500
+#   sell 15 @ 200 (avg 125)            -> realized 3000 - 1875 = 1125; 5 sh, cost 625
+#   2:1 split                          -> 10 sh, cost 625
+#   buy 10 @ 50 (+1 fee)               -> 20 sh, cost 1126
+#   sell 5 @ 100 (-1 fee, avg 56.30)   -> realized 499 - 281.5 = 217.5; 15 sh, cost 844.5
+#   dividend 30
+ROWS = [
+    "2024-01-02,ACC1,Buy,AAA,10,100,0,,",
+    "2024-01-03,ACC1,Buy,AAA,10,150,0,,",
+    "2024-01-04,ACC1,Sell,AAA,15,200,0,,",
+    "2024-01-05,ACC1,Stock Split,AAA,0,,0,,2",
+    "2024-01-08,ACC1,Buy,AAA,10,50,1,,",
+    "2024-01-09,ACC1,Sell,AAA,5,100,1,,",
+    "2024-01-10,ACC1,Dividend,AAA,,,0,30,",
+    "2024-01-10,ACC2,Buy,BBB,4,25,0,,",
+]
+EXPECTED = {"shares": 15.0, "cost_basis": 844.5, "realized_gain": 1342.5, "dividends": 30.0}
+
+
+def _csv(rows):
+    return io.StringIO("\n".join([HEADER] + rows) + "\n")
+
+
+def _aaa(positions):
+    return positions.set_index(["account", "ticker"]).loc[("ACC1", "AAA")]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 100])
+@pytest.mark.parametrize("arrange", [
+    lambda r: r,                  # oldest first
+    lambda r: r[::-1],            # newest first, as many brokers export
+    lambda r: r[4:] + r[:4],      # no order at all
+], ids=["oldest_first", "newest_first", "unordered"])
+def test_replay_any_file_order(arrange, chunk_rows):
+    positions, rows = build_positions(read_transactions(_csv(arrange(ROWS)), chunk_rows=chunk_rows))
+    assert rows == len(ROWS)
+    aaa = _aaa(positions)
+    for col, want in EXPECTED.items():
+        assert aaa[col] == pytest.approx(want)
+    assert aaa["avg_cost"] == pytest.approx(844.5 / 15)
+
+
+def test_newest_first_same_day_keeps_chronology():
+    rows = ["2024-02-01,ACC1,Sell,AAA,10,120,0,,", "2024-02-01,ACC1,Buy,AAA,10,100,0,,"]
+    positions, _ = build_positions(read_transactions(_csv(rows + ["2024-01-31,ACC1,Buy,AAA,1,90,0,,"]),
+                                                     chunk_rows=1))
+    aaa = _aaa(positions)
+    assert aaa["shares"] == pytest.approx(1.0)
+    assert aaa["realized_gain"] == pytest.approx(10 * 120 - 10 * (1090 / 11))
+
+
+def test_full_sell_closes_position():
+    rows = ["2024-01-02,ACC1,Buy,AAA,10,100,0,,", "2024-01-03,ACC1,Sell,AAA,10,90,0,,",
+            "2024-01-04,ACC1,Buy,AAA,2,50,0,,"]
+    aaa = _aaa(build_positions(read_transactions(_csv(rows)))[0])
+    # the second lot starts from a clean cost basis
+    assert (aaa["shares"], aaa["cost_basis"], aaa["realized_gain"]) == pytest.approx((2.0, 100.0, -100.0))
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 100])
+def test_oversell_is_clamped_and_flagged(chunk_rows):
+    rows = ["2024-01-02,ACC1,Buy,AAA,10,100,0,,",
+            "2024-01-03,ACC1,Sell,AAA,15,120,0,,",  # 5 more than held
+            "2024-01-04,ACC1,Buy,AAA,4,50,0,,",
+            "2024-01-05,ACC1,Sell,AAA,1,60,0,,"]
+    positions, _ = build_positions(read_transactions(_csv(rows), chunk_rows=chunk_rows))
+    aaa = _aaa(positions)
+    # the later buy starts from zero shares, not -5; only the 10 held shares are realized
+    assert aaa["shares"] == pytest.approx(3.0)
+    assert aaa["cost_basis"] == pytest.approx(150.0)
+    assert aaa["realized_gain"] == pytest.approx(10 * (120 - 100) + (60 - 50))
+    assert aaa["oversold"] == 1
+    assert aaa["skipped"] == 0
+
+
+def test_exact_close_is_not_an_oversell():
+    rows = ["2024-01-02,ACC1,Buy,AAA,0.1,100,0,,", "2024-01-03,ACC1,Buy,AAA,0.2,100,0,,",
+            "2024-01-04,ACC1,Sell,AAA,0.3,100,0,,"]
+    aaa = _aaa(build_positions(read_transactions(_csv(rows)))[0])
+    assert (aaa["shares"], aaa["oversold"]) == (0.0, 0)
+
+
+def test_rows_without_price_or_amount_are_skipped():
+    rows = ["2024-01-02,ACC1,Buy,AAA,10,100,0,,",
+            "2024-01-03,ACC1,Buy,AAA,5,,0,,",       # no price, no amount
+            "2024-01-04,ACC1,Buy,AAA,5,,0,400,",    # amount only: still priced
+            "2024-01-05,ACC1,Sell,AAA,3,,0,,"]
+    aaa = _aaa(build_positions(read_transactions(_csv(rows)))[0])
+    assert aaa["shares"] == pytest.approx(15.0)
+    assert aaa["cost_basis"] == pytest.approx(1400.0)
+    assert aaa["avg_cost"] == pytest.approx(1400.0 / 15)
+    assert aaa["realized_gain"] == 0.0
+    assert (aaa["trades"], aaa["skipped"]) == (2, 2)
+
+
+def test_import_reports_flagged_positions(tmp_path):
+    store = PositionStore(str(tmp_path / "positions.sqlite"))
+    result = import_transactions(_csv(ROWS + ["2024-01-11,ACC2,Sell,BBB,9,30,0,,"]), store=store)
+    assert result.flagged()[["account", "ticker"]].values.tolist() == [["ACC2", "BBB"]]
+    assert store.positions(account="ACC2").empty
+
+
+def test_out_of_order_chunks_raise():
+    chunks = read_transactions(_csv(ROWS[::-1]), chunk_rows=2, order="oldest_first")
+    with pytest.raises(ValueError, match="back in time"):
+        build_positions(chunks)
+
+
+def test_import_round_trip(tmp_path):
+    store = PositionStore(str(tmp_path / "positions.sqlite"))
+    result = import_transactions(_csv(ROWS[::-1]), store=store, chunk_rows=3)
+    assert result.transactions == len(ROWS)
+    assert store.accounts() == ["ACC1", "ACC2"]
+    stored = store.positions(account="ACC1").iloc[0]
+    assert stored["shares"] == pytest.approx(EXPECTED["shares"])
+    assert stored["cost_basis"] == pytest.approx(EXPECTED["cost_basis"])
@@ -0,0 +1,48 @@
+# src/tests/test_market_agent.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.agents.market import MarketAgent
+
+
+class _Data:
+    def __init__(self, frames):
+        self.frames = frames
+        self.cache = type("Cache", (), {"is_stale": staticmethod(lambda fetched: False)})()
+
+    def load_daily_many(self, tickers, min_points=0, force_refresh=False, priority=0):
+        return {t: (self.frames.get(t), datetime.now() if t in self.frames else None) for t in tickers}
+
+
+def _agent(frames):
+    agent = MarketAgent.__new__(MarketAgent)
+    agent.data = _Data(frames)
+    return agent
+
+
+def _frame(dates, close):
+    return pd.DataFrame({"Date": dates, "Close": close})
+
+
+def test_compare_reports_tickers_without_prices_in_the_period():
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=60)
+    frames = {
+        "AAA": _frame(dates, np.linspace(10.0, 12.0, 60)),
+        "BBB": _frame(dates, np.linspace(20.0, 19.0, 60)),
+        "NANS": _frame(dates, np.full(60, np.nan)),
+    }
+    result = _agent(frames).compare(["AAA", "BBB", "NANS", "GONE"], period="1mo")
+
+    assert result.market_tickers == ["AAA", "BBB"]
+    assert "No data available for: NANS, GONE" in result.answer
+    assert "→ 12.00" in result.answer
+    assert not result.market_is_mock
+
+
+def test_compare_falls_back_to_mock_when_nothing_has_prices():
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=10)
+    result = _agent({"NANS": _frame(dates, np.full(10, np.nan))}).compare(["NANS", "GONE"])
+    assert result.market_is_mock
+    assert result.market_tickers == ["NANS", "GONE"]
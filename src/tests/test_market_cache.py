@@ -0,0 +1,152 @@
+# src/tests/test_market_cache.py
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import src.market.cache
+import src.market.data
+import src.utils.cache
+from src.market.cache import LOCK_STRIPES, MarketCache
+from src.market.data import MarketData
+from src.market.http import BACKGROUND, INTERACTIVE
+from src.market.providers import MarketDataProvider
+from src.market.store import PriceStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Injected wall clock for every freshness check: advance(minutes) moves
+    "now" forward without sleeping.
+    """
+    class Clock(datetime):
+        offset = timedelta()
+
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + cls.offset
+
+        @classmethod
+        def advance(cls, minutes):
+            cls.offset += timedelta(minutes=minutes)
+
+    for module in (src.utils.cache, src.market.cache, src.market.data):
+        monkeypatch.setattr(module, "datetime", Clock)
+    return Clock
+
+
+class _FakeProvider(MarketDataProvider):
+    """
+    Closes equal to the download number, so a refresh is visible in the data.
+    """
+    def __init__(self):
+        self.calls = []
+
+    def fetch_daily(self, ticker, outputsize="compact", priority=INTERACTIVE):
+        self.calls.append((ticker, priority))
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30)
+        return pd.DataFrame({"Date": dates, "Close": float(len(self.calls))})
+
+
+def _drain(data):
+    # wait for queued background refreshes
+    if data._refresh_pool is not None:
+        data._refresh_pool.shutdown(wait=True)
+        data._refresh_pool = None
+
+
+def test_stale_entries_are_served_only_when_allowed():
+    cache = MarketCache(ttl_minutes=15, hard_ttl_minutes=60)
+    cache.set("aapl", "daily", "v", fetched_at=datetime.now() - timedelta(minutes=20))
+
+    assert cache.get("AAPL") is None
+    assert cache.get("AAPL", allow_stale=True)["value"] == "v"
+
+
+def test_disk_rows_past_the_hard_ttl_are_swept(tmp_path):
+    cache = MarketCache(ttl_minutes=15, hard_ttl_minutes=60, db_path=str(tmp_path / "c.sqlite"))
+    old = datetime.now() - timedelta(hours=2)
+    for t in ("OLD1", "OLD2"):
+        cache._disk.set(cache.key(t), "v", old)
+    cache.set("NEW", "daily", "v")
+
+    assert cache._disk.count() == 1
+    assert cache._disk.get(cache.key("OLD1")) is None
+    assert cache.get("NEW") is not None
+
+
+def test_disk_rows_are_capped(tmp_path):
+    cache = MarketCache(db_path=str(tmp_path / "c.sqlite"), max_disk_rows=3)
+    now = datetime.now()
+    for i in range(6):
+        cache.set(f"T{i}", "daily", i, fetched_at=now - timedelta(seconds=10 - i))
+    assert cache.sweep() == 3
+    assert cache._disk.get(cache.key("T5"))["value"] == 5
+    assert cache._disk.get(cache.key("T0")) is None
+
+
+def test_lock_map_does_not_grow():
+    cache = MarketCache()
+    locks = {id(cache.lock_for(f"T{i}")) for i in range(5_000)}
+    assert len(locks) <= LOCK_STRIPES
+    assert cache.lock_for("aapl") is cache.lock_for("AAPL")
+
+
+def test_hard_ttl_evicts_even_stale_reads(clock, tmp_path):
+    cache = MarketCache(ttl_minutes=15, hard_ttl_minutes=60, db_path=str(tmp_path / "c.sqlite"))
+    cache.set("AAPL", "daily", "v")
+
+    clock.advance(30)
+    assert cache.get("AAPL") is None
+    assert cache.get("AAPL", allow_stale=True)["value"] == "v"
+
+    clock.advance(31)
+    assert cache.get("AAPL", allow_stale=True) is None
+    assert len(cache._mem) == 0
+    # the disk copy is past the hard TTL too: not promoted back to memory
+    assert cache._disk.get(cache.key("AAPL")) is not None
+    assert cache.get("AAPL", allow_stale=True) is None
+    assert cache.sweep() == 1
+
+
+def test_stale_history_is_served_while_refreshing(clock, tmp_path):
+    provider = _FakeProvider()
+    data = MarketData(provider=provider, cache=MarketCache(ttl_minutes=15, hard_ttl_minutes=60),
+                      store=PriceStore(str(tmp_path / "store")))
+
+    df, fetched_at = data.load_daily_many(["AAA"], priority=INTERACTIVE)["AAA"]
+    assert provider.calls == [("AAA", INTERACTIVE)]
+    assert df["Close"].iloc[-1] == 1.0
+
+    # fresh: served from memory, nothing queued
+    clock.advance(10)
+    assert data.load_daily_many(["AAA"])["AAA"][1] == fetched_at
+    _drain(data)
+    assert len(provider.calls) == 1
+
+    # stale: the old series comes back at once, a background refresh replaces it
+    clock.advance(10)
+    df, served_at = data.load_daily_many(["AAA"], priority=INTERACTIVE)["AAA"]
+    assert served_at == fetched_at and df["Close"].iloc[-1] == 1.0
+    _drain(data)
+    assert provider.calls == [("AAA", INTERACTIVE), ("AAA", BACKGROUND)]
+
+    df, refreshed_at = data.load_daily_many(["AAA"])["AAA"]
+    assert df["Close"].iloc[-1] == 2.0
+    assert refreshed_at > fetched_at
+    assert not data.cache.is_stale(refreshed_at)
+
+
+def test_expired_history_is_refetched_in_the_foreground(clock, tmp_path):
+    provider = _FakeProvider()
+    data = MarketData(provider=provider, cache=MarketCache(ttl_minutes=15, hard_ttl_minutes=60),
+                      store=PriceStore(str(tmp_path / "store")))
+    data.load_daily_many(["AAA"], priority=INTERACTIVE)
+
+    # past the hard TTL neither the cache entry nor the stored file is served
+    clock.advance(61)
+    assert data.read_local("AAA") is None
+    df, _ = data.load_daily_many(["AAA"], priority=INTERACTIVE)["AAA"]
+    assert df["Close"].iloc[-1] == 2.0
+    assert provider.calls == [("AAA", INTERACTIVE), ("AAA", INTERACTIVE)]
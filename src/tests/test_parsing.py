@@ -0,0 +1,56 @@
+# src/tests/test_parsing.py
+import pandas as pd
+import pytest
+
+from scripts.bench_av_parse import legacy_parse, synthetic_payload
+from src.market.parsing import parse_alpha_vantage_daily
+
+OHLCV = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+def test_matches_row_by_row_reference():
+    payload = synthetic_payload(years=2, seed=3)
+    fast = parse_alpha_vantage_daily(payload)
+    ref = legacy_parse(payload).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(fast[OHLCV], ref[OHLCV], check_dtype=False)
+    assert fast["Date"].is_monotonic_increasing
+    assert set(fast.columns) == set(OHLCV) | {"RawClose", "Dividend", "SplitCoef"}
+    assert fast["Close"].iloc[-1] == pytest.approx(fast["RawClose"].iloc[-1] * 0.97, abs=1e-3)
+
+
+def test_unadjusted_series_uses_raw_close():
+    payload = {"Time Series (Daily)": {
+        "2024-01-03": {"1. open": "11", "2. high": "12", "3. low": "10", "4. close": "11.5", "5. volume": "300"},
+        "2024-01-02": {"1. open": "10", "2. high": "11", "3. low": "9", "4. close": "10.5", "5. volume": "200"},
+    }}
+    df = parse_alpha_vantage_daily(payload)
+    pd.testing.assert_frame_equal(df, legacy_parse(payload).reset_index(drop=True), check_dtype=False)
+    assert df["Close"].tolist() == [10.5, 11.5]
+    assert df["Volume"].tolist() == [200.0, 300.0]
+
+
+def test_irregular_rows_fall_back_per_field():
+    payload = {"Time Series (Daily)": {
+        "2024-01-04": {"1. open": "12", "4. close": "12.5", "5. adjusted close": "12.0", "6. volume": "1"},
+        "2024-01-03": {"1. open": "11", "4. close": "11.5", "5. adjusted close": "None", "6. volume": "1"},
+        "2024-01-02": {"1. open": "10", "4. close": "None", "5. adjusted close": "None", "6. volume": "1"},
+    }}
+    df = parse_alpha_vantage_daily(payload)
+    # missing fields are NaN, adjusted close falls back to raw, no close at all drops the bar
+    assert df["Date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-03", "2024-01-04"]
+    assert df["Close"].tolist() == [11.5, 12.0]
+    assert df["High"].isna().all()
+
+
+@pytest.mark.parametrize("payload", [
+    None,
+    {},
+    {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."},
+    {"Information": "The **demo** API key is for demo purposes only."},
+    {"Error Message": "Invalid API call."},
+    {"Meta Data": {}, "Time Series (Daily)": {}},
+    {"Time Series (Daily)": {"2024-01-02": {"4. close": "None", "5. adjusted close": "None"}}},
+])
+def test_error_and_empty_payloads_give_none(payload):
+    assert parse_alpha_vantage_daily(payload) is None
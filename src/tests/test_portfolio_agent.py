@@ -0,0 +1,143 @@
+# src/tests/test_portfolio_agent.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.portfolio import PortfolioAgent
+from src.market.cache import MarketCache
+from src.market.data import MarketData
+from src.market.http import BACKGROUND, INTERACTIVE
+from src.market.providers import LocalDirectoryProvider
+from src.market.store import PriceStore
+from src.portfolio.ledger import PositionStore
+from src.portfolio.risk import RISK_LOOKBACK
+
+
+@pytest.fixture
+def agent(tmp_path):
+    return PortfolioAgent(positions=PositionStore(str(tmp_path / "positions.sqlite")))
+
+
+@pytest.fixture
+def holdings():
+    df = pd.DataFrame({
+        "Asset": ["MSFT", "AAPL", "SPY", "BND"],
+        "Shares": [5.0, 8.0, 3.75, 12.5],
+        "Price": [400.0, 187.5, 480.0, 80.0],
+        "Class": ["Equity", "Equity", "ETF", "Bond ETF"],
+    })
+    df["Value"] = df["Shares"] * df["Price"]
+    return df
+
+
+def test_demo_portfolio_keeps_its_values(agent):
+    demo = agent._load_demo_portfolio()
+    values = dict(zip(demo["Asset"], demo["Shares"] * demo["Price"]))
+    assert values == {"MSFT": 2000.0, "AAPL": 1500.0, "SPY": 1800.0, "BND": 1000.0}
+
+
+def test_class_synonyms_match_whole_classes(agent, holdings):
+    targets, by, problems = agent._rebalance_targets("rebalance to 50% stocks and 50% bonds", holdings)
+    assert problems == []
+    assert by == "class"
+    assert targets == pytest.approx({"Equity": 0.5, "Bond ETF": 0.5})
+
+
+def test_fixed_income_and_cash(agent, holdings):
+    targets, by, problems = agent._rebalance_targets("60% equities, 30% fixed income, 10% cash", holdings)
+    assert problems == []
+    # cash is left uninvested, not spread over the classes
+    assert targets == pytest.approx({"Equity": 0.6, "Bond ETF": 0.3})
+
+
+def test_ticker_is_percent(agent, holdings):
+    targets, by, problems = agent._rebalance_targets("rebalance so SPY is 40%", holdings)
+    assert problems == []
+    assert by == "ticker"
+    assert targets["SPY"] == pytest.approx(0.4)
+    # the other 60% keeps the unnamed holdings' current proportions
+    rest = holdings.set_index("Asset").loc[["MSFT", "AAPL", "BND"], "Value"]
+    for t, v in (rest / rest.sum() * 0.6).items():
+        assert targets[t] == pytest.approx(v)
+
+
+def test_name_before_percent_and_mixed_sides(agent, holdings):
+    targets, by, _ = agent._rebalance_targets("rebalance SPY 30% BND 20%", holdings)
+    assert by == "ticker"
+    assert (targets["SPY"], targets["BND"]) == pytest.approx((0.3, 0.2))
+
+    targets, _, _ = agent._rebalance_targets("bond: 30%, equity 70%", holdings)
+    assert targets == pytest.approx({"Bond ETF": 0.3, "Equity": 0.7})
+
+
+@pytest.mark.parametrize("query, fragment", [
+    ("rebalance 50% stocks 50% gold", "'gold'"),
+    ("rebalance 70% stocks 50% bonds", "120%"),
+    ("rebalance MSFT 50% and 50% bonds", "mix tickers and asset classes"),
+])
+def test_problems_block_the_plan(agent, holdings, query, fragment):
+    targets, _, problems = agent._rebalance_targets(query, holdings)
+    assert targets == {}
+    assert any(fragment in p for p in problems)
+
+    summary = {}
+    text = agent._rebalance_lines(query, holdings, summary)
+    assert "no trades were planned" in text
+    assert "rebalance_trades" not in summary
+
+
+def test_no_targets_is_equal_weight_per_class(agent, holdings):
+    targets, by, problems = agent._rebalance_targets("should I rebalance?", holdings)
+    assert (by, problems) == ("class", [])
+    assert targets == pytest.approx({"Bond ETF": 1 / 3, "ETF": 1 / 3, "Equity": 1 / 3})
+
+
+def test_stocks_and_bonds_plan_keeps_equities(agent, holdings):
+    summary = {}
+    agent._rebalance_lines("rebalance to 50% stocks and 50% bonds", holdings, summary)
+    sold = {t["ticker"] for t in summary["rebalance_trades"] if t["action"] == "SELL"}
+    assert not sold & {"MSFT", "AAPL"}
+
+
+class _CountingProvider(LocalDirectoryProvider):
+    def __init__(self, root):
+        super().__init__(root)
+        self.fetched = []
+
+    def fetch_daily(self, ticker, outputsize="compact", priority=0):
+        self.fetched.append((ticker, outputsize, priority))
+        return super().fetch_daily(ticker, outputsize=outputsize, priority=priority)
+
+    def fetch_many(self, tickers, outputsize="compact", priority=0):
+        return {t: self.fetch_daily(t, outputsize, priority) for t in tickers}
+
+
+def _write_history(root, tickers, days=300):
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    for t in tickers:
+        close = 100.0 * np.cumprod(1.0 + rng.normal(0.0003, 0.01, days))
+        pd.DataFrame({"Date": dates, "Open": close, "High": close, "Low": close, "Close": close,
+                      "Volume": 1_000}).to_csv(root / f"{t}.csv", index=False)
+
+
+def test_run_downloads_each_ticker_once(tmp_path):
+    _write_history(tmp_path, ["MSFT", "AAPL", "SPY", "BND"])
+    provider = _CountingProvider(str(tmp_path))
+    data = MarketData(provider=provider, cache=MarketCache(), store=PriceStore(str(tmp_path / "store")))
+    agent = PortfolioAgent(data=data, positions=PositionStore(str(tmp_path / "positions.sqlite")))
+
+    result = agent.run({"user_query": "how is my portfolio?"})
+
+    tickers = ["MSFT", "AAPL", "SPY", "BND"]
+    # the run waits for one compact download per ticker...
+    interactive = [f for f in provider.fetched if f[2] == INTERACTIVE]
+    assert sorted(interactive) == sorted((t, "compact", INTERACTIVE) for t in tickers)
+    assert result.portfolio_summary["priced_live"] == 4
+    assert "vol_ann_pct" in result.portfolio_summary
+
+    # ...and the full lookback is backfilled off the request path
+    data._refresh_pool.shutdown(wait=True)
+    background = [f for f in provider.fetched if f[2] != INTERACTIVE]
+    assert sorted(background) == sorted((t, "full", BACKGROUND) for t in tickers)
+    assert all(len(data.read_local(t, min_points=RISK_LOOKBACK + 1)[0]) == 300 for t in tickers)
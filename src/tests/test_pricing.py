@@ -0,0 +1,66 @@
+# src/tests/test_pricing.py
+import numpy as np
+import pandas as pd
+
+from src.market.cache import MarketCache
+from src.market.data import MarketData
+from src.market.providers import LocalDirectoryProvider
+from src.market.store import PriceStore
+from src.portfolio.pricing import PriceBook, apply_prices
+
+
+class _CountingProvider(LocalDirectoryProvider):
+    def __init__(self, root):
+        super().__init__(root)
+        self.asked = []
+
+    def fetch_many(self, tickers, outputsize="compact", priority=0):
+        self.asked.extend(tickers)
+        return super().fetch_many(tickers, outputsize=outputsize, priority=priority)
+
+
+def _book(tmp_path, tickers):
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30)
+    for i, t in enumerate(tickers):
+        close = np.linspace(10.0, 20.0, 30) * (i + 1)
+        pd.DataFrame({"Date": dates, "Close": close}).to_csv(tmp_path / f"{t}.csv", index=False)
+    provider = _CountingProvider(str(tmp_path))
+    data = MarketData(provider=provider, cache=MarketCache(), store=PriceStore(str(tmp_path / "store")))
+    return PriceBook(data), provider
+
+
+def test_failed_tickers_are_not_requested_on_every_rerun(tmp_path):
+    book, provider = _book(tmp_path, ["AAA", "BBB"])
+
+    assert book.update(["AAA", "bbb", "NOPE"]) == ["AAA", "BBB", "NOPE"]
+    assert sorted(book.quotes) == ["AAA", "BBB"]
+    assert list(book.failed) == ["NOPE"]
+
+    provider.asked.clear()
+    assert book.update(["AAA", "BBB", "NOPE"]) == []
+    assert provider.asked == []
+
+    book.clear()
+    assert book.update(["NOPE"]) == ["NOPE"]
+    assert provider.asked == ["NOPE"]
+
+
+def test_only_new_holdings_are_quoted(tmp_path):
+    book, provider = _book(tmp_path, ["AAA", "BBB"])
+    book.update(["AAA"])
+    provider.asked.clear()
+
+    assert book.update(["AAA", "BBB"]) == ["BBB"]
+    assert provider.asked == ["BBB"]
+    assert book.quotes["BBB"].price == 40.0
+
+
+def test_apply_prices_keeps_manual_price_for_cash_and_unquoted(tmp_path):
+    book, _ = _book(tmp_path, ["AAA"])
+    book.update(["AAA", "NOPE"])
+    df = pd.DataFrame({"Ticker": ["aaa", "NOPE", "CASH"], "Type": ["stock", "stock", "cash"],
+                       "Price": [1.0, 2.0, 1.0]})
+
+    out = apply_prices(df, book.quotes)
+    assert out["Price"].tolist() == [20.0, 2.0, 1.0]
+    assert out["PriceSource"].tolist() == ["live", "manual", "manual"]
@@ -0,0 +1,90 @@
+# src/tests/test_providers.py
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.market.providers import LocalDirectoryProvider, YFinanceProvider, _normalize_ohlcv
+
+DATES = pd.date_range("2024-03-01 09:30", periods=4, freq="D", tz="America/New_York")
+
+
+def _yf_frame(scale=1.0):
+    # yfinance shape: tz-aware DatetimeIndex named "Date", newest last but shuffled here
+    return pd.DataFrame({
+        "Open": [1.0, 2.0, 3.0, 4.0],
+        "High": [1.5, 2.5, 3.5, 4.5],
+        "Low": [0.5, 1.5, 2.5, 3.5],
+        "Close": [1.2, 2.2, 3.2, 4.2],
+        "Adj Close": [1.1, np.nan, 3.1, 4.1],
+        "Volume": [10, 20, 30, 40],
+    }, index=pd.DatetimeIndex(DATES, name="Date")).mul(scale).iloc[[2, 0, 3, 1]]
+
+
+def test_normalize_yfinance_frame():
+    df = _normalize_ohlcv(_yf_frame())
+
+    assert list(df.columns) == ["Date", "Open", "High", "Low", "Close", "Volume", "RawClose"]
+    assert pd.api.types.is_datetime64_dtype(df["Date"])
+    assert df["Date"].is_monotonic_increasing
+    assert (df["Date"] == df["Date"].dt.normalize()).all()
+    assert df["Date"].iloc[0] == pd.Timestamp("2024-03-01")
+    # adjusted close preferred, raw close where it is missing
+    assert df["Close"].tolist() == [1.1, 2.2, 3.1, 4.1]
+    assert df["RawClose"].tolist() == [1.2, 2.2, 3.2, 4.2]
+
+
+def test_normalize_csv_style_columns():
+    raw = pd.DataFrame({
+        "timestamp": ["2024-01-03", "2024-01-02", "2024-01-04"],
+        "open": [2.0, 1.0, 3.0],
+        "adj_close": [2.5, 1.5, np.nan],
+        "volume": [1, 2, 3],
+    })
+    df = _normalize_ohlcv(raw)
+    assert list(df.columns) == ["Date", "Open", "Close", "Volume"]
+    # no raw close to fall back on: the bar without a close is dropped
+    assert df["Date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-02", "2024-01-03"]
+    assert df["Close"].tolist() == [1.5, 2.5]
+
+
+@pytest.mark.parametrize("raw", [
+    None,
+    pd.DataFrame(),
+    pd.DataFrame({"Date": ["2024-01-02"], "Open": [1.0]}),
+    pd.DataFrame({"Date": ["2024-01-02"], "Close": [np.nan]}),
+])
+def test_normalize_rejects_unusable_frames(raw):
+    assert _normalize_ohlcv(raw) is None
+
+
+def test_local_provider_compact_is_latest_bars(tmp_path):
+    dates = pd.bdate_range("2023-01-02", periods=150)
+    pd.DataFrame({"Date": dates[::-1], "Close": np.arange(150.0)[::-1]}).to_csv(tmp_path / "AAA.csv", index=False)
+    provider = LocalDirectoryProvider(str(tmp_path))
+
+    compact = provider.fetch_daily("aaa")
+    full = provider.fetch_daily("AAA", outputsize="full")
+    assert len(compact) == 100 and len(full) == 150
+    assert compact["Date"].iloc[-1] == dates[-1]
+    assert compact["Close"].tolist() == list(np.arange(50.0, 150.0))
+    assert provider.fetch_many(["AAA", "MISSING"]).keys() == {"AAA"}
+
+
+def test_yfinance_bulk_download_is_split_per_ticker(monkeypatch):
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append((tuple(tickers), kwargs["period"]))
+        # group_by="ticker": (ticker, field) columns, one ticker with no data
+        return pd.concat({"AAA": _yf_frame(), "BBB": _yf_frame(10.0), "CCC": _yf_frame() * np.nan}, axis=1)
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download))
+    out = YFinanceProvider().fetch_many(["aaa", "BBB", "CCC", "aaa"], outputsize="full")
+
+    assert calls == [(("AAA", "BBB", "CCC"), "max")]
+    assert out.keys() == {"AAA", "BBB"}
+    assert out["BBB"]["Close"].tolist() == pytest.approx([11.0, 22.0, 31.0, 41.0])
+    assert out["AAA"]["Date"].is_monotonic_increasing
@@ -0,0 +1,60 @@
+# src/tests/test_rebalance.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.bench_rebalance import loop_trades, synthetic
+from src.portfolio.rebalance import plan_trades, rebalance_positions
+
+
+def test_batched_plan_matches_per_account_loop():
+    shares, prices, targets, cash, lot = synthetic(300, 40, seed=9)
+    plan = plan_trades(shares, prices, targets, cash=cash, lot=lot)
+
+    assert np.allclose(plan.trades, loop_trades(shares, prices, targets, cash, lot))
+    assert (plan.cash_after >= -1e-6).all()
+    assert np.allclose(plan.trades % lot, 0.0)
+
+
+def test_known_answer_single_account():
+    # $10k: A is 80% (target 50%), B is 20% (target 40%), 10% stays cash
+    plan = plan_trades([[80.0, 20.0]], [100.0, 100.0], [0.5, 0.4], cash=0.0)
+    assert plan.trades.tolist() == [[-30.0, 20.0]]
+    assert plan.cash_after.tolist() == [1_000.0]
+    assert plan.weights_after[0] == pytest.approx([0.5, 0.4])
+
+
+def test_band_lots_and_zero_targets():
+    # A is 0.5 points off (inside the band), B has a zero target, C trades in 100-share lots
+    plan = plan_trades([[53.0, 20.0, 0.0]], [100.0, 50.0, 10.0], [0.5, 0.0, 0.45], cash=4_200.0,
+                       lot=[1.0, 1.0, 100.0])
+    assert plan.trades.tolist() == [[0.0, -20.0, 400.0]]
+    assert plan.cash_after[0] == pytest.approx(4_200.0 + 1_000.0 - 4_000.0)
+
+
+def test_buys_are_scaled_to_the_cash_available():
+    plan = plan_trades([[0.0, 0.0]], [10.0, 10.0], [0.5, 0.5], cash=1_000.0, cash_reserve=500.0)
+    assert plan.trades.tolist() == [[25.0, 25.0]]
+    assert plan.cash_after[0] == pytest.approx(500.0)
+
+
+def test_targets_over_100_percent_are_rejected():
+    with pytest.raises(ValueError):
+        plan_trades([[1.0, 1.0]], [1.0, 1.0], [0.7, 0.4])
+
+
+def test_class_targets_across_accounts():
+    positions = pd.DataFrame({
+        "account": ["a", "a", "a", "b"],
+        "ticker": ["MSFT", "AAPL", "BND", "BND"],
+        "shares": [60.0, 20.0, 20.0, 100.0],
+        "asset_class": ["Equity", "Equity", "Bond", "Bond"],
+    })
+    plan = rebalance_positions(positions, {"MSFT": 100.0, "AAPL": 100.0, "BND": 100.0},
+                               {"Equity": 0.6, "Bond": 0.4}, by="class")
+    trades = plan.trade_list().set_index(["account", "ticker"])["shares"]
+
+    # a: equity 80% -> 60% sold pro rata to holdings (MSFT 3/4, AAPL 1/4), bonds bought
+    assert trades[("a", "MSFT")] == 15 and trades[("a", "AAPL")] == 5 and trades[("a", "BND")] == 20
+    # b holds no equity: its 60% is split equally between the equity tickers
+    assert trades[("b", "BND")] == 60 and trades[("b", "MSFT")] == 30 and trades[("b", "AAPL")] == 30
@@ -0,0 +1,57 @@
+# src/tests/test_registry.py
+import threading
+import time
+
+from src.agents.registry import AGENT_FACTORIES, AgentRegistry, build_agents
+
+
+def _counting(calls, name, delay=0.0):
+    def factory():
+        calls.append(name)
+        time.sleep(delay)
+        return object()
+    return factory
+
+
+def test_agents_are_built_lazily_and_once():
+    calls = []
+    agents = AgentRegistry({"a": _counting(calls, "a"), "b": _counting(calls, "b")})
+
+    assert "a" in agents and "zzz" not in agents
+    assert list(agents) == ["a", "b"] and len(agents) == 2
+    assert calls == []
+
+    assert agents["a"] is agents["a"]
+    assert calls == ["a"]
+    assert agents.is_built("a") and not agents.is_built("b")
+
+
+def test_concurrent_first_use_builds_one_agent():
+    calls = []
+    agents = AgentRegistry({"slow": _counting(calls, "slow", delay=0.05)})
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(agents["slow"])) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["slow"]
+    assert len({id(a) for a in seen}) == 1
+
+
+def test_warm_up_skips_failing_agents():
+    def broken():
+        raise RuntimeError("no API key")
+
+    calls = []
+    agents = AgentRegistry({"ok": _counting(calls, "ok"), "broken": broken})
+    agents.warm_up(background=False)
+
+    assert agents.is_built("ok") and not agents.is_built("broken")
+
+
+def test_build_agents_covers_every_agent_without_building_them():
+    agents = build_agents()
+    assert set(agents) == set(AGENT_FACTORIES) == {"finance_qa", "market", "portfolio", "goals"}
+    assert not any(agents.is_built(name) for name in agents)
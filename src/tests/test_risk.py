@@ -0,0 +1,54 @@
+# src/tests/test_risk.py
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.market.analytics import TRADING_DAYS
+from src.portfolio.risk import history_prices, portfolio_risk
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(11)
+    r = rng.multivariate_normal([0.0004, 0.0002], [[1e-4, 3e-5], [3e-5, 4e-5]], size=400)
+    dates = pd.bdate_range("2023-01-02", periods=401)
+    return pd.DataFrame(100.0 * np.vstack([np.ones(2), np.cumprod(1.0 + r, axis=0)]),
+                        index=dates, columns=["AAA", "BBB"])
+
+
+def test_parametric_var_matches_closed_form(prices):
+    values = {"AAA": 6_000.0, "BBB": 4_000.0}
+    report = portfolio_risk(prices, values, horizon_days=10, mc_paths=0)
+
+    r = prices.pct_change().dropna().to_numpy()
+    v = np.array([6_000.0, 4_000.0])
+    mu, sd = float(r.mean(axis=0) @ v), float(np.sqrt(v @ np.cov(r, rowvar=False) @ v))
+    z = NormalDist().inv_cdf(0.95)
+    assert report.var["parametric"] == pytest.approx(z * sd * np.sqrt(10) - mu * 10)
+    assert report.cvar["parametric"] == pytest.approx(sd * np.sqrt(10) * NormalDist().pdf(z) / 0.05 - mu * 10)
+    assert report.vol_ann_pct == pytest.approx(sd / 10_000.0 * np.sqrt(TRADING_DAYS) * 100.0)
+    assert report.cvar["parametric"] > report.var["parametric"] > 0
+
+
+def test_monte_carlo_close_to_parametric(prices):
+    report = portfolio_risk(prices, {"AAA": 6_000.0, "BBB": 4_000.0}, mc_paths=200_000, seed=1)
+    assert report.var["monte_carlo"] == pytest.approx(report.var["parametric"], rel=0.03)
+    assert report.cvar["monte_carlo"] == pytest.approx(report.cvar["parametric"], rel=0.03)
+
+
+def test_cash_and_unknown_tickers_carry_no_risk(prices):
+    report = portfolio_risk(prices, {"AAA": 6_000.0, "CASH": 4_000.0}, mc_paths=0)
+    assert report.missing == ["CASH"]
+    assert report.covered_value == 6_000.0
+    assert report.total_value == 10_000.0
+
+
+def test_history_prices_keeps_lookback_window(prices):
+    frame = pd.DataFrame({"Date": prices.index, "Close": prices["AAA"].to_numpy()})
+    loaded = {"AAA": (frame, 0.0), "ZZZ": None}
+    out = history_prices(loaded, lookback=100)
+    assert list(out.columns) == ["AAA"]
+    assert len(out) == 101
+    assert out.index[-1] == prices.index[-1]
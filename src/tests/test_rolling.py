@@ -0,0 +1,54 @@
+# src/tests/test_rolling.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.market.rolling import CORR_WINDOW, MAX_CORR_SETS, TRADING_DAYS, RollingStats
+
+
+def _history(n=300, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0.0005, 0.012, n))
+    return pd.DataFrame({"Date": pd.bdate_range("2024-01-01", periods=n), "Close": close})
+
+
+def test_stats_match_pandas_rolling(tmp_path):
+    h = _history()
+    stats = RollingStats(tmp_path).update("aaa", h)
+
+    close = h["Close"]
+    for w in (20, 50, 200):
+        assert stats[f"ma{w}"] == pytest.approx(close.rolling(w).mean().iloc[-1])
+    vol = close.pct_change().rolling(20).std().iloc[-1] * np.sqrt(TRADING_DAYS) * 100.0
+    assert stats["vol_ann_pct"] == pytest.approx(vol)
+    assert stats["last"] == close.iloc[-1]
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    h = _history()
+    rolling = RollingStats(tmp_path)
+    rolling.update("AAA", h.iloc[:250])
+    # a fresh instance resumes from the saved .npz and feeds the last 50 bars only
+    resumed = RollingStats(tmp_path).update("AAA", h)
+    full = RollingStats(tmp_path / "other").update("AAA", h)
+    assert resumed == pytest.approx(full)
+
+
+def test_correlation_matches_corrcoef(tmp_path):
+    prices = pd.DataFrame({t: _history(seed=i)["Close"].to_numpy() for i, t in enumerate("ABC")},
+                          index=pd.bdate_range("2024-01-01", periods=300))
+    corr = RollingStats(tmp_path).correlation(prices)
+
+    r = prices.pct_change().iloc[-CORR_WINDOW:].to_numpy()
+    assert corr.to_numpy() == pytest.approx(np.corrcoef(r, rowvar=False))
+
+
+def test_correlation_files_are_capped(tmp_path):
+    prices = pd.DataFrame({t: _history(seed=i)["Close"].to_numpy() for i, t in enumerate("ABCDEFGHIJKL")},
+                          index=pd.bdate_range("2024-01-01", periods=300))
+    rolling = RollingStats(tmp_path)
+    for k in range(2, 14):
+        rolling.correlation(prices.iloc[:, :k] if k <= 12 else prices.iloc[:, 1:])
+
+    assert len(list(tmp_path.glob("corr-*.npz"))) == MAX_CORR_SETS
+    assert len(rolling._corr) == MAX_CORR_SETS
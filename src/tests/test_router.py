@@ -0,0 +1,105 @@
+# src/tests/test_router.py
+import os
+
+import pytest
+
+from src.agents.market import MarketAgent
+from src.market.symbols import DEFAULT_LISTING, SymbolIndex
+import src.workflow.router as router
+from src.workflow.router import detect_intents, route_intent, route_intents
+
+
+def test_default_listing_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert os.path.isabs(DEFAULT_LISTING)
+    assert os.path.exists(DEFAULT_LISTING)
+
+
+@pytest.mark.parametrize("query", [
+    "TSM price trend",          # real ticker, not in the shipped listing
+    "$TSM quote",
+    "show me the price trend chart for NVDA",
+    "AAPL stock price",
+])
+def test_market_queries_reach_market(query):
+    assert detect_intents(query) == ["market"]
+
+
+@pytest.mark.parametrize("query", [
+    "USE the price chart",
+    "WHAT IS THE BEST WAY TO START INVESTING",
+    "USE THIS CHART TO EXPLAIN THE TREND",
+    "what moves the stock market?",
+    # company names / index nicknames are plain words to the router
+    "Should I invest in gold when the stock market falls?",
+    "How does a total stock market index fund work?",
+    "What is the S&P 500 and how does the stock market work?",
+    "Is the Dow Jones a good indicator of the stock market?",
+    "What is a stock split and why do companies like Apple do it?",
+    "Explain how the Nasdaq market works",
+    "What is the meta trend in stock investing?",
+])
+def test_no_ticker_stays_finance_qa(query):
+    assert detect_intents(query) == ["finance_qa"]
+
+
+def test_market_agent_still_resolves_aliases():
+    agent = MarketAgent.__new__(MarketAgent)
+    assert agent._extract_tickers("compare AAPL with gold and the s&p 500") == ["AAPL", "GLD", "SPY"]
+    assert agent._extract_tickers("Apple vs Microsoft trend") == ["AAPL", "MSFT"]
+
+
+def test_alias_matching_can_be_turned_off():
+    index = SymbolIndex([("GLD", "SPDR Gold Shares", ["gold"]), ("AAPL", "Apple Inc.", ["apple"])])
+    assert index.find_in_text("gold vs apple vs $AAPL") == ["GLD", "AAPL"]
+    assert index.find_in_text("gold vs apple", aliases=False) == []
+    assert index.find_in_text("gold vs $AAPL", aliases=False) == ["AAPL"]
+
+
+def test_unlisted_fallback_only_on_request():
+    index = SymbolIndex([("AAPL", "Apple Inc.", [])])
+    assert index.find_in_text("TSM vs AAPL") == ["AAPL"]
+    assert index.find_in_text("TSM vs AAPL", unlisted=True) == ["TSM", "AAPL"]
+    assert index.find_in_text("TSM's margins", unlisted=True) == ["TSM"]
+    # all caps: case says nothing, listed symbols only
+    assert index.find_in_text("TSM VS AAPL", unlisted=True) == ["AAPL"]
+
+
+@pytest.mark.parametrize("query, intents", [
+    ("How is my portfolio doing and what is the AAPL trend?", ["market", "portfolio"]),
+    ("how is my portfolio doing and can I reach my $50k target in 5 years?", ["portfolio", "goals"]),
+    ("show AAPL chart and my savings projection", ["market", "goals"]),
+])
+def test_compound_questions_fan_out(query, intents):
+    assert detect_intents(query) == intents
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("rebalance to my target allocation", "portfolio"),
+    ("AAPL price target", "market"),
+    ("What is AAPL price target for next year?", "market"),
+    ("compare AAPL vs MSFT", "market"),
+    ("explain diversification in my portfolio", "portfolio"),
+    ("I want to save for retirement with a monthly contribution of 500", "goals"),
+    ("plan a goal of 1000 in 12 months", "goals"),
+    ("my plan for retirement", "goals"),
+    ("what is a target date fund?", "finance_qa"),
+    ("Is the planet warming?", "finance_qa"),
+    ("explain diversification basics", "finance_qa"),
+])
+def test_single_intent_questions(query, intent):
+    assert detect_intents(query) == [intent]
+
+
+def test_route_intents_matches_route_intent():
+    queries = ["AAPL stock price", "how is my portfolio?", "AAPL stock price", "what is an ETF?"]
+    assert route_intents(queries) == [route_intent(q) for q in queries]
+
+
+def test_route_intents_dedup_is_bounded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(router, "route_intent", lambda q: calls.append(q) or "finance_qa")
+
+    route_intents(["a", "b", "a", "c", "a", "b"], dedup_size=2)
+    # "a" stays recent enough to be reused; "b" was evicted by "c"
+    assert calls == ["a", "b", "c", "b"]
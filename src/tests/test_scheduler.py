@@ -0,0 +1,38 @@
+# src/tests/test_scheduler.py
+from datetime import datetime, timedelta
+
+from src.market import scheduler
+from src.market.scheduler import MARKET_TZ, PrefetchScheduler, start_prefetch_scheduler
+
+# a Wednesday
+OPEN = datetime(2026, 10, 14, 11, 0, tzinfo=MARKET_TZ)
+EVENING = datetime(2026, 10, 14, 20, 0, tzinfo=MARKET_TZ)
+
+
+def test_prefetch_is_opt_in(monkeypatch):
+    monkeypatch.delenv("MARKET_PREFETCH", raising=False)
+    monkeypatch.setattr(scheduler, "_SCHEDULER", None)
+    assert start_prefetch_scheduler() is None
+
+
+class _Local:
+    def __init__(self, fetched):
+        self.fetched = fetched
+
+    def read_local(self, ticker, min_points=0):
+        at = self.fetched.get(ticker)
+        return None if at is None else (None, at)
+
+
+def test_only_due_tickers_are_refreshed():
+    data = _Local({
+        "FRESH": OPEN - timedelta(minutes=5),
+        "OLD": OPEN - timedelta(minutes=30),
+        "CLOSED": EVENING - timedelta(hours=1),
+    })
+    s = PrefetchScheduler(["FRESH", "OLD", "NEW"], data=data)
+    assert s.due_tickers(OPEN) == ["OLD", "NEW"]
+
+    # after the close, only series fetched before the closing bar settled
+    s = PrefetchScheduler(["CLOSED", "OLD"], data=data)
+    assert s.due_tickers(EVENING) == ["OLD"]
@@ -1,4 +1,6 @@
 # src/utils/cache.py
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
@@ -16,12 +18,44 @@ class TTLCache:
     """
     Simple in-memory TTL cache.
     Store any python object with a fetched_at timestamp.
+
+    Optional limits:
+    - ttl_minutes: entries older than this read as missing (and are dropped)
+    - maxsize: least-recently-used entries are evicted beyond this size
+    Safe to share between threads.
     """
-    def __init__(self):
-        self._store: dict[str, dict[str, Any]] = {}
+    def __init__(self, ttl_minutes: Optional[float] = None, maxsize: Optional[int] = None):
+        self.ttl_minutes = ttl_minutes
+        self.maxsize = maxsize
+        self._store: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
 
     def get(self, key: str) -> Optional[dict[str, Any]]:
-        return self._store.get(key)
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            if self.ttl_minutes is not None and not is_fresh(entry["fetched_at"], self.ttl_minutes):
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, fetched_at: Optional[datetime] = None):
+        with self._lock:
+            self._store[key] = {"value": value, "fetched_at": fetched_at or datetime.now()}
+            self._store.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._store) > self.maxsize:
+                    self._store.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._store.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
 
-    def set(self, key: str, value: Any):
-        self._store[key] = {"value": value, "fetched_at": datetime.now()}
+    def __len__(self) -> int:
+        return len(self._store)
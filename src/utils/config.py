@@ -0,0 +1,21 @@
+# src/utils/config.py
+import threading
+
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env() -> None:
+    """
+    Loads .env into os.environ once per process.
+    Called explicitly at startup (app.py, scripts) and by the clients that need
+    API keys, instead of at import time.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
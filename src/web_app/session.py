@@ -17,15 +17,18 @@ def init_session():
             "annual_return_pct": 5.0,
         }
 
-def add_chat_message(role: str, content: str, sources=None, agent=None, payload=None):
+def add_chat_message(role: str, content: str, sources=None, agent=None, payload=None, agents=None):
     if sources is None:
         sources = []
+    if agents is None:
+        agents = [agent] if agent else []
     st.session_state.chat_history.append(
         {
             "role": role,
             "content": content,
             "sources": sources,
             "agent": agent,
+            "agents": agents,
             "payload": payload or {},
             "time": datetime.now(),
         }
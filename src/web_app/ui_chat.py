@@ -1,8 +1,9 @@
 # src/web_app/ui_chat.py
 import streamlit as st
-import matplotlib.pyplot as plt
 
 from src.web_app.session import add_chat_message
+from src.web_app.ui_market import freshness_caption
+from src.workflow.history import compact_history
 
 @st.cache_resource
 def _get_graph():
@@ -14,7 +15,11 @@ def _get_graph():
 
 
 def _render_payload(agent: str, payload: dict):
+    import matplotlib.pyplot as plt
+
     if agent == "market":
+        from src.market.downsample import downsample_frame
+
         df = payload.get("market_df")
         fetched_at = payload.get("market_fetched_at")
         ticker = payload.get("market_ticker") or "Market"
@@ -23,11 +28,37 @@ def _render_payload(agent: str, payload: dict):
         if ticker:
             st.markdown(f"**📈 Market Snapshot: {ticker}**")
         if fetched_at:
-            st.caption(f"Data updated: {fetched_at}")
+            st.caption(freshness_caption(payload, prefix="Data updated"))
         if is_mock:
             st.warning("Using fallback/mock data (API issue).")
 
-        if df is not None and len(df) > 0:
+        tickers = payload.get("market_tickers") or []
+        if df is not None and len(df) > 0 and len(tickers) > 1:
+            # comparison: one overlaid chart, each line rebased to 100
+            df = downsample_frame(df, columns=tickers)
+            fig, ax = plt.subplots()
+            no_data = []
+            for t in tickers:
+                col = df[t] if t in df.columns else None
+                first = col.first_valid_index() if col is not None else None
+                if first is None:
+                    no_data.append(t)
+                    continue
+                ax.plot(df["Date"], col / col[first] * 100.0, label=t)
+            ax.set_title("Normalized Performance (start = 100)")
+            ax.set_xlabel("Date")
+            ax.set_ylabel("Indexed")
+            ax.legend()
+            st.pyplot(fig)
+            if no_data:
+                st.caption(f"No prices to chart for: {', '.join(no_data)}")
+
+            corr = payload.get("market_corr")
+            if corr is not None:
+                with st.expander("Return correlations"):
+                    st.dataframe(corr.round(2), use_container_width=True)
+        elif df is not None and len(df) > 0:
+            df = downsample_frame(df, columns=["Close"])
             fig, ax = plt.subplots()
             ax.plot(df["Date"], df["Close"])
             ax.set_title(f"{ticker} Trend")
@@ -80,14 +111,13 @@ def _render_payload(agent: str, payload: dict):
             st.pyplot(fig)
 
 
-def _sanitize_history(history):
-    fixed = []
-    for m in (history or []):
-        if isinstance(m, dict):
-            fixed.append({**m, "role": m.get("role", "user"), "content": m.get("content", "")})
-        else:
-            fixed.append({"role": "user", "content": str(m)})
-    return fixed
+def _history_for_graph():
+    """
+    Bounded role/content window + rolling summary of older turns,
+    so invoke cost does not grow with session length.
+    """
+    summary_state = st.session_state.setdefault("history_summary", {"upto": 0, "text": ""})
+    return compact_history(st.session_state.chat_history, summary_state=summary_state)
 
 
 def render_chat_tab():
@@ -106,7 +136,8 @@ def render_chat_tab():
 
             payload = msg.get("payload") or {}
             if msg.get("role") == "assistant" and msg.get("agent") and payload:
-                _render_payload(msg["agent"], payload)
+                for agent_name in msg.get("agents") or [msg["agent"]]:
+                    _render_payload(agent_name, payload)
 
             if msg.get("sources"):
                 st.markdown("**Sources:**")
@@ -120,7 +151,7 @@ def render_chat_tab():
 
     add_chat_message("user", user_text)
 
-    safe_history = _sanitize_history(st.session_state.chat_history)
+    safe_history = _history_for_graph()
 
     graph = _get_graph()
     state_in = {
@@ -131,28 +162,34 @@ def render_chat_tab():
 
     state_out = graph.invoke(state_in)
 
-    agent_used = state_out.get("agent_name", "unknown")
+    agents_used = state_out.get("agents_used") or [state_out.get("agent_name", "unknown")]
+    agent_used = " + ".join(agents_used)
     answer = state_out.get("answer", "Sorry, I couldn't generate an answer.")
     sources = state_out.get("sources", []) or []
 
+    # a compound question can carry several dashboards in one payload
     payload = {}
-    if agent_used == "market":
-        payload = {
+    if "market" in agents_used:
+        payload.update({
             "market_df": state_out.get("market_df"),
             "market_fetched_at": state_out.get("market_fetched_at"),
             "market_ticker": state_out.get("market_ticker"),
             "market_is_mock": state_out.get("market_is_mock", False),
-        }
-    elif agent_used == "portfolio":
-        payload = {
+            "market_tickers": state_out.get("market_tickers"),
+            "market_corr": state_out.get("market_corr"),
+            "market_age_min": state_out.get("market_age_min"),
+            "market_is_stale": state_out.get("market_is_stale", False),
+        })
+    if "portfolio" in agents_used:
+        payload.update({
             "portfolio_df": state_out.get("portfolio_df"),
             "portfolio_summary": state_out.get("portfolio_summary"),
-        }
-    elif agent_used == "goals":
-        payload = {
+        })
+    if "goals" in agents_used:
+        payload.update({
             "goal_df": state_out.get("goal_df"),
             "goal_summary": state_out.get("goal_summary"),
-        }
+        })
 
     add_chat_message(
         "assistant",
@@ -160,6 +197,7 @@ def render_chat_tab():
         sources=sources,
         agent=agent_used,
         payload=payload,
+        agents=agents_used,
     )
 
     st.rerun()
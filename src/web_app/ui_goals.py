@@ -1,7 +1,5 @@
 # src/web_app/ui_goals.py
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import date
 import json
 import os
@@ -69,6 +67,8 @@ def _init_goal_state():
 # Math helpers
 # -----------------------------
 def _future_value_schedule(current_amount, monthly_contribution, years, annual_return_pct):
+    import pandas as pd
+
     months = int(years * 12)
     r_m = (annual_return_pct / 100.0) / 12.0
 
@@ -104,6 +104,8 @@ def _plot_growth(df, target_amount, title):
         st.info("No projection to plot.")
         return
 
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
     ax.plot(df["Month"], df["Balance"])
     ax.axhline(y=float(target_amount), linestyle="--")
@@ -120,6 +122,8 @@ def render_goals_tab():
     st.subheader("🎯 Goal Planner")
     st.caption("Create, edit, and track goals with projections (education only).")
 
+    import pandas as pd
+
     _init_goal_state()
     goals = st.session_state["goals"]
 
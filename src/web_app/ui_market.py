@@ -1,49 +1,41 @@
 # src/web_app/ui_market.py
 import streamlit as st
-import matplotlib.pyplot as plt
 
-
-# --- Page config data ---
-POPULAR_TICKERS = [
-    ("AAPL", "Apple"),
-    ("MSFT", "Microsoft"),
-    ("NVDA", "NVIDIA"),
-    ("AMZN", "Amazon"),
-    ("GOOGL", "Alphabet"),
-    ("TSLA", "Tesla"),
-    ("META", "Meta"),
-]
-
-# ETFs as index proxies (simple + works with most market APIs)
-MAJOR_INDICES = [
-    ("SPY", "S&P 500 (ETF proxy)"),
-    ("QQQ", "Nasdaq 100 (ETF proxy)"),
-    ("DIA", "Dow 30 (ETF proxy)"),
-]
+from src.market.scheduler import prefetch_enabled
+from src.market.watchlist import MAJOR_INDICES, POPULAR_TICKERS, prefetch_watchlist
 
 
 @st.cache_resource
-def _get_graph():
+def _get_agents():
     # ✅ Lazy imports to avoid circular import at startup
     from src.agents.registry import build_agents
-    from src.workflow.graph import build_graph
 
-    agents = build_agents()
-    return build_graph(agents)
+    return build_agents()
 
 
-def _invoke_market(ticker: str, period: str = "1mo"):
+def _snapshot(ticker: str, period: str = "1mo", force_refresh: bool = False) -> dict:
     """
-    Calls LangGraph with a market query.
-    Your MarketAgent should parse ticker and period if you support it.
+    Single structured lookup straight from MarketAgent (served from the
+    process-wide market cache unless force_refresh), shaped like a graph result.
     """
-    graph = _get_graph()
+    result = _get_agents()["market"].snapshot(ticker, period=period, force_refresh=force_refresh)
+    return dict(vars(result))
+
 
-    # prompt designed to route to market and fetch trend
-    q = f"Show me the price trend chart for {ticker} for {period}"
-    state_in = {"user_query": q, "query": q, "history": st.session_state.get("chat_history", [])}
-    out = graph.invoke(state_in)
-    return out
+def freshness_caption(out: dict, prefix: str = "Last updated") -> str:
+    """
+    "Last updated: <time> (N min ago)", flagging data being refreshed in the background.
+    """
+    fetched_at = out.get("market_fetched_at")
+    if not fetched_at:
+        return ""
+    text = f"{prefix}: {fetched_at}"
+    age = out.get("market_age_min")
+    if age is not None:
+        text += f" ({age} min ago)"
+    if out.get("market_is_stale"):
+        text += " · refreshing in background"
+    return text
 
 
 def _safe_metric_value(x, default="—"):
@@ -62,6 +54,13 @@ def _plot_price(df, title: str):
     if df is None or len(df) == 0 or "Date" not in df.columns or "Close" not in df.columns:
         st.info("No market data available to plot.")
         return
+
+    import matplotlib.pyplot as plt
+    from src.market.downsample import downsample_frame
+
+    # very long histories: plot at most CHART_MAX_POINTS (LTTB keeps the shape)
+    df = downsample_frame(df, columns=["Close"])
+
     fig, ax = plt.subplots()
     ax.plot(df["Date"], df["Close"])
     ax.set_title(title)
@@ -88,38 +87,69 @@ def _extract_basic_numbers(out: dict):
         return None, None
 
 
-def _ensure_market_cache():
-    if "market_cache" not in st.session_state:
-        st.session_state["market_cache"] = {}
-
-
-def _refresh_many(tickers, period="1mo"):
+def _refresh_many(tickers, period="1mo", force_refresh=False):
     """
-    Fetch many tickers and store in session cache.
+    Batch snapshots straight from MarketAgent (no router / graph round trip),
+    yielding (ticker, out) with out shaped like a graph result.
+
+    With the prefetch scheduler on, normal renders read memory only (it
+    keeps the watchlist warm); without it they download what is missing
+    once and serve the cache after that. force_refresh fetches
+    concurrently from upstream.
     """
-    _ensure_market_cache()
-    for t, _name in tickers:
-        st.session_state["market_cache"][f"{t}:{period}"] = _invoke_market(t, period=period)
+    agent = _get_agents()["market"]
+    symbols = [t for t, _name in tickers]
+    local_only = prefetch_enabled() and not force_refresh
+    results = agent.snapshot_many(symbols, period=period, force_refresh=force_refresh, local_only=local_only)
+    for ticker, result in results:
+        yield ticker, dict(vars(result))
+
+
+def _fill_metric(placeholder, label: str, out: dict):
+    last, pct = _extract_basic_numbers(out)
+    delta = f"{pct:+.2f}%" if pct is not None else None
+    placeholder.metric(label=label, value=_safe_metric_value(last), delta=delta,
+                       help=freshness_caption(out) or None)
+
+
+STAT_LABELS = {
+    "last": "Last",
+    "change_pct": "Day %",
+    "period_pct": "Period %",
+    "vol_ann_pct": "Vol (ann.) %",
+    "ma20": "MA 20",
+    "ma50": "MA 50",
+    "ma200": "MA 200",
+    "max_drawdown_pct": "Max DD %",
+    "beta": "Beta vs SPY",
+}
+
+
+def _render_analytics(tickers, period: str):
+    stats, corr = _get_agents()["market"].analytics(tickers, period=period)
+    if stats.empty:
+        st.info("No market history available yet.")
+        return
+
+    st.dataframe(stats.rename(columns=STAT_LABELS).round(2), use_container_width=True)
+    with st.expander("Return correlations (last 60 trading days)"):
+        st.dataframe(corr.round(2), use_container_width=True)
 
 
 def render_market_tab():
     st.subheader("📈 Market Overview")
     st.caption("Real-time market data (if APIs configured). Education only. Prices may be delayed.")
 
-    _ensure_market_cache()
-
     # Top bar controls
     top_l, top_r = st.columns([1, 1])
     with top_l:
         period = st.selectbox("History period", ["5d", "1mo", "3mo", "6mo", "1y"], index=1, key="market_period")
     with top_r:
-        if st.button("🔄 Refresh All", use_container_width=True, key="market_refresh_all"):
-            _refresh_many(MAJOR_INDICES + POPULAR_TICKERS, period=period)
+        refresh = st.button("🔄 Refresh All", use_container_width=True, key="market_refresh_all")
 
-    # Auto-load once (first view)
-    if st.session_state.get("market_autoloaded") != period:
-        _refresh_many(MAJOR_INDICES + POPULAR_TICKERS, period=period)
-        st.session_state["market_autoloaded"] = period
+    # metric placeholders, filled as each ticker's fetch completes (end of page)
+    cards = {}
+    warmup_slot = st.empty()
 
     st.divider()
 
@@ -129,15 +159,8 @@ def render_market_tab():
     st.markdown("### 🌐 Major Indices")
     cols = st.columns(len(MAJOR_INDICES))
     for i, (ticker, label) in enumerate(MAJOR_INDICES):
-        out = st.session_state["market_cache"].get(f"{ticker}:{period}", {}) or {}
-        last, pct = _extract_basic_numbers(out)
-        delta = f"{pct:+.2f}%" if pct is not None else None
-
-        cols[i].metric(
-            label=label,
-            value=_safe_metric_value(last),
-            delta=delta,
-        )
+        cards[ticker] = (cols[i].empty(), label)
+        cards[ticker][0].metric(label=label, value="—")
 
     st.divider()
 
@@ -155,16 +178,16 @@ def render_market_tab():
         lookup_btn = st.button("Look Up", use_container_width=True, key="lookup_btn")
 
     if lookup_btn and lookup_ticker:
-        st.session_state["lookup_out"] = _invoke_market(lookup_ticker, period=lookup_period)
+        st.session_state["lookup_out"] = _snapshot(lookup_ticker, period=lookup_period)
 
     lookup_out = st.session_state.get("lookup_out")
     if isinstance(lookup_out, dict):
         st.markdown(f"**{lookup_ticker} Snapshot (Education Only)**")
         st.write(lookup_out.get("answer", ""))
 
-        fetched_at = lookup_out.get("market_fetched_at")
-        if fetched_at:
-            st.caption(f"Last updated: {fetched_at}")
+        caption = freshness_caption(lookup_out)
+        if caption:
+            st.caption(caption)
 
         _plot_price(lookup_out.get("market_df"), f"{lookup_ticker} — {lookup_period} Trend")
 
@@ -180,13 +203,33 @@ def render_market_tab():
     for row in rows:
         cols = st.columns(len(row))
         for i, (ticker, name) in enumerate(row):
-            out = st.session_state["market_cache"].get(f"{ticker}:{period}", {}) or {}
-            last, pct = _extract_basic_numbers(out)
-            delta = f"{pct:+.2f}%" if pct is not None else None
-
             with cols[i]:
                 st.markdown(f"**{ticker}** — {name}")
-                st.metric("Last Price", _safe_metric_value(last), delta=delta)
+                cards[ticker] = (st.empty(), "Last Price")
+                cards[ticker][0].metric("Last Price", "—")
+
+    st.divider()
+
+    # -----------------------------
+    # Watchlist analytics (table)
+    # -----------------------------
+    st.markdown("### 📊 Watchlist Analytics")
+    analytics_slot = st.empty()
+    analytics_slot.caption("Loading…")
 
     st.divider()
     st.caption("⚠️ Educational use only. Not financial advice.")
+
+    # Cards read the cache (Refresh All fetches); each renders as its ticker arrives
+    watchlist = prefetch_watchlist()
+    shown = 0
+    for ticker, out in _refresh_many(MAJOR_INDICES + POPULAR_TICKERS, period=period, force_refresh=refresh):
+        placeholder, label = cards[ticker]
+        _fill_metric(placeholder, label, out)
+        shown += 1
+    if shown < len(cards) and prefetch_enabled():
+        warmup_slot.caption("⏳ Market data is still being prefetched in the background — check back shortly or press Refresh All.")
+
+    # one vectorized pass over the whole watchlist
+    with analytics_slot.container():
+        _render_analytics([t for t, _name in watchlist], period)
@@ -1,7 +1,12 @@
 # src/web_app/ui_portfolio.py
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def _init_holdings_state():
@@ -15,54 +20,217 @@ def _init_holdings_state():
         ]
 
 
+def _price_book():
+    if "price_book" not in st.session_state:
+        from src.portfolio.pricing import PriceBook
+        from src.portfolio.risk import INTERACTIVE_POINTS
+
+        # quotes load as much history as the risk / frontier sections wait
+        # for: one download per ticker
+        st.session_state["price_book"] = PriceBook(min_points=INTERACTIVE_POINTS)
+    return st.session_state["price_book"]
+
+
+def _with_live_prices(df: pd.DataFrame, refresh: bool = False) -> pd.DataFrame:
+    """
+    Replaces manual prices with latest closes. Only tickers without a quote
+    (or with a stale one) are looked up, all in one batched market request.
+    """
+    from src.portfolio.pricing import UNPRICED_TYPES, apply_prices
+
+    book = _price_book()
+    if refresh:
+        book.clear()
+    priced = df.loc[~df["Type"].astype(str).str.lower().isin(UNPRICED_TYPES), "Ticker"]
+    with st.spinner("Fetching prices…"):
+        book.update(priced.astype(str))
+    return apply_prices(df, book.quotes)
+
+
+HOLDING_TYPES = ["stock", "etf", "bond", "crypto", "cash"]
+
+
+def _positions_to_holdings(pos: pd.DataFrame) -> list:
+    """
+    Open ledger positions as holdings rows (Price = average cost, the
+    fallback when live prices are off or unavailable).
+    """
+    import pandas as pd
+
+    df = pos.groupby("ticker", sort=False).agg(
+        Shares=("shares", "sum"), Cost=("cost_basis", "sum"), Class=("asset_class", "first"),
+    ).reset_index()
+    kind = df["Class"].fillna("").astype(str).str.lower()
+    return pd.DataFrame({
+        "Ticker": df["ticker"],
+        "Shares": df["Shares"],
+        "Type": kind.where(kind.isin(HOLDING_TYPES), "stock"),
+        "Price": (df["Cost"] / df["Shares"]).round(4),
+    }).to_dict("records")
+
+
+def _render_import():
+    """
+    Streams a broker export into the local position store, then loads the
+    open positions (all accounts or one) as the holdings below.
+    """
+    from src.portfolio.ledger import PositionStore, import_transactions
+
+    st.caption("Buys, sells, dividends and splits are replayed at average cost. "
+               "Columns are matched by name (Date, Action, Symbol, Quantity, Price, Amount, Fees, Account).")
+    store = PositionStore()
+    upload = st.file_uploader("Transaction export", type=["csv"], key="p_import_file")
+    if upload is not None and st.button("Import", use_container_width=True, key="p_import_btn"):
+        try:
+            with st.spinner("Importing transactions…"):
+                result = import_transactions(upload, store=store)
+        except ValueError as e:
+            st.error(f"Could not import this file: {e}")
+        else:
+            st.success(f"Imported {result.transactions:,} transactions → "
+                       f"{len(result.positions):,} positions in {result.seconds:.1f}s ✅")
+            flagged = result.flagged()
+            if len(flagged):
+                st.warning("Some rows could not be replayed as-is: sells of more shares than held were "
+                           "capped at the shares held; buys / sells without price or amount were skipped.")
+                st.dataframe(flagged[["account", "ticker", "shares", "oversold", "skipped"]],
+                             use_container_width=True, hide_index=True)
+
+    accounts = store.accounts()
+    if not accounts:
+        return
+    account = st.selectbox("Account", ["All accounts"] + accounts, key="p_import_account")
+    if st.button("Use Imported Positions", use_container_width=True, key="p_use_import"):
+        pos = store.positions(account=None if account == "All accounts" else account)
+        st.session_state["user_holdings"] = _positions_to_holdings(pos)
+        st.rerun()
+
+
 def _compute_portfolio(df: pd.DataFrame):
     """
-    Computes Value, AllocationPct, summary metrics, and diversification score.
-    Works with manual prices.
+    Computes Value, AllocationPct, summary metrics, and diversification score
+    with the shared PortfolioEngine. Works with manual or live prices (see
+    _with_live_prices). Returns (df, summary, engine).
     """
+    import pandas as pd
+    from src.portfolio.engine import PortfolioEngine
+
     if df is None or df.empty:
         return df, {
             "total_value": 0.0,
             "top_asset": "N/A",
             "top_pct": 0.0,
             "diversification_score": 0.0,
-        }
+        }, None
 
     # Clean + compute
     df = df.copy()
     df["Ticker"] = df["Ticker"].astype(str).str.upper().str.strip()
     df["Shares"] = pd.to_numeric(df["Shares"], errors="coerce").fillna(0.0)
     df["Price"] = pd.to_numeric(df["Price"], errors="coerce").fillna(0.0)
-    df["Value"] = df["Shares"] * df["Price"]
+    engine = PortfolioEngine.from_frame(df)
+    df["Value"] = engine.values
+    df["AllocationPct"] = engine.allocation_pct()
+    return df, engine.summary(), engine
 
-    total = float(df["Value"].sum())
-    if total > 0:
-        df["AllocationPct"] = (df["Value"] / total * 100.0).round(2)
-    else:
-        df["AllocationPct"] = 0.0
-
-    # Largest holding
-    df_sorted = df.sort_values("Value", ascending=False)
-    top_asset = "N/A"
-    top_pct = 0.0
-    if len(df_sorted) > 0:
-        top_asset = str(df_sorted.iloc[0]["Ticker"])
-        top_pct = float(df_sorted.iloc[0]["AllocationPct"])
-
-    # Diversification score (simple HHI-based)
-    score = 0.0
-    if total > 0:
-        w = (df["Value"] / total).values
-        hhi = float((w ** 2).sum())
-        score = max(0.0, min(100.0, (1.0 - hhi) * 100.0))
-
-    summary = {
-        "total_value": total,
-        "top_asset": top_asset,
-        "top_pct": top_pct,
-        "diversification_score": round(score, 1),
-    }
-    return df, summary
+
+def _apply_edits(calc_df: pd.DataFrame, edited_df: pd.DataFrame, engine):
+    """
+    Folds data_editor edits into the computed frame. Shares/Price edits
+    update only the changed rows in the engine; Ticker/Type edits return
+    None (the caller recomputes from scratch).
+    """
+    import numpy as np
+    import pandas as pd
+
+    if engine is None or len(edited_df) != len(calc_df):
+        return None
+    tickers = edited_df["Ticker"].astype(str).str.upper().str.strip().to_numpy()
+    if (tickers != calc_df["Ticker"].to_numpy()).any() or \
+            (edited_df["Type"].astype(str).to_numpy() != calc_df["Type"].astype(str).to_numpy()).any():
+        return None
+
+    shares = pd.to_numeric(edited_df["Shares"], errors="coerce").fillna(0.0).to_numpy()
+    price = pd.to_numeric(edited_df["Price"], errors="coerce").fillna(0.0).to_numpy()
+    rows = np.flatnonzero((shares != engine.shares) | (price != engine.prices))
+    if not len(rows):
+        return calc_df, engine.summary()
+
+    engine.update_rows(rows, shares=shares[rows], prices=price[rows])
+    calc_df = calc_df.copy()
+    calc_df["Shares"], calc_df["Price"] = engine.shares, engine.prices
+    calc_df["Value"] = engine.values
+    calc_df["AllocationPct"] = engine.allocation_pct()
+    return calc_df, engine.summary()
+
+
+def _risky_values(calc_df: pd.DataFrame) -> pd.Series:
+    """
+    Value per ticker, cash excluded.
+    """
+    from src.portfolio.pricing import UNPRICED_TYPES
+
+    risky = calc_df[~calc_df["Type"].astype(str).str.lower().isin(UNPRICED_TYPES)]
+    return risky.groupby("Ticker", sort=False)["Value"].sum()
+
+
+def _history(tickers, local_only: bool) -> pd.DataFrame:
+    """
+    Daily closes for the risk / frontier sections, kept in session state
+    while the set of tickers stays the same (edits to shares reuse them).
+    A window shorter than the lookback is reread each run until the
+    background backfill lands.
+    """
+    from src.market.http import INTERACTIVE
+    from src.portfolio.risk import RISK_LOOKBACK, load_prices
+
+    key = (tuple(sorted(tickers)), local_only)
+    cached = st.session_state.get("risk_prices")
+    if cached is None or cached[0] != key or len(cached[1]) < RISK_LOOKBACK + 1:
+        cached = (key, load_prices(tickers, local_only=local_only, priority=INTERACTIVE))
+        st.session_state["risk_prices"] = cached
+    return cached[1]
+
+
+def _risk_report(calc_df: pd.DataFrame, horizon_days: int, confidence: float, local_only: bool):
+    """
+    RiskReport for the current holdings (cash excluded from the risky
+    part), cached in session state until values or settings change.
+    """
+    from src.portfolio.risk import portfolio_risk
+
+    values = _risky_values(calc_df)
+    total = float(calc_df["Value"].sum())
+    key = (tuple(values.index), tuple(values.round(2)), total, horizon_days, confidence, local_only)
+    cached = st.session_state.get("risk_report")
+    if cached is None or cached[0] != key:
+        with st.spinner("Simulating portfolio risk…"):
+            prices = _history(list(values.index), local_only)
+            report = portfolio_risk(prices, values.to_dict(), total_value=total,
+                                    confidence=confidence, horizon_days=horizon_days)
+        cached = (key, report)
+        st.session_state["risk_report"] = cached
+    return cached[1]
+
+
+def _frontier_chart(front):
+    import matplotlib.pyplot as plt
+
+    curve = front.frame()
+    eff, low = curve[curve["Efficient"]], curve[~curve["Efficient"]]
+    fig, ax = plt.subplots(figsize=(6, 3.5))
+    ax.plot(eff["VolPct"], eff["ReturnPct"], color="tab:blue", label="Efficient frontier")
+    ax.plot(low["VolPct"], low["ReturnPct"], color="tab:blue", linestyle="--", alpha=0.5)
+    ax.scatter([front.min_var_vol * 100.0], [front.min_var_return * 100.0], color="tab:green",
+               zorder=3, label="Minimum variance")
+    if front.current_vol is not None:
+        ax.scatter([front.current_vol * 100.0], [front.current_return * 100.0], color="tab:red",
+                   marker="*", s=160, zorder=3, label="Current allocation")
+    ax.set_xlabel("Volatility (annualized, %)", fontsize=9)
+    ax.set_ylabel("Return (annualized, %)", fontsize=9)
+    ax.legend(fontsize=8)
+    ax.grid(alpha=0.3)
+    st.pyplot(fig)
 
 
 def _small_pie(df: pd.DataFrame):
@@ -78,6 +246,8 @@ def _small_pie(df: pd.DataFrame):
         st.info("Add prices/shares to see allocation.")
         return
 
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(4, 4))
     ax.pie(
         alloc_df["Value"],
@@ -93,6 +263,8 @@ def render_portfolio_tab():
     st.subheader("📊 Portfolio Dashboard")
     st.caption("Add your holdings to view allocation, summary, and diversification (education only).")
 
+    import pandas as pd
+
     _init_holdings_state()
 
     # -----------------------------
@@ -108,7 +280,7 @@ def render_portfolio_tab():
         with c2:
             shares = st.number_input("Shares", min_value=0.0, value=5.0, step=1.0, key="p_shares")
         with c3:
-            htype = st.selectbox("Type", ["stock", "etf", "bond", "crypto", "cash"], index=1, key="p_type")
+            htype = st.selectbox("Type", HOLDING_TYPES, index=1, key="p_type")
         with c4:
             price = st.number_input("Price (manual)", min_value=0.0, value=100.0, step=1.0, key="p_price")
 
@@ -124,6 +296,9 @@ def render_portfolio_tab():
                 st.success(f"Added {ticker} ✅")
                 st.rerun()
 
+    with st.expander("📥 Import Broker Transactions (CSV)"):
+        _render_import()
+
     # -----------------------------
     # 2) Holdings table + remove
     # -----------------------------
@@ -134,36 +309,63 @@ def render_portfolio_tab():
         st.info("No holdings yet. Add one above.")
         return
 
+    p1, p2 = st.columns([1.2, 0.8])
+    with p1:
+        live = st.toggle("Use live prices", value=True, key="p_live",
+                         help="Latest daily close per ticker; manual prices are kept as fallback.")
+    with p2:
+        refresh_prices = st.button("🔄 Refresh Prices", use_container_width=True, key="p_refresh_prices",
+                                   disabled=not live)
+
+    columns = ["Ticker", "Type", "Shares", "Price", "Value", "AllocationPct"]
+    manual_prices = pd.to_numeric(holdings_df["Price"], errors="coerce").fillna(0.0).to_numpy()
+    if live:
+        holdings_df = _with_live_prices(holdings_df, refresh=refresh_prices)
+        columns.append("PriceSource")
+
     # Compute values and metrics
-    calc_df, summary = _compute_portfolio(holdings_df)
+    calc_df, summary, engine = _compute_portfolio(holdings_df)
+
+    if live:
+        n_live = int((calc_df["PriceSource"] == "live").sum())
+        as_of = calc_df["PriceAsOf"].max()
+        caption = f"Priced live: {n_live} of {len(calc_df)} holdings"
+        if pd.notna(as_of):
+            caption += f" · closes as of {as_of:%Y-%m-%d}"
+        st.caption(caption)
 
     # Editable grid (user can edit shares/price directly)
-    st.caption("Tip: You can edit Shares/Price directly below.")
+    st.caption("Tip: You can edit Shares/Price directly below." if not live
+               else "Tip: You can edit Shares directly below (turn off live prices to type prices).")
     edited_df = st.data_editor(
-        calc_df[["Ticker", "Type", "Shares", "Price", "Value", "AllocationPct"]],
+        calc_df[columns],
         use_container_width=True,
         hide_index=True,
-        disabled=["Value", "AllocationPct"],
+        disabled=["Value", "AllocationPct", "PriceSource"] + (["Price"] if live else []),
         key="portfolio_editor",
     )
 
     # Save edits back to session (Shares/Price/Type)
     # Note: data_editor returns a DataFrame
     if isinstance(edited_df, pd.DataFrame):
-        saved = []
-        for _, r in edited_df.iterrows():
-            saved.append(
-                {
-                    "Ticker": str(r["Ticker"]).upper().strip(),
-                    "Shares": float(r["Shares"]),
-                    "Type": str(r["Type"]),
-                    "Price": float(r["Price"]),
-                }
-            )
-        st.session_state["user_holdings"] = saved
-
-        # recompute after edits
-        calc_df, summary = _compute_portfolio(pd.DataFrame(st.session_state["user_holdings"]))
+        saved = pd.DataFrame({
+            "Ticker": edited_df["Ticker"].astype(str).str.upper().str.strip(),
+            "Shares": pd.to_numeric(edited_df["Shares"], errors="coerce").fillna(0.0),
+            "Type": edited_df["Type"].astype(str),
+            # live quotes are display-only: keep the typed price as fallback
+            "Price": manual_prices if live and len(edited_df) == len(manual_prices)
+            else pd.to_numeric(edited_df["Price"], errors="coerce").fillna(0.0),
+        })
+        st.session_state["user_holdings"] = saved.to_dict("records")
+
+        # only edited rows are recomputed; Ticker/Type edits need a full pass
+        applied = _apply_edits(calc_df, edited_df, engine)
+        if applied is None:
+            if live:
+                saved = _with_live_prices(saved)
+            calc_df, summary, engine = _compute_portfolio(saved)
+        else:
+            calc_df, summary = applied
 
     # Remove holding
     rem_col1, rem_col2 = st.columns([1.2, 0.8])
@@ -197,7 +399,62 @@ def render_portfolio_tab():
     # 4) Allocation pie chart (small)
     # -----------------------------
     st.markdown("### 🥧 Asset Allocation")
-    _small_pie(calc_df)
+    pie_col, type_col = st.columns([1.2, 0.8])
+    with pie_col:
+        _small_pie(calc_df)
+    with type_col:
+        if engine is not None and engine.total > 0:
+            st.markdown("**By Type**")
+            st.dataframe(engine.breakdown("type"), use_container_width=True, hide_index=True)
+            st.caption(f"Top 5 holdings: {summary.get('top5_pct', 0.0):.1f}% of the portfolio")
+
+    st.divider()
+
+    # -----------------------------
+    # 5) Risk (volatility, VaR / CVaR)
+    # -----------------------------
+    st.markdown("### 📉 Risk (VaR / CVaR)")
+    r1, r2 = st.columns(2)
+    with r1:
+        horizon = st.selectbox("Horizon (trading days)", [1, 5, 10], key="p_risk_horizon")
+    with r2:
+        confidence = st.selectbox("Confidence", [0.95, 0.99], format_func=lambda c: f"{c:.0%}",
+                                  key="p_risk_conf")
+    report = _risk_report(calc_df, horizon, confidence, local_only=not live) if summary.get("total_value") else None
+    if report is None:
+        st.info("Not enough price history for the current holdings to estimate risk.")
+    else:
+        st.metric("Volatility (annualized)", f"{report.vol_ann_pct:.1f}%")
+        st.dataframe(report.table().round(2), use_container_width=True, hide_index=True)
+        caption = (f"Losses over {report.horizon_days} day(s) at {report.confidence:.0%} from "
+                   f"{report.observations} daily returns; Monte Carlo uses correlated normal shocks.")
+        if report.missing:
+            caption += f" Not covered: {', '.join(report.missing)}."
+        st.caption(caption)
+
+    st.divider()
+
+    # -----------------------------
+    # 6) Efficient frontier
+    # -----------------------------
+    st.markdown("### 🎯 Efficient Frontier")
+    from src.portfolio.frontier import efficient_frontier
+
+    values = _risky_values(calc_df)
+    front = efficient_frontier(_history(list(values.index), not live), values.to_dict()) if len(values) > 1 else None
+    if front is None:
+        st.info("Needs at least two holdings with enough price history.")
+    else:
+        _frontier_chart(front)
+        caption = (f"Mean-variance frontier of your holdings from {front.observations} daily returns "
+                   f"(fully invested, shorting allowed).")
+        if front.current_return is not None:
+            best = front.efficient_vol(front.current_return)
+            caption += f" Current mix: {front.current_return:.1%} return at {front.current_vol:.1%} volatility"
+            caption += f"; the frontier reaches that return at {best:.1%}." if pd.notna(best) else "."
+        if front.missing:
+            caption += f" Not covered: {', '.join(front.missing)}."
+        st.caption(caption)
 
     st.divider()
     st.caption("⚠️ Educational use only. Not financial advice.")
@@ -1,49 +1,104 @@
 # src/workflow/graph.py
 from langgraph.graph import StateGraph, END
 from src.workflow.state import FinanceState
-from src.workflow.router import route_intent
+from src.workflow.router import detect_intents
+
+# Dashboard payload fields an agent may produce (on its result or its state copy)
+PAYLOAD_KEYS = [
+    # market
+    "market_df", "market_fetched_at", "market_ticker", "market_is_mock",
+    "market_tickers", "market_corr", "market_age_min", "market_is_stale",
+    # portfolio
+    "portfolio_df", "portfolio_summary",
+    # goals
+    "goal_df", "goal_summary",
+]
+
+
+def _node_name(agent_name: str) -> str:
+    return f"run_{agent_name}"
+
+
+def _collect_output(result, agent_state: dict) -> dict:
+    out = {
+        "answer": getattr(result, "answer", "") if result is not None else "",
+        "sources": getattr(result, "sources", []) if result is not None else [],
+    }
+    for key in PAYLOAD_KEYS:
+        if result is not None and hasattr(result, key):
+            out[key] = getattr(result, key)
+        elif key in agent_state:
+            # some agents (goals) publish their payload on the state instead
+            out[key] = agent_state[key]
+    return out
 
 
 def build_graph(agents: dict):
+    """
+    router → one branch per selected agent (run concurrently) → join.
+
+    Compound questions fan out to several agents in the same step, so they
+    finish in max(agent latency) instead of the sum.
+    """
     g = StateGraph(FinanceState)
+    fallback = "finance_qa" if "finance_qa" in agents else next(iter(agents))
 
-    def router_node(state: FinanceState) -> FinanceState:
+    def router_node(state: FinanceState) -> dict:
         query = state.get("user_query") or state.get("query", "")
-        intent = route_intent(query)
+        intents = []
+        for name in detect_intents(query):
+            name = name if name in agents else fallback
+            if name not in intents:
+                intents.append(name)
+
+        return {"intent": intents[0], "intents": intents, "agent_name": intents[0]}
+
+    def select_branches(state: FinanceState):
+        return [_node_name(name) for name in state.get("intents") or [fallback]]
+
+    def make_agent_node(agent_name: str):
+        def run_agent_node(state: FinanceState) -> dict:
+            agent = agents.get(agent_name)
 
-        state["intent"] = intent
-        state["agent_name"] = intent
-        return state
+            # each branch gets its own copy: agents may write into state
+            agent_state = dict(state)
+            result = agent.run(agent_state)
 
-    def run_agent_node(state: FinanceState) -> FinanceState:
-        agent_name = state.get("agent_name", "finance_qa")
-        agent = agents.get(agent_name) or agents.get("finance_qa")
+            # only touch this branch's slot so parallel writes never collide
+            return {"agent_outputs": {agent_name: _collect_output(result, agent_state)}}
 
-        # run agent
-        result = agent.run(state)
+        return run_agent_node
 
-        # always set core response
-        state["answer"] = getattr(result, "answer", "") if result is not None else ""
-        state["sources"] = getattr(result, "sources", []) if result is not None else []
+    def join_node(state: FinanceState) -> dict:
+        outputs = state.get("agent_outputs") or {}
+        used = [name for name in state.get("intents") or [] if name in outputs]
 
-        for key in [
-            # market
-            "market_df", "market_fetched_at", "market_ticker", "market_is_mock",
-            # portfolio
-            "portfolio_df", "portfolio_summary",
-            # goals
-            "goal_df", "goal_summary",
-        ]:
-            if result is not None and hasattr(result, key):
-                state[key] = getattr(result, key)
+        answers = [outputs[name]["answer"] for name in used if outputs[name].get("answer")]
+        sources = []
+        for name in used:
+            for s in outputs[name].get("sources") or []:
+                if s not in sources:
+                    sources.append(s)
 
-        return state
+        merged = {
+            "answer": "\n\n---\n\n".join(answers),
+            "sources": sources,
+            "agents_used": used,
+        }
+        for name in used:
+            for key in PAYLOAD_KEYS:
+                if key in outputs[name]:
+                    merged[key] = outputs[name][key]
+        return merged
 
     g.add_node("router", router_node)
-    g.add_node("run_agent", run_agent_node)
+    for agent_name in agents:
+        g.add_node(_node_name(agent_name), make_agent_node(agent_name))
+        g.add_edge(_node_name(agent_name), "join")
+    g.add_node("join", join_node)
 
     g.set_entry_point("router")
-    g.add_edge("router", "run_agent")
-    g.add_edge("run_agent", END)
+    g.add_conditional_edges("router", select_branches, [_node_name(n) for n in agents])
+    g.add_edge("join", END)
 
     return g.compile()
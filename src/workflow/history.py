@@ -0,0 +1,107 @@
+# src/workflow/history.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+# Window of conversation passed into graph.invoke
+MAX_HISTORY_MESSAGES = 12
+MAX_HISTORY_TOKENS = 1500
+MAX_SUMMARY_CHARS = 800
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return len(text or "") // 4 + 1
+
+
+def compact_message(m: Any) -> Dict[str, str]:
+    """
+    Role + content only: payload DataFrames, sources, timestamps are dropped.
+    """
+    if isinstance(m, dict):
+        return {"role": m.get("role", "user") or "user", "content": str(m.get("content", "") or "")}
+    return {"role": "user", "content": str(m)}
+
+
+def window_start(history: List[Any], max_messages: int = MAX_HISTORY_MESSAGES,
+                 max_tokens: int = MAX_HISTORY_TOKENS) -> int:
+    """
+    Index of the oldest message that fits the message/token window.
+    Walks back from the newest message, so cost is bounded by the window.
+    """
+    start = len(history)
+    tokens = 0
+    while start > 0 and len(history) - start < max_messages:
+        m = history[start - 1]
+        content = m.get("content", "") if isinstance(m, dict) else str(m)
+        tokens += estimate_tokens(content)
+        # always keep the newest message, even if it alone is over budget
+        if tokens > max_tokens and start < len(history):
+            break
+        start -= 1
+    return start
+
+
+def _summary_line(m: Any, max_chars: int = 160) -> str:
+    c = compact_message(m)
+    text = " ".join(c["content"].split())
+    if c["role"] == "assistant":
+        # first sentence is usually the short answer
+        text = text.split(". ")[0]
+    if len(text) > max_chars:
+        text = text[: max_chars - 1] + "…"
+    who = "User" if c["role"] == "user" else "Finnie"
+    return f"{who}: {text}"
+
+
+def roll_summary(summary: str, dropped: List[Any], max_chars: int = MAX_SUMMARY_CHARS) -> str:
+    """
+    Extends a rolling summary with messages that left the window.
+    Keeps the most recent max_chars characters.
+    """
+    lines = [summary] if summary else []
+    lines.extend(_summary_line(m) for m in dropped)
+    text = "\n".join(lines)
+    if len(text) > max_chars:
+        # drop whole lines from the front, not half a line
+        text = text[-max_chars:]
+        nl = text.find("\n")
+        text = "…\n" + (text[nl + 1:] if nl != -1 else text)
+    return text
+
+
+def compact_history(
+    history: List[Any],
+    max_messages: int = MAX_HISTORY_MESSAGES,
+    max_tokens: int = MAX_HISTORY_TOKENS,
+    summary_state: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Bounded view of the conversation for the graph:
+      - only role/content per message
+      - at most max_messages / ~max_tokens of the newest messages
+      - optionally, older turns folded into one rolling summary message
+
+    summary_state ({"upto": int, "text": str}) is updated in place, so each
+    message is summarized once however long the session gets. A history
+    shorter than what was summarized (chat cleared / replaced) starts the
+    summary over.
+    """
+    history = history or []
+    start = window_start(history, max_messages=max_messages, max_tokens=max_tokens)
+    window = [compact_message(m) for m in history[start:]]
+
+    if summary_state is None:
+        return window
+
+    upto = int(summary_state.get("upto", 0))
+    if upto > len(history):
+        summary_state["text"], summary_state["upto"] = "", 0
+        upto = 0
+    if upto < start:
+        summary_state["text"] = roll_summary(summary_state.get("text", ""), history[upto:start])
+        summary_state["upto"] = start
+
+    if summary_state.get("text"):
+        return [{"role": "system", "content": "Earlier conversation (summary):\n" + summary_state["text"]}] + window
+    return window
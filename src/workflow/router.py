@@ -1,79 +1,195 @@
 # src/workflow/router.py
 import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from src.market.symbols import get_symbol_index
 
-def _has_ticker_like_token(text: str) -> bool:
+# -------------------------------------------------
+# Keyword tables (compiled once at import)
+# -------------------------------------------------
+MARKET_TRIGGERS = ("price", "quote", "trend", "chart", "market", "stock", "compare", "versus", " vs")
+PORTFOLIO_STRONG = (
+    "my portfolio", "my holdings", "my allocation",
+    "rebalance", "largest holding", "asset class",
+    "portfolio", "holdings", "allocation", "positions",
+)
+PORTFOLIO_HINT_WORDS = ("holdings", "allocation", "rebalance", "portfolio")
+DIVERSIFICATION_WORDS = ("diversif",)
+USER_CONTEXT_WORDS = ("my ", "portfolio", "holdings", "allocation")
+# goals words match whole words only ("plan" not "planet", "save" not "saved by")
+GOAL_TRIGGERS = ("goal", "goals", "retire", "retirement", "projection", "projections")
+SAVING_TRIGGERS = ("save", "saving", "savings", "contribution", "contributions")
+# "target" / "plan" are goals language only with a goals context: alone, or
+# next to a time horizon; "price target" / "target allocation" / "target date
+# fund" belong to the other agents (or the KB)
+GOAL_WEAK_TRIGGERS = ("target", "targets", "plan", "plans", "planning")
+# route_intents remembers this many distinct queries (least recently seen dropped first)
+ROUTE_DEDUP_SIZE = 4096
+
+
+def _word_re(words: Iterable[str]) -> "re.Pattern[str]":
+    return re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b")
+
+
+_GOAL_STRONG_RE = _word_re(GOAL_TRIGGERS + SAVING_TRIGGERS)
+_GOAL_WEAK_RE = re.compile(r"\b(?:targets?(?![- ]date)|plans?|planning)\b")
+_GOAL_HORIZON_RE = re.compile(r"\b(?:in|within|over|by)\s+(?:\d+|a|one|two|three|five|ten)\s*(?:years?|yrs?|months?)\b"
+                              r"|\bby\s+(?:19|20)\d\d\b")
+
+
+# one bit per keyword table
+_MARKET = 1
+_PORTFOLIO = 2
+_PORTFOLIO_HINT = 4
+_DIVERSIF = 8
+_USER_CONTEXT = 16
+
+
+def _compile_keyword_table() -> Tuple[Tuple[str, int], ...]:
     """
-    Matches realistic stock tickers:
-    - 2–5 uppercase letters
-    - excludes common English words (USE, THIS, THAT, etc.)
-    - does NOT auto-uppercase the sentence
+    Flattens the keyword tables into one (keyword, flags) table so each
+    keyword is tested once per query, whatever tables it belongs to.
     """
-    if not text:
-        return False
+    tables = [
+        (MARKET_TRIGGERS, _MARKET),
+        (PORTFOLIO_STRONG, _PORTFOLIO),
+        (PORTFOLIO_HINT_WORDS, _PORTFOLIO_HINT),
+        (DIVERSIFICATION_WORDS, _DIVERSIF),
+        (USER_CONTEXT_WORDS, _USER_CONTEXT),
+    ]
+    flags: Dict[str, int] = {}
+    for words, bit in tables:
+        for w in words:
+            flags[w] = flags.get(w, 0) | bit
+    return tuple(flags.items())
 
-    COMMON_WORDS = {
-        "THE", "AND", "FOR", "WHY", "WHAT", "WHEN", "WHERE",
-        "HOW", "USE", "WITH", "THIS", "THAT", "FROM", "IN",
-        "ON", "TO", "OF", "IS", "ARE"
-    }
 
-    # Only match tokens that are already uppercase in user input
-    tokens = re.findall(r"\b[A-Z]{2,5}\b", text)
-    tokens = [t for t in tokens if t not in COMMON_WORDS]
+_KEYWORD_TABLE = _compile_keyword_table()
 
-    return len(tokens) > 0
 
+def _scan_keywords(q_lower: str) -> int:
+    mask = 0
+    for kw, flags in _KEYWORD_TABLE:
+        # skip keywords whose tables have all matched already
+        if flags & ~mask and kw in q_lower:
+            mask |= flags
+    return mask
 
-def route_intent(query: str) -> str:
+
+def _has_ticker_like_token(text: str) -> bool:
     """
-    Routes user query to the correct agent:
-    - market
-    - portfolio
-    - goals
-    - finance_qa (default / KB-based education)
+    True when the text names a symbol: a listed uppercase ticker (AAPL, not
+    SHOW or USE), a $cashtag, or an unlisted ticker-shaped uppercase word
+    (TSM) since the shipped listing is not exhaustive. Lookups go through
+    the shared symbol index (see src/market/symbols.py).
+
+    Company names and nicknames ("apple", "gold", "s&p 500") do not count
+    here: education questions use them as plain words. MarketAgent still
+    resolves them once a question is routed to market.
     """
-    q = (query or "").strip()
-    q_lower = q.lower()
+    if not text:
+        return False
+    return bool(get_symbol_index().find_in_text(text, limit=1, unlisted=True, aliases=False))
+
+
+def _wants_goals(q_lower: str, other_intents: bool) -> bool:
+    """
+    Goals words on word boundaries. "target" / "plan" alone only count when
+    nothing else matched or the question has a time horizon ("in 5 years").
+    """
+    if _GOAL_STRONG_RE.search(q_lower):
+        return True
+    if _GOAL_WEAK_RE.search(q_lower):
+        return not other_intents or bool(_GOAL_HORIZON_RE.search(q_lower))
+    return False
+
+
+def _intents_from_scan(q: str, mask: int) -> List[str]:
+    intents: List[str] = []
+    has_ticker: Optional[bool] = None
 
     # -------------------------------------------------
     # 1) MARKET: requires BOTH market language AND a real ticker
     # -------------------------------------------------
-    market_triggers = ["price", "quote", "trend", "chart", "market", "stock"]
-    if any(t in q_lower for t in market_triggers) and _has_ticker_like_token(q):
-        return "market"
+    if mask & _MARKET:
+        has_ticker = _has_ticker_like_token(q)
+        if has_ticker:
+            intents.append("market")
 
     # -------------------------------------------------
     # 2) PORTFOLIO: only when clearly about user's portfolio
     # -------------------------------------------------
-    portfolio_strong = [
-        "my portfolio", "my holdings", "my allocation",
-        "rebalance", "largest holding", "asset class",
-        "portfolio", "holdings", "allocation", "positions"
-    ]
-    if any(t in q_lower for t in portfolio_strong):
-        return "portfolio"
-
+    if mask & _PORTFOLIO:
+        intents.append("portfolio")
     # Portfolio + ticker (e.g., "AAPL allocation")
-    portfolio_hint_words = ["holdings", "allocation", "rebalance", "portfolio"]
-    if _has_ticker_like_token(q) and any(w in q_lower for w in portfolio_hint_words):
-        return "portfolio"
-
-    # Diversification is ambiguous → portfolio ONLY if user context exists
-    if "diversif" in q_lower and any(
-        t in q_lower for t in ["my ", "portfolio", "holdings", "allocation"]
+    elif mask & _PORTFOLIO_HINT and (
+        has_ticker if has_ticker is not None else _has_ticker_like_token(q)
     ):
-        return "portfolio"
+        intents.append("portfolio")
+    # Diversification is ambiguous → portfolio ONLY if user context exists
+    elif mask & _DIVERSIF and mask & _USER_CONTEXT:
+        intents.append("portfolio")
 
     # -------------------------------------------------
     # 3) GOALS
     # -------------------------------------------------
-    goal_triggers = ["goal", "target", "retirement", "projection", "plan"]
-    saving_triggers = ["save", "saving", "contribution", "monthly contribution"]
-    if any(t in q_lower for t in goal_triggers) or any(t in q_lower for t in saving_triggers):
-        return "goals"
+    if _wants_goals(q.lower(), bool(intents)):
+        intents.append("goals")
 
     # -------------------------------------------------
     # 4) DEFAULT → Finance education (RAG / KB)
     # -------------------------------------------------
-    return "finance_qa"
+    if not intents:
+        intents.append("finance_qa")
+
+    return intents
+
+
+def detect_intents(query: str) -> List[str]:
+    """
+    Returns every agent the query asks for, in priority order:
+    - market
+    - portfolio
+    - goals
+    - finance_qa (only when nothing else matched)
+
+    Compound questions ("how is my portfolio doing and what's AAPL's trend?")
+    yield several intents so the graph can fan out to each agent.
+    """
+    q = (query or "").strip()
+    return _intents_from_scan(q, _scan_keywords(q.lower()))
+
+
+def route_intent(query: str) -> str:
+    """
+    Routes user query to the correct agent:
+    - market
+    - portfolio
+    - goals
+    - finance_qa (default / KB-based education)
+
+    Single-agent view of detect_intents(): the highest-priority intent.
+    """
+    return detect_intents(query)[0]
+
+
+def route_intents(queries: Iterable[str], dedup_size: int = ROUTE_DEDUP_SIZE) -> List[str]:
+    """
+    Batch routing for offline log replay / analytics.
+    Same decisions as route_intent(); repeated queries are routed once
+    while they are among the last dedup_size distinct queries, so memory
+    stays bounded however many distinct queries the log holds.
+    """
+    seen: "OrderedDict[str, str]" = OrderedDict()
+    out: List[str] = []
+    for query in queries:
+        intent = seen.get(query)
+        if intent is None:
+            intent = seen[query] = route_intent(query)
+            if len(seen) > dedup_size:
+                seen.popitem(last=False)
+        else:
+            seen.move_to_end(query)
+        out.append(intent)
+    return out
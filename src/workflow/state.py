@@ -1,5 +1,13 @@
 # src/workflow/state.py
-from typing import TypedDict, List, Dict, Any
+from typing import Annotated, TypedDict, List, Dict, Any
+
+
+def merge_agent_outputs(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reducer for parallel agent branches: each branch writes its own key.
+    """
+    return {**(left or {}), **(right or {})}
+
 
 class FinanceState(TypedDict, total=False):
     # core
@@ -10,7 +18,10 @@ class FinanceState(TypedDict, total=False):
 
     # orchestration
     intent: str
-    agent_name: str
+    intents: List[str]            # all agents selected for this query (fan-out)
+    agent_name: str               # primary agent (first of intents)
+    agents_used: List[str]
+    agent_outputs: Annotated[Dict[str, Dict[str, Any]], merge_agent_outputs]
 
     # response
     answer: str
@@ -20,7 +31,12 @@ class FinanceState(TypedDict, total=False):
     market_request: Dict[str, Any]
     market_df: Any
     market_fetched_at: Any
+    market_ticker: str
     market_is_mock: bool
+    market_tickers: List[str]     # set for multi-ticker comparisons
+    market_corr: Any
+    market_age_min: int           # minutes since the served data was fetched
+    market_is_stale: bool         # past the soft TTL, refresh running in background
 
     # portfolio
     portfolio_request: Dict[str, Any]